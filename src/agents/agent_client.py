@@ -2,12 +2,113 @@
 HTTP client for communicating with llama.cpp model servers.
 """
 
+import asyncio
+import hashlib
 import httpx
-from typing import Optional
+import orjson
+from typing import Dict, List, Optional
 from loguru import logger
 
+from src.core.config import settings
 from src.core.models import AgentRole
 from src.core.agent_registry import agent_registry
+from src.agents.batcher import get_batcher
+from src.agents.cache import response_cache
+
+
+# Request bodies are pre-encoded with orjson and sent as raw content
+JSON_HEADERS = {"content-type": "application/json"}
+
+# Shared connection pool for all agent clients (created lazily)
+_CLIENT: Optional[httpx.AsyncClient] = None
+
+# In-flight deterministic requests shared across clients (singleflight),
+# keyed by endpoint + payload hash
+_INFLIGHT: Dict[str, asyncio.Task] = {}
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared HTTP client for model server calls.
+    
+    Reusing one client keeps connections alive across requests instead of
+    paying a new TCP handshake per generation. HTTP/2 multiplexes the
+    consensus fan-out (candidates x parallel tasks) over one connection per
+    model server; the pool limits bound the HTTP/1.1 fallback.
+    """
+    global _CLIENT
+    
+    if _CLIENT is None or _CLIENT.is_closed:
+        _CLIENT = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+                keepalive_expiry=settings.http_keepalive_expiry
+            ),
+            timeout=httpx.Timeout(
+                connect=settings.http_connect_timeout,
+                read=settings.http_read_timeout,
+                write=settings.http_write_timeout,
+                pool=settings.http_pool_timeout
+            )
+        )
+    
+    return _CLIENT
+
+
+class SSELineBuffer:
+    """
+    Incremental server-sent-events parser working on raw bytes.
+    
+    Chunks are appended to a single bytearray and scanned for newlines in
+    place. Line prefixes are checked without slicing, each payload is copied
+    out exactly once, and consumed bytes are compacted once per chunk.
+    """
+    
+    def __init__(self):
+        self._buf = bytearray()
+    
+    def feed(self, chunk: bytes) -> List[bytes]:
+        """
+        Consume a chunk and return the payloads of completed data lines.
+        
+        Args:
+            chunk: Raw bytes from the response stream
+        
+        Returns:
+            Payload bytes (after the "data: " prefix) of each complete line
+        """
+        buf = self._buf
+        buf += chunk
+        
+        payloads = []
+        start = 0
+        newline = buf.find(b"\n")
+        
+        while newline != -1:
+            if buf.startswith(b"data: ", start, newline):
+                end = newline
+                if end > start and buf[end - 1] == 0x0D:  # trailing "\r"
+                    end -= 1
+                payloads.append(bytes(buf[start + 6:end]))
+            
+            start = newline + 1
+            newline = buf.find(b"\n", start)
+        
+        if start:
+            del buf[:start]
+        
+        return payloads
+
+
+async def aclose_http_client() -> None:
+    """Close the shared HTTP client (call on application shutdown)."""
+    global _CLIENT
+    
+    if _CLIENT is not None:
+        await _CLIENT.aclose()
+        _CLIENT = None
 
 
 class AgentClient:
@@ -35,6 +136,31 @@ class AgentClient:
         self.top_p = config.top_p
         self.context_size = config.context_size
         
+        # Invariant request parts, built once per client
+        self._completions_url = f"{self.model_url}/v1/chat/completions"
+        self._default_max_tokens = 2048
+        self._system_msg = {"role": "system", "content": self.system_prompt}
+        self._base_params = {
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+            "stream": False,
+            "cache_prompt": config.cache_prompt
+        }
+        if config.slot_id is not None:
+            self._base_params["id_slot"] = config.slot_id
+        
+        # Optional request coalescing (shared per model server)
+        self._batcher = None
+        if settings.agent_batching_enabled:
+            self._batcher = get_batcher(
+                self._completions_url,
+                max_batch_size=settings.agent_batch_max_size,
+                batch_wait_timeout_s=settings.agent_batch_wait_ms / 1000
+            )
+        
+        # Optional response cache (exact + semantic)
+        self._cache = response_cache if settings.response_cache_enabled else None
+        
         logger.info(f"Initialized {role.value} agent client -> {self.model_url}")
     
     async def generate(
@@ -58,41 +184,55 @@ class AgentClient:
         """
         # Prepare request
         request_data = {
-            "messages": [
-                {"role": "system", "content": self.system_prompt},
-                {"role": "user", "content": prompt}
-            ],
-            "temperature": temperature if temperature is not None else self.temperature,
-            "top_p": self.top_p,
-            "max_tokens": max_tokens or 2048,
-            "stream": False
+            **self._base_params,
+            "messages": [self._system_msg, {"role": "user", "content": prompt}],
+            "max_tokens": max_tokens or self._default_max_tokens
         }
         
+        if temperature is not None:
+            request_data["temperature"] = temperature
+        
         if stop:
             request_data["stop"] = stop
         
+        cache_params = None
+        if self._cache is not None:
+            cache_params = {
+                "temperature": request_data["temperature"],
+                "top_p": self.top_p,
+                "max_tokens": request_data["max_tokens"],
+                "stop": stop
+            }
+            cached = await self._cache.get(
+                self.role.value, self.system_prompt, prompt, cache_params
+            )
+            if cached is not None:
+                return cached
+        
         try:
-            async with httpx.AsyncClient(timeout=120.0) as client:
-                logger.debug(f"Calling {self.role.value} at {self.model_url}")
-                
-                response = await client.post(
-                    f"{self.model_url}/v1/chat/completions",
-                    json=request_data
-                )
-                response.raise_for_status()
-                
-                data = response.json()
-                content = data["choices"][0]["message"]["content"]
-                
-                logger.info(
-                    f"{self.role.value} generated {len(content.split())} words"
+            logger.debug(f"Calling {self.role.value} at {self.model_url}")
+            
+            if request_data["temperature"] == 0:
+                data = await self._send_deduplicated(request_data)
+            else:
+                data = await self._send(request_data)
+            
+            content = data["choices"][0]["message"]["content"]
+            
+            logger.info(f"{self.role.value} generated {len(content)} chars")
+            
+            result = {
+                "content": content,
+                "model": self.model_name,
+                "usage": data.get("usage", {})
+            }
+            
+            if cache_params is not None:
+                await self._cache.set(
+                    self.role.value, self.system_prompt, prompt, cache_params, result
                 )
-                
-                return {
-                    "content": content,
-                    "model": self.model_name,
-                    "usage": data.get("usage", {})
-                }
+            
+            return result
         
         except httpx.HTTPError as e:
             logger.error(f"HTTP error calling {self.role.value}: {e}")
@@ -101,6 +241,43 @@ class AgentClient:
             logger.error(f"Error calling {self.role.value}: {e}")
             raise
     
+    async def _send(self, request_data: dict) -> dict:
+        """Send a completion request and return the decoded response."""
+        
+        if self._batcher is not None:
+            return await self._batcher.submit(request_data)
+        
+        response = await get_http_client().post(
+            self._completions_url,
+            content=orjson.dumps(request_data),
+            headers=JSON_HEADERS
+        )
+        response.raise_for_status()
+        return orjson.loads(response.content)
+    
+    async def _send_deduplicated(self, request_data: dict) -> dict:
+        """
+        Send a deterministic request, sharing any identical one in flight.
+        
+        Only used for temperature 0, where identical payloads must produce
+        identical outputs; sampled requests are always sent independently.
+        """
+        payload = orjson.dumps(request_data, option=orjson.OPT_SORT_KEYS)
+        key = hashlib.blake2b(
+            self._completions_url.encode() + b"|" + payload
+        ).hexdigest()
+        
+        task = _INFLIGHT.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._send(request_data))
+            _INFLIGHT[key] = task
+            task.add_done_callback(lambda _: _INFLIGHT.pop(key, None))
+        else:
+            logger.debug(f"Joining in-flight {self.role.value} request")
+        
+        # Shield so one cancelled caller does not cancel the shared request
+        return await asyncio.shield(task)
+    
     async def generate_streaming(
         self,
         prompt: str,
@@ -117,38 +294,36 @@ class AgentClient:
             Tokens as they're generated
         """
         request_data = {
-            "messages": [
-                {"role": "system", "content": self.system_prompt},
-                {"role": "user", "content": prompt}
-            ],
-            "temperature": self.temperature,
-            "top_p": self.top_p,
-            "max_tokens": max_tokens or 2048,
+            **self._base_params,
+            "messages": [self._system_msg, {"role": "user", "content": prompt}],
+            "max_tokens": max_tokens or self._default_max_tokens,
             "stream": True
         }
         
         try:
-            async with httpx.AsyncClient(timeout=120.0) as client:
-                async with client.stream(
-                    "POST",
-                    f"{self.model_url}/v1/chat/completions",
-                    json=request_data
-                ) as response:
-                    async for line in response.aiter_lines():
-                        if line.startswith("data: "):
-                            data_str = line[6:]
-                            if data_str == "[DONE]":
-                                break
-                            
-                            try:
-                                import json
-                                data = json.loads(data_str)
-                                if "choices" in data:
-                                    delta = data["choices"][0].get("delta", {})
-                                    if "content" in delta:
-                                        yield delta["content"]
-                            except json.JSONDecodeError:
-                                continue
+            client = get_http_client()
+            async with client.stream(
+                "POST",
+                self._completions_url,
+                content=orjson.dumps(request_data),
+                headers=JSON_HEADERS
+            ) as response:
+                sse = SSELineBuffer()
+                
+                async for chunk in response.aiter_bytes():
+                    for payload in sse.feed(chunk):
+                        if payload == b"[DONE]":
+                            return
+                        
+                        try:
+                            data = orjson.loads(payload)
+                        except orjson.JSONDecodeError:
+                            continue
+                        
+                        if "choices" in data:
+                            delta = data["choices"][0].get("delta", {})
+                            if "content" in delta:
+                                yield delta["content"]
         
         except Exception as e:
             logger.error(f"Streaming error: {e}")
@@ -0,0 +1,153 @@
+"""
+Request coalescing for llama.cpp model servers.
+"""
+
+import asyncio
+import orjson
+from typing import Dict, List, Optional, Tuple
+from loguru import logger
+
+
+class GenerationBatcher:
+    """
+    Coalesces concurrent generation requests to a single model server.
+    
+    Requests arriving within a short window are grouped by their full
+    payload. Identical payloads (e.g. N consensus samples of the same
+    prompt) are sent as one /v1/chat/completions call with "n" set to the
+    group size, and each awaiter receives its own choice. Distinct payloads
+    are dispatched concurrently over the shared connection pool.
+    """
+    
+    def __init__(
+        self,
+        completions_url: str,
+        max_batch_size: int = 8,
+        batch_wait_timeout_s: float = 0.02
+    ):
+        self.completions_url = completions_url
+        self.max_batch_size = max_batch_size
+        self.batch_wait_timeout_s = batch_wait_timeout_s
+        
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    async def submit(self, request_data: dict) -> dict:
+        """
+        Queue a request and wait for its response.
+        
+        Args:
+            request_data: OpenAI-compatible chat completion payload
+        
+        Returns:
+            Response data containing a single choice
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Queues and futures are bound to the loop that created them
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = None
+        
+        future = loop.create_future()
+        await self._queue.put((request_data, future))
+        
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        
+        return await future
+    
+    async def _run(self) -> None:
+        """Drain the queue into batches and dispatch them."""
+        
+        while True:
+            batch = [await self._queue.get()]
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.batch_wait_timeout_s
+            
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(
+                        await asyncio.wait_for(self._queue.get(), timeout=remaining)
+                    )
+                except asyncio.TimeoutError:
+                    break
+            
+            # Group identical payloads so each group can share one request
+            groups: Dict[bytes, List[Tuple[dict, asyncio.Future]]] = {}
+            for request_data, future in batch:
+                key = orjson.dumps(request_data, option=orjson.OPT_SORT_KEYS)
+                groups.setdefault(key, []).append((request_data, future))
+            
+            for group in groups.values():
+                asyncio.create_task(self._dispatch(group))
+    
+    async def _dispatch(self, group: List[Tuple[dict, asyncio.Future]]) -> None:
+        """Send one request for a group and resolve every awaiter."""
+        from src.agents.agent_client import JSON_HEADERS, get_http_client
+        
+        request_data = group[0][0]
+        if len(group) > 1:
+            request_data = {**request_data, "n": len(group)}
+        
+        try:
+            response = await get_http_client().post(
+                self.completions_url,
+                content=orjson.dumps(request_data),
+                headers=JSON_HEADERS
+            )
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+        except Exception as e:
+            for _, future in group:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        if len(group) == 1:
+            if not group[0][1].done():
+                group[0][1].set_result(data)
+            return
+        
+        choices = data.get("choices", [])
+        logger.debug(
+            f"Batched {len(group)} requests into one call "
+            f"({len(choices)} choices returned)"
+        )
+        
+        for i, (single_request, future) in enumerate(group):
+            if future.done():
+                continue
+            
+            if i < len(choices):
+                future.set_result({**data, "choices": [choices[i]]})
+            else:
+                # Server ignored "n" - fall back to an individual request
+                asyncio.create_task(self._dispatch([(single_request, future)]))
+
+
+# Per-endpoint batchers shared by all agent clients
+_BATCHERS: Dict[str, GenerationBatcher] = {}
+
+
+def get_batcher(
+    completions_url: str,
+    max_batch_size: int = 8,
+    batch_wait_timeout_s: float = 0.02
+) -> GenerationBatcher:
+    """Get (or create) the batcher for a completions endpoint."""
+    
+    batcher = _BATCHERS.get(completions_url)
+    if batcher is None:
+        batcher = GenerationBatcher(
+            completions_url,
+            max_batch_size=max_batch_size,
+            batch_wait_timeout_s=batch_wait_timeout_s
+        )
+        _BATCHERS[completions_url] = batcher
+    
+    return batcher
@@ -0,0 +1,171 @@
+"""
+Response cache for agent generations.
+"""
+
+import asyncio
+import hashlib
+from typing import Optional
+import orjson
+import redis.asyncio as aioredis
+from loguru import logger
+
+from src.core.config import settings
+
+
+class ResponseCache:
+    """
+    Two-tier cache in front of model server calls.
+    
+    Tiers:
+    1. Exact: BLAKE2b hash of role + system prompt + prompt + params,
+       stored in Redis with a TTL
+    2. Semantic (optional): prompt embeddings in a ChromaDB collection;
+       a near-duplicate prompt (cosine similarity above threshold) with the
+       same role and params resolves to the exact-tier entry it points at
+    
+    Cache failures are logged and treated as misses.
+    """
+    
+    def __init__(
+        self,
+        ttl_seconds: int = 3600,
+        semantic: bool = False,
+        similarity_threshold: float = 0.95
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.semantic = semantic
+        self.similarity_threshold = similarity_threshold
+        
+        self._redis = aioredis.Redis.from_url(settings.redis_url)
+        self._collection = None
+    
+    def _get_collection(self):
+        """Lazily create the ChromaDB collection for semantic lookups."""
+        if self._collection is None:
+            import chromadb
+            from chromadb.utils import embedding_functions
+            
+            client = chromadb.PersistentClient(path=str(settings.chromadb_persist_dir))
+            self._collection = client.get_or_create_collection(
+                name="response_cache",
+                embedding_function=embedding_functions.SentenceTransformerEmbeddingFunction(
+                    model_name="all-MiniLM-L6-v2"
+                ),
+                metadata={"hnsw:space": "cosine"}
+            )
+        return self._collection
+    
+    @staticmethod
+    def _digest(*parts: str) -> str:
+        """Hash cache key parts."""
+        return hashlib.blake2b("|".join(parts).encode()).hexdigest()
+    
+    async def get(
+        self,
+        role: str,
+        system_prompt: str,
+        prompt: str,
+        params: dict
+    ) -> Optional[dict]:
+        """
+        Look up a cached response.
+        
+        Args:
+            role: Agent role value
+            system_prompt: Agent system prompt
+            prompt: User prompt
+            params: Sampling parameters that affect the output
+        
+        Returns:
+            Cached response dictionary or None on miss
+        """
+        params_str = orjson.dumps(params, option=orjson.OPT_SORT_KEYS).decode()
+        key = self._digest(role, system_prompt, prompt, params_str)
+        
+        try:
+            cached = await self._redis.get(f"hydra:response:{key}")
+            if cached is not None:
+                logger.debug(f"Response cache hit for {role}")
+                return orjson.loads(cached)
+            
+            if self.semantic:
+                namespace = self._digest(role, system_prompt, params_str)
+                similar_key = await asyncio.to_thread(
+                    self._semantic_lookup, prompt, namespace
+                )
+                if similar_key:
+                    cached = await self._redis.get(f"hydra:response:{similar_key}")
+                    if cached is not None:
+                        logger.debug(f"Semantic response cache hit for {role}")
+                        return orjson.loads(cached)
+        
+        except Exception as e:
+            logger.warning(f"Response cache lookup failed: {e}")
+        
+        return None
+    
+    async def set(
+        self,
+        role: str,
+        system_prompt: str,
+        prompt: str,
+        params: dict,
+        response: dict
+    ) -> None:
+        """
+        Store a response.
+        
+        Args:
+            role: Agent role value
+            system_prompt: Agent system prompt
+            prompt: User prompt
+            params: Sampling parameters that affect the output
+            response: Response dictionary to cache
+        """
+        params_str = orjson.dumps(params, option=orjson.OPT_SORT_KEYS).decode()
+        key = self._digest(role, system_prompt, prompt, params_str)
+        
+        try:
+            await self._redis.setex(
+                f"hydra:response:{key}",
+                self.ttl_seconds,
+                orjson.dumps(response)
+            )
+            
+            if self.semantic:
+                namespace = self._digest(role, system_prompt, params_str)
+                await asyncio.to_thread(
+                    self._get_collection().upsert,
+                    ids=[key],
+                    documents=[prompt],
+                    metadatas=[{"namespace": namespace}]
+                )
+        
+        except Exception as e:
+            logger.warning(f"Response cache store failed: {e}")
+    
+    def _semantic_lookup(self, prompt: str, namespace: str) -> Optional[str]:
+        """Find the key of a near-duplicate prompt in the same namespace."""
+        
+        results = self._get_collection().query(
+            query_texts=[prompt],
+            n_results=1,
+            where={"namespace": namespace}
+        )
+        
+        if not results["ids"][0]:
+            return None
+        
+        # Cosine distance = 1 - cosine similarity
+        if 1.0 - results["distances"][0][0] >= self.similarity_threshold:
+            return results["ids"][0][0]
+        
+        return None
+
+
+# Global response cache instance
+response_cache = ResponseCache(
+    ttl_seconds=settings.response_cache_ttl_seconds,
+    semantic=settings.response_cache_semantic,
+    similarity_threshold=settings.response_cache_similarity
+)
@@ -2,13 +2,45 @@
 Agent registry for managing multi-model routing.
 """
 
-from typing import Dict, Optional
+import re
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional
 from dataclasses import dataclass
 
-from src.core.config import settings
+from src.core.config import FROZEN
 from src.core.models import AgentRole
 
 
+# Routing keywords in priority order (first matching category wins)
+ROUTING_KEYWORDS = (
+    (AgentRole.ARCHITECT, ("plan", "architect", "design", "schema", "api", "structure")),
+    (AgentRole.WORKER_FRONTEND, ("frontend", "ui", "react", "vue", "component", "css", "html")),
+    (AgentRole.WORKER_BACKEND, ("backend", "api", "database", "server", "python", "go")),
+    (AgentRole.QA_SENTINEL, ("test", "verify", "qa", "validate", "check")),
+)
+
+
+# System prompts live in src/prompts/<agent_type>.md
+PROMPTS_DIR = Path(__file__).resolve().parent.parent / "prompts"
+
+
+@lru_cache(maxsize=None)
+def load_system_prompt(agent_type: str) -> str:
+    """
+    Load the system prompt for an agent type from disk.
+    
+    Each prompt is read once per process and shared by every caller.
+    """
+    prompt_file = PROMPTS_DIR / f"{agent_type}.md"
+    
+    if not prompt_file.exists():
+        return "You are a helpful AI assistant."
+    
+    return prompt_file.read_text(encoding="utf-8").strip()
+
+
 @dataclass
 class AgentConfig:
     """Configuration for a specific agent."""
@@ -19,6 +51,8 @@ class AgentConfig:
     temperature: float
     top_p: float
     system_prompt: str
+    cache_prompt: bool = True
+    slot_id: Optional[int] = None
 
 
 class AgentRegistry:
@@ -26,7 +60,25 @@ class AgentRegistry:
     
     def __init__(self):
         self._agents: Dict[AgentRole, AgentConfig] = {}
+        self._agents_view = MappingProxyType(self._agents)
         self._initialize_agents()
+        self._build_router()
+    
+    def _build_router(self) -> None:
+        """Compile routing keywords into a single regex scan."""
+        
+        # keyword -> (priority, role); a keyword keeps its highest-priority role
+        self._route_keywords: Dict[str, tuple] = {}
+        for priority, (role, keywords) in enumerate(ROUTING_KEYWORDS):
+            for keyword in keywords:
+                self._route_keywords.setdefault(keyword, (priority, role))
+        
+        # Zero-width lookahead reports overlapping matches, preserving the
+        # plain substring semantics of the keyword lists
+        alternation = "|".join(
+            re.escape(k) for k in sorted(self._route_keywords, key=len, reverse=True)
+        )
+        self._route_re = re.compile(f"(?=({alternation}))")
     
     def _initialize_agents(self) -> None:
         """Initialize all agents with their configurations."""
@@ -34,9 +86,9 @@ class AgentRegistry:
         # Architect Agent
         self._agents[AgentRole.ARCHITECT] = AgentConfig(
             role=AgentRole.ARCHITECT,
-            model_url=settings.architect_url,
-            model_name=settings.architect_model,
-            context_size=settings.context_size_architect,
+            model_url=FROZEN.architect_url,
+            model_name=FROZEN.architect_model,
+            context_size=FROZEN.context_size_architect,
             temperature=0.7,
             top_p=0.9,
             system_prompt=self._load_system_prompt("architect")
@@ -45,9 +97,9 @@ class AgentRegistry:
         # Backend Worker
         self._agents[AgentRole.WORKER_BACKEND] = AgentConfig(
             role=AgentRole.WORKER_BACKEND,
-            model_url=settings.worker_backend_url,
-            model_name=settings.worker_backend_model,
-            context_size=settings.context_size_worker,
+            model_url=FROZEN.worker_backend_url,
+            model_name=FROZEN.worker_backend_model,
+            context_size=FROZEN.context_size_worker,
             temperature=0.6,
             top_p=0.9,
             system_prompt=self._load_system_prompt("worker_backend")
@@ -56,9 +108,9 @@ class AgentRegistry:
         # Frontend Worker
         self._agents[AgentRole.WORKER_FRONTEND] = AgentConfig(
             role=AgentRole.WORKER_FRONTEND,
-            model_url=settings.worker_frontend_url,
-            model_name=settings.worker_frontend_model,
-            context_size=settings.context_size_worker,
+            model_url=FROZEN.worker_frontend_url,
+            model_name=FROZEN.worker_frontend_model,
+            context_size=FROZEN.context_size_worker,
             temperature=0.6,
             top_p=0.9,
             system_prompt=self._load_system_prompt("worker_frontend")
@@ -67,9 +119,9 @@ class AgentRegistry:
         # QA Sentinel
         self._agents[AgentRole.QA_SENTINEL] = AgentConfig(
             role=AgentRole.QA_SENTINEL,
-            model_url=settings.qa_url,
-            model_name=settings.qa_model,
-            context_size=settings.context_size_qa,
+            model_url=FROZEN.qa_url,
+            model_name=FROZEN.qa_model,
+            context_size=FROZEN.context_size_qa,
             temperature=0.3,  # Lower temp for strict verification
             top_p=0.95,
             system_prompt=self._load_system_prompt("qa_sentinel")
@@ -78,140 +130,65 @@ class AgentRegistry:
         # Consensus Judge
         self._agents[AgentRole.CONSENSUS_JUDGE] = AgentConfig(
             role=AgentRole.CONSENSUS_JUDGE,
-            model_url=settings.judge_url,
-            model_name=settings.judge_model,
-            context_size=settings.context_size_qa,
+            model_url=FROZEN.judge_url,
+            model_name=FROZEN.judge_model,
+            context_size=FROZEN.context_size_qa,
             temperature=0.4,  # Moderate temp for judging
             top_p=0.95,
             system_prompt=self._load_system_prompt("consensus_judge")
         )
+        
+        # Keep each role's system prompt KV resident on the model server:
+        # reuse the cached prefix and, if slots are configured, always hit
+        # the same slot
+        for index, config in enumerate(self._agents.values()):
+            config.cache_prompt = FROZEN.llama_cache_prompt
+            if FROZEN.llama_slot_count > 0:
+                config.slot_id = index % FROZEN.llama_slot_count
     
     def _load_system_prompt(self, agent_type: str) -> str:
         """Load system prompt for agent type."""
-        # TODO: Load from prompts/*.md files
-        prompts = {
-            "architect": """You are a Principal Software Architect for an autonomous AI development team.
-
-Your role:
-- Analyze requirements and create detailed technical specifications
-- Design system architecture and choose appropriate technologies
-- Create task breakdowns with clear dependencies
-- Define API contracts and data schemas
-- Ensure scalability, security, and maintainability
-
-Output format:
-- Clear markdown documents
-- Structured task lists with dependencies
-- API schemas in OpenAPI format
-- Database schemas when applicable
-
-Constraints:
-- Never write implementation code
-- Focus on high-level design
-- Consider multiple approaches
-- Document architectural decisions""",
-            
-            "worker_backend": """You are a Senior Backend Developer specializing in Python, Go, and Node.js.
-
-Your role:
-- Implement backend services and APIs
-- Write clean, efficient, and maintainable code
-- Follow architectural specifications exactly
-- Include error handling and logging
-- Write clear comments for complex logic
-
-Guidelines:
-- Follow PEP 8 for Python, standard conventions for other languages
-- Use type hints/annotations
-- Prefer async/await for I/O operations
-- Include docstrings for public functions
-- Handle errors gracefully""",
-            
-            "worker_frontend": """You are a Senior Frontend Developer specializing in React, Vue, and modern CSS.
-
-Your role:
-- Implement user interfaces and components
-- Write semantic HTML and accessible components
-- Create responsive designs
-- Follow component architecture
-- Optimize for performance
-
-Guidelines:
-- Use modern ES6+ JavaScript/TypeScript
-- Follow React/Vue best practices
-- Write reusable components
-- Include PropTypes/TypeScript types
-- Ensure WCAG accessibility""",
-            
-            "qa_sentinel": """You are a Lead QA Engineer focused on code quality and security.
-
-Your role:
-- Verify code against specifications
-- Identify bugs, security vulnerabilities, and edge cases
-- Generate comprehensive test cases
-- Provide specific, actionable feedback
-- Ensure best practices are followed
-
-Verification criteria:
-- Correctness: Does it meet requirements?
-- Security: Any vulnerabilities?
-- Performance: Any bottlenecks?
-- Maintainability: Is it readable and documented?
-- Testing: Are edge cases handled?
-
-Output: PASS or FAIL with specific issues and recommendations.""",
-            
-            "consensus_judge": """You are an impartial Technical Judge evaluating multiple code solutions.
-
-Your role:
-- Compare code candidates objectively
-- Score based on clear criteria (correctness, performance, readability, maintainability)
-- Provide reasoning for your decision
-- Select the best overall solution
-
-Scoring criteria (0-1 scale):
-- Correctness (40%): Meets requirements, no bugs
-- Performance (20%): Efficient algorithms, no bottlenecks
-- Readability (20%): Clear code, good structure
-- Maintainability (20%): Modular, documented, testable
-
-Output: Winner selection with scores and reasoning."""
-        }
-        
-        return prompts.get(agent_type, "You are a helpful AI assistant.")
+        return load_system_prompt(agent_type)
     
     def get_agent(self, role: AgentRole) -> Optional[AgentConfig]:
         """Get agent configuration by role."""
         return self._agents.get(role)
     
-    def get_all_agents(self) -> Dict[AgentRole, AgentConfig]:
-        """Get all registered agents."""
-        return self._agents.copy()
-    
-    def route_task_to_agent(self, task_description: str) -> AgentRole:
-        """Route a task to the appropriate agent based on content."""
-        description_lower = task_description.lower()
+    def get_all_agents(self) -> Mapping[AgentRole, AgentConfig]:
+        """
+        Get all registered agents.
         
-        # Keywords for routing
-        if any(keyword in description_lower for keyword in [
-            "plan", "architect", "design", "schema", "api", "structure"
-        ]):
-            return AgentRole.ARCHITECT
+        Returns a read-only live view of the registry; mutation is not
+        supported (copy with dict() if a mutable mapping is needed).
+        """
+        return self._agents_view
+    
+    def route_task_to_agent(
+        self,
+        task_description: str,
+        desc_lower: Optional[str] = None
+    ) -> AgentRole:
+        """
+        Route a task to the appropriate agent based on content.
         
-        if any(keyword in description_lower for keyword in [
-            "frontend", "ui", "react", "vue", "component", "css", "html"
-        ]):
-            return AgentRole.WORKER_FRONTEND
+        Args:
+            task_description: Task description
+            desc_lower: Lowercased description, if the caller already has it
+        """
+        if desc_lower is None:
+            desc_lower = task_description.lower()
+        best = None
         
-        if any(keyword in description_lower for keyword in [
-            "backend", "api", "database", "server", "python", "go"
-        ]):
-            return AgentRole.WORKER_BACKEND
+        # One pass over the description for all keyword categories
+        for match in self._route_re.finditer(desc_lower):
+            priority, role = self._route_keywords[match.group(1)]
+            if priority == 0:
+                return role
+            if best is None or priority < best[0]:
+                best = (priority, role)
         
-        if any(keyword in description_lower for keyword in [
-            "test", "verify", "qa", "validate", "check"
-        ]):
-            return AgentRole.QA_SENTINEL
+        if best is not None:
+            return best[1]
         
         # Default to architect for ambiguous tasks
         return AgentRole.ARCHITECT
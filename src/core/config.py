@@ -2,6 +2,8 @@
 Configuration management for Project Hydra-Consensus.
 """
 
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 from pydantic import Field
@@ -43,15 +45,49 @@ class Settings(BaseSettings):
     memory_dir: Path = Field(default=Path("./memory"), description="Memory persistence directory")
     chromadb_persist_dir: Path = Field(default=Path("./memory/chromadb"))
     redis_persist_dir: Path = Field(default=Path("./memory/redis"))
+    fitness_cache_dir: Path = Field(default=Path("./memory/fitness_cache"), description="On-disk fitness result cache")
+    spec_io_timeout_seconds: float = Field(default=10.0, gt=0.0, description="Timeout for spec/plan/tasks file reads")
+    tasks_flush_delay_seconds: float = Field(default=0.5, ge=0.0, description="Delay before status updates are written to tasks.md")
+    memory_search_cache_size: int = Field(default=512, ge=0, description="Max cached memory search results (0 disables)")
+    memory_search_cache_ttl_seconds: float = Field(default=300.0, gt=0.0, description="Memory search cache entry lifetime")
+    memory_semantic_cache_size: int = Field(default=256, ge=0, description="Max query embeddings in the semantic search cache (0 disables)")
+    memory_semantic_cache_threshold: float = Field(default=0.95, ge=0.0, le=1.0, description="Cosine similarity for a semantic search cache hit")
+    memory_embedding_cache_size: int = Field(default=2048, ge=0, description="Max cached document embeddings reused on store (0 disables)")
+    memory_hot_mirror_max_entries: int = Field(default=2000, ge=0, description="Collections up to this size are searched from an in-memory copy (0 disables)")
     
     # Consensus Configuration
     consensus_n_candidates: int = Field(default=3, ge=1, le=10, description="Number of parallel candidates")
     consensus_min_votes: int = Field(default=2, ge=1, description="Minimum votes for consensus")
     consensus_timeout_seconds: int = Field(default=300, ge=30, description="Consensus timeout")
+    consensus_max_parallel_judges: int = Field(default=4, ge=1, description="Max concurrent per-candidate judge calls")
+    consensus_max_inflight: int = Field(default=16, ge=1, description="Max concurrent agent calls per consensus engine")
+    
+    # Agent Client Configuration
+    agent_batching_enabled: bool = Field(default=False, description="Coalesce concurrent identical generations into one request")
+    agent_batch_max_size: int = Field(default=8, ge=1, description="Max requests per coalesced batch")
+    agent_batch_wait_ms: int = Field(default=20, ge=0, description="Batch collection window")
+    response_cache_enabled: bool = Field(default=False, description="Cache agent responses in Redis")
+    response_cache_ttl_seconds: int = Field(default=3600, ge=1, description="Response cache TTL")
+    response_cache_semantic: bool = Field(default=False, description="Also match near-duplicate prompts")
+    response_cache_similarity: float = Field(default=0.95, ge=0.0, le=1.0, description="Semantic cache cosine threshold")
+    http_max_connections: int = Field(default=100, ge=1, description="Max pooled connections to model servers")
+    http_max_keepalive_connections: int = Field(default=20, ge=0, description="Max idle keepalive connections")
+    http_keepalive_expiry: float = Field(default=60.0, ge=0.0, description="Idle keepalive expiry in seconds")
+    http_connect_timeout: float = Field(default=5.0, gt=0.0, description="Model server connect timeout")
+    http_read_timeout: float = Field(default=120.0, gt=0.0, description="Model server read timeout")
+    http_write_timeout: float = Field(default=10.0, gt=0.0, description="Model server write timeout")
+    http_pool_timeout: float = Field(default=5.0, gt=0.0, description="Wait for a free pooled connection")
+    llama_cache_prompt: bool = Field(default=True, description="Ask llama.cpp to reuse the KV cache of a shared prompt prefix")
+    llama_slot_count: int = Field(default=0, ge=0, description="llama.cpp server slots (-np) to pin roles to; 0 lets the server choose")
     
     # Execution Configuration
     docker_sandbox_enabled: bool = Field(default=True, description="Enable Docker sandboxing")
     docker_sandbox_timeout: int = Field(default=600, ge=60, description="Sandbox timeout")
+    docker_pool_max_idle: int = Field(default=2, ge=0, description="Pre-started single-use sandbox containers kept per image (0 disables)")
+    docker_max_containers: int = Field(default=4, ge=1, description="Max sandbox runs holding a container at once")
+    docker_pool_idle_seconds: float = Field(default=300.0, gt=0.0, description="Idle time before a warm sandbox container is removed")
+    docker_output_max_bytes: int = Field(default=1_048_576, ge=1024, description="Sandbox output kept per run (the tail is kept)")
+    docker_workspace_dir: Optional[Path] = Field(default=None, description="Parent of sandbox work directories, e.g. a tmpfs mount (system temp dir if unset)")
     max_parallel_tasks: int = Field(default=4, ge=1, le=10, description="Max parallel tasks")
     
     # Web Tools Configuration
@@ -88,6 +124,7 @@ class Settings(BaseSettings):
             self.memory_dir,
             self.chromadb_persist_dir,
             self.redis_persist_dir,
+            self.fitness_cache_dir,
             self.log_file.parent,
             Path("./specs"),
             Path("./agent-zero"),
@@ -97,5 +134,55 @@ class Settings(BaseSettings):
             directory.mkdir(parents=True, exist_ok=True)
 
 
+@dataclass(frozen=True, slots=True)
+class _FrozenSettings:
+    """
+    Immutable snapshot of the settings read on hot paths.
+    
+    Pydantic validates once at load time; after that these fields are plain
+    slot reads.
+    """
+    architect_url: str
+    architect_model: str
+    worker_backend_url: str
+    worker_backend_model: str
+    worker_frontend_url: str
+    worker_frontend_model: str
+    qa_url: str
+    qa_model: str
+    judge_url: str
+    judge_model: str
+    context_size_architect: int
+    context_size_worker: int
+    context_size_qa: int
+    llama_cache_prompt: bool
+    llama_slot_count: int
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Get the process-wide settings instance."""
+    return Settings()
+
+
 # Global settings instance
-settings = Settings()
\ No newline at end of file
+settings = get_settings()
+
+# Frozen snapshot for hot-path lookups
+FROZEN = _FrozenSettings(
+    architect_url=settings.architect_url,
+    architect_model=settings.architect_model,
+    worker_backend_url=settings.worker_backend_url,
+    worker_backend_model=settings.worker_backend_model,
+    worker_frontend_url=settings.worker_frontend_url,
+    worker_frontend_model=settings.worker_frontend_model,
+    qa_url=settings.qa_url,
+    qa_model=settings.qa_model,
+    judge_url=settings.judge_url,
+    judge_model=settings.judge_model,
+    context_size_architect=settings.context_size_architect,
+    context_size_worker=settings.context_size_worker,
+    context_size_qa=settings.context_size_qa,
+    llama_cache_prompt=settings.llama_cache_prompt,
+    llama_slot_count=settings.llama_slot_count,
+)
\ No newline at end of file
@@ -2,10 +2,16 @@
 Pydantic models for Project Hydra-Consensus.
 """
 
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
-from typing import Any, Dict, List, Optional
-from pydantic import BaseModel, Field
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+import numpy as np
+from pydantic import BaseModel, ConfigDict, Field, field_serializer, field_validator
+
+
+def utc_now() -> datetime:
+    """Timezone-aware UTC timestamp (replaces deprecated datetime.utcnow)."""
+    return datetime.now(timezone.utc)
 
 
 class AgentRole(str, Enum):
@@ -42,15 +48,17 @@ class Task(BaseModel):
     status: TaskStatus = Field(default=TaskStatus.PENDING)
     priority: TaskPriority = Field(default=TaskPriority.MEDIUM)
     assigned_agent: Optional[AgentRole] = None
-    dependencies: List[str] = Field(default_factory=list, description="Task IDs this task depends on")
-    blocked_by: List[str] = Field(default_factory=list, description="Task IDs blocking this task")
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    dependencies: FrozenSet[str] = Field(default_factory=frozenset, description="Task IDs this task depends on")
+    blocked_by: FrozenSet[str] = Field(default_factory=frozenset, description="Task IDs blocking this task")
+    created_at: datetime = Field(default_factory=utc_now)
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     metadata: Dict[str, Any] = Field(default_factory=dict)
     
-    class Config:
-        json_schema_extra = {
+    # Tasks are updated in place as they progress, so they stay mutable
+    model_config = ConfigDict(
+        validate_assignment=False,
+        json_schema_extra={
             "example": {
                 "id": "task_001",
                 "title": "Implement user authentication",
@@ -60,21 +68,104 @@ class Task(BaseModel):
                 "dependencies": [],
             }
         }
+    )
+    
+    @field_serializer("dependencies", "blocked_by")
+    def _serialize_id_set(self, value: FrozenSet[str]) -> List[str]:
+        """Serialize ID sets as sorted lists for stable JSON output."""
+        return sorted(value)
+
+
+class TaskTable:
+    """
+    Structure-of-arrays view of a task graph.
+    
+    Keeps task IDs, status codes, priority codes and unmet-dependency counts
+    in parallel NumPy arrays, so finding ready tasks (pending with every
+    dependency completed) is one vectorized pass instead of a loop over Task
+    objects. Dependencies on IDs not in the table are ignored.
+    
+    With all_pending, stored statuses are ignored and every task starts
+    pending, e.g. to order a whole graph into waves (see topo_sort_tasks).
+    """
+    
+    STATUS_CODES = {status: code for code, status in enumerate(TaskStatus)}
+    PRIORITY_CODES = {priority: code for code, priority in enumerate(TaskPriority)}
+    
+    def __init__(self, tasks: Iterable[Task], all_pending: bool = False):
+        tasks = list(tasks)
+        n = len(tasks)
+        
+        self.ids = np.array([task.id for task in tasks], dtype=object)
+        self._index = {task.id: i for i, task in enumerate(tasks)}
+        
+        if all_pending:
+            self.status = np.full(n, self.STATUS_CODES[TaskStatus.PENDING], dtype=np.uint8)
+        else:
+            self.status = np.fromiter(
+                (self.STATUS_CODES[task.status] for task in tasks), dtype=np.uint8, count=n
+            )
+        self.priority = np.fromiter(
+            (self.PRIORITY_CODES[task.priority] for task in tasks), dtype=np.uint8, count=n
+        )
+        
+        # Reverse edges: dependency index -> indices of tasks waiting on it
+        self._dependents: List[List[int]] = [[] for _ in range(n)]
+        self.n_unmet = np.zeros(n, dtype=np.uint16)
+        completed = self.STATUS_CODES[TaskStatus.COMPLETED]
+        
+        for i, task in enumerate(tasks):
+            for dep_id in task.dependencies:
+                dep = self._index.get(dep_id)
+                if dep is None:
+                    continue
+                self._dependents[dep].append(i)
+                if self.status[dep] != completed:
+                    self.n_unmet[i] += 1
+    
+    def ready_ids(self) -> List[str]:
+        """Get IDs of pending tasks whose dependencies are all completed."""
+        mask = (self.status == self.STATUS_CODES[TaskStatus.PENDING]) & (self.n_unmet == 0)
+        return self.ids[mask].tolist()
+    
+    def set_status(self, task_id: str, status: TaskStatus) -> None:
+        """
+        Update a task's status and its dependents' unmet counts.
+        
+        Args:
+            task_id: Task identifier
+            status: New status
+        """
+        i = self._index[task_id]
+        completed = self.STATUS_CODES[TaskStatus.COMPLETED]
+        was_completed = self.status[i] == completed
+        self.status[i] = self.STATUS_CODES[status]
+        
+        if status == TaskStatus.COMPLETED and not was_completed:
+            for dependent in self._dependents[i]:
+                self.n_unmet[dependent] -= 1
+        elif status != TaskStatus.COMPLETED and was_completed:
+            for dependent in self._dependents[i]:
+                self.n_unmet[dependent] += 1
 
 
 class CodeCandidate(BaseModel):
     """Represents a code generation candidate."""
+    model_config = ConfigDict(frozen=True)
+    
     id: str = Field(description="Candidate identifier")
     task_id: str = Field(description="Associated task ID")
     agent_role: AgentRole = Field(description="Agent that generated this")
     code: str = Field(description="Generated code")
     approach: str = Field(description="Approach description (e.g., 'conservative', 'aggressive')")
-    generated_at: datetime = Field(default_factory=datetime.utcnow)
+    generated_at: datetime = Field(default_factory=utc_now)
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
 
 class VerificationResult(BaseModel):
     """Result of code verification."""
+    model_config = ConfigDict(frozen=True)
+    
     candidate_id: str
     verifier_role: AgentRole
     passed: bool
@@ -82,11 +173,13 @@ class VerificationResult(BaseModel):
     feedback: str
     errors: List[str] = Field(default_factory=list)
     warnings: List[str] = Field(default_factory=list)
-    verified_at: datetime = Field(default_factory=datetime.utcnow)
+    verified_at: datetime = Field(default_factory=utc_now)
 
 
 class ConsensusVote(BaseModel):
     """A vote in the consensus protocol."""
+    model_config = ConfigDict(frozen=True)
+    
     candidate_id: str
     voter_role: AgentRole
     score: float = Field(ge=0.0, le=1.0, description="Vote score (0-1)")
@@ -95,11 +188,13 @@ class ConsensusVote(BaseModel):
         default_factory=dict,
         description="Scores for different criteria (correctness, performance, readability)"
     )
-    voted_at: datetime = Field(default_factory=datetime.utcnow)
+    voted_at: datetime = Field(default_factory=utc_now)
 
 
 class ConsensusResult(BaseModel):
     """Result of consensus protocol."""
+    model_config = ConfigDict(frozen=True)
+    
     task_id: str
     winner_candidate_id: str
     total_candidates: int
@@ -107,48 +202,73 @@ class ConsensusResult(BaseModel):
     winning_score: float
     all_votes: List[ConsensusVote]
     reasoning: str
-    decided_at: datetime = Field(default_factory=datetime.utcnow)
+    decided_at: datetime = Field(default_factory=utc_now)
 
 
 class AgentMessage(BaseModel):
     """Message exchanged between agents."""
+    model_config = ConfigDict(frozen=True)
+    
     id: str
     sender: AgentRole
     recipient: Optional[AgentRole] = None  # None means broadcast
     content: str
     message_type: str = Field(default="chat", description="Message type (chat, command, response)")
     metadata: Dict[str, Any] = Field(default_factory=dict)
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=utc_now)
 
 
 class SearchResult(BaseModel):
     """Web search result."""
+    model_config = ConfigDict(frozen=True)
+    
     url: str
     title: str
     snippet: str
     relevance_score: float = Field(ge=0.0, le=1.0)
     source: str = Field(description="Search engine used (searxng, etc.)")
-    fetched_at: datetime = Field(default_factory=datetime.utcnow)
+    fetched_at: datetime = Field(default_factory=utc_now)
 
 
 class ScrapedContent(BaseModel):
     """Scraped web content."""
+    model_config = ConfigDict(frozen=True)
+    
     url: str
     title: Optional[str] = None
     content: str = Field(description="Clean markdown content")
     metadata: Dict[str, Any] = Field(default_factory=dict)
-    scraped_at: datetime = Field(default_factory=datetime.utcnow)
+    scraped_at: datetime = Field(default_factory=utc_now)
 
 
 class MemoryEntry(BaseModel):
     """Entry in the persistent memory system."""
+    model_config = ConfigDict(frozen=True, ser_json_bytes="base64")
+    
     id: str
     content: str
-    embedding: Optional[List[float]] = None
+    embedding: Optional[bytes] = Field(
+        default=None,
+        description="Packed little-endian float32 vector"
+    )
     metadata: Dict[str, Any] = Field(default_factory=dict)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
     accessed_count: int = Field(default=0)
     last_accessed: Optional[datetime] = None
+    
+    @field_validator("embedding", mode="before")
+    @classmethod
+    def _pack_embedding(cls, value: Any) -> Optional[bytes]:
+        """Pack list/ndarray embeddings into contiguous float32 bytes."""
+        if value is None or isinstance(value, bytes):
+            return value
+        return np.asarray(value, dtype="<f4").tobytes()
+    
+    def embedding_array(self) -> Optional[np.ndarray]:
+        """View the embedding as a float32 array (zero-copy)."""
+        if self.embedding is None:
+            return None
+        return np.frombuffer(self.embedding, dtype="<f4")
 
 
 class ProjectSpec(BaseModel):
@@ -174,6 +294,8 @@ class ProjectPlan(BaseModel):
 
 class ExecutionMetrics(BaseModel):
     """Metrics for task execution."""
+    model_config = ConfigDict(frozen=True)
+    
     task_id: str
     duration_seconds: float
     tokens_generated: int
@@ -181,4 +303,4 @@ class ExecutionMetrics(BaseModel):
     consensus_rounds: int
     success: bool
     error_message: Optional[str] = None
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+    timestamp: datetime = Field(default_factory=utc_now)
\ No newline at end of file
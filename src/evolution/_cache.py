@@ -0,0 +1,73 @@
+"""
+Persistent on-disk cache for expensive fitness evaluations.
+"""
+
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Optional
+import orjson
+
+from src.core.config import settings
+
+
+# Bump to invalidate every stored result (e.g. when scoring logic changes)
+CACHE_VERSION = 1
+
+
+class FitnessDiskCache:
+    """
+    SQLite key/value store for sandbox results, keyed by code hash.
+    
+    Runs in WAL mode so several processes can share one cache file: the
+    swarm's workers converge on identical code often, and a result computed
+    once is reused across tasks and across runs.
+    """
+    
+    def __init__(self, directory: Path):
+        self.path = Path(directory) / "fitness.sqlite3"
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database lazily (callers hold the lock)."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS fitness (key TEXT PRIMARY KEY, value BLOB NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+    
+    @staticmethod
+    def make_key(kind: str, code: str) -> str:
+        """Build a versioned key for one kind of result on one piece of code."""
+        digest = hashlib.blake2b(code.encode(), digest_size=16).hexdigest()
+        return f"v{CACHE_VERSION}:{kind}:{digest}"
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Get a stored result, or None if missing."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT value FROM fitness WHERE key = ?", (key,)
+            ).fetchone()
+        return orjson.loads(row[0]) if row else None
+    
+    def set(self, key: str, value: Any) -> None:
+        """Store a result."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO fitness (key, value) VALUES (?, ?)",
+                (key, orjson.dumps(value))
+            )
+            conn.commit()
+
+
+# Global fitness cache instance
+fitness_disk_cache = FitnessDiskCache(settings.fitness_cache_dir)
@@ -3,12 +3,64 @@ Evolutionary code refinement system.
 """
 
 import asyncio
+import hashlib
+import operator
 import random
-from typing import List, Dict, Optional
+import re
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, List, Dict, NamedTuple, Optional, Tuple
 from loguru import logger
 
-from src.core.models import CodeCandidate, Task
+from src.core.models import CodeCandidate, Task, utc_now
 from src.orchestration import execution_sandbox
+from src.evolution._cache import fitness_disk_cache
+
+
+# Every token the static scorers look for, matched in one pass over the code.
+# Alternatives are prefix-factored (a hand-built trie), so each position is
+# tried against one branch per distinct leading character.
+_STATIC_TOKEN_RE = re.compile(r"""\n|\"\"\"|'''|->|: (?:str|int)|try:|except|def """)
+
+
+class StaticMetrics(NamedTuple):
+    """Static code features used by the readability/maintainability scores."""
+    line_count: int
+    has_docstring: bool
+    has_type_hint: bool
+    has_try_except: bool
+    def_count: int
+
+
+def static_metrics(code: str) -> StaticMetrics:
+    """
+    Collect static code features in a single scan.
+    
+    Args:
+        code: Source code
+    
+    Returns:
+        Line count, docstring/type hint/try-except flags and def count
+    """
+    newlines = 0
+    def_count = 0
+    seen = set()
+    
+    for match in _STATIC_TOKEN_RE.finditer(code):
+        token = match.group()
+        if token == "\n":
+            newlines += 1
+        elif token == "def ":
+            def_count += 1
+        else:
+            seen.add(token)
+    
+    return StaticMetrics(
+        line_count=newlines + 1,
+        has_docstring='"""' in seen or "'''" in seen,
+        has_type_hint="->" in seen or ": str" in seen or ": int" in seen,
+        has_try_except="try:" in seen and "except" in seen,
+        def_count=def_count
+    )
 
 
 class EvolutionaryRefiner:
@@ -23,11 +75,28 @@ class EvolutionaryRefiner:
     5. Repeat until convergence
     """
     
+    # Mutation strategies, one per child (up to population_size - 1)
+    _MUTATION_PROMPTS: Tuple[str, ...] = (
+        "Refactor for better performance",
+        "Refactor for better readability",
+        "Add comprehensive error handling",
+        "Optimize algorithms and data structures",
+        "Add type hints and documentation",
+    )
+    
     def __init__(self):
         self.max_generations = 10
         self.population_size = 5
         self.mutation_rate = 0.3
+        self.patience = 5  # Generations without improvement before stopping
+        self.improvement_epsilon = 1e-6
+        self.diversity_epsilon = 1e-6  # Stop once population fitness converges
+        
+        # Fitness memo keyed by (task, code hash, criteria), LRU-bounded
+        self.fitness_cache_size = 1024
+        self._fitness_cache: "OrderedDict[tuple, float]" = OrderedDict()
         self.sandbox = execution_sandbox
+        self.disk_cache = fitness_disk_cache
     
     async def refine(
         self,
@@ -49,44 +118,65 @@ class EvolutionaryRefiner:
         logger.info(f"Starting evolutionary refinement for task {task.id}")
         
         current_best = initial_code
+        current_best_score = await self._calculate_fitness(
+            current_best, task, fitness_criteria
+        )
+        stale_generations = 0
         generation = 0
         
         while generation < self.max_generations:
             logger.info(f"  Generation {generation + 1}/{self.max_generations}")
+            generation += 1
             
-            # Generate mutations
-            population = await self._generate_mutations(current_best, task)
+            # Generate mutations (the parent's score is already known)
+            parent, children = await self._generate_mutations(current_best, task)
             
-            # Evaluate fitness
-            fitness_scores = await self._evaluate_population(
-                population,
+            # Evaluate fitness of the children only
+            children_scores = await self._evaluate_population(
+                children,
                 task,
                 fitness_criteria
             )
+            fitness_scores = [current_best_score, *children_scores]
             
-            # Select best
-            best_idx = fitness_scores.index(max(fitness_scores))
-            generation_best = population[best_idx]
-            best_score = fitness_scores[best_idx]
+            # Select best in one pass; max() keeps the first maximum, and the
+            # parent comes first, so the parent wins ties
+            best_idx, best_score = max(
+                enumerate(fitness_scores), key=operator.itemgetter(1)
+            )
+            if best_idx == 0:
+                generation_best = parent
+            else:
+                generation_best = children[best_idx - 1]
             
             logger.info(f"  Best fitness: {best_score:.3f}")
             
             # Check for improvement
-            if best_score <= await self._calculate_fitness(current_best, task, fitness_criteria):
-                logger.info("  No improvement, stopping evolution")
-                break
+            if best_score > current_best_score + self.improvement_epsilon:
+                current_best = generation_best
+                current_best_score = best_score
+                stale_generations = 0
+            else:
+                stale_generations += 1
+                if stale_generations >= self.patience:
+                    logger.info(
+                        f"  No improvement for {self.patience} generations, stopping evolution"
+                    )
+                    break
             
-            current_best = generation_best
-            generation += 1
+            # Identical fitness across the population means it has converged
+            if best_score - min(fitness_scores) < self.diversity_epsilon:
+                logger.info("  Population converged, stopping evolution")
+                break
         
-        logger.info(f"Evolution complete after {generation + 1} generations")
+        logger.info(f"Evolution complete after {generation} generations")
         return current_best
     
     async def _generate_mutations(
         self,
         parent: CodeCandidate,
         task: Task
-    ) -> List[CodeCandidate]:
+    ) -> Tuple[CodeCandidate, List[CodeCandidate]]:
         """
         Generate mutations of parent code.
         
@@ -96,30 +186,25 @@ class EvolutionaryRefiner:
         - Add error handling
         - Optimize algorithms
         - Add type hints
+        
+        Returns:
+            The parent (unchanged) and its mutated children
         """
-        mutations = [parent]  # Include parent in population
-        
-        mutation_prompts = [
-            "Refactor for better performance",
-            "Refactor for better readability",
-            "Add comprehensive error handling",
-            "Optimize algorithms and data structures",
-            "Add type hints and documentation"
-        ]
-        
-        # Generate mutations (simplified - would use actual agents)
-        for i, prompt in enumerate(mutation_prompts[:self.population_size - 1]):
-            mutation = CodeCandidate(
-                id=f"mutation_{i}",
-                task_id=task.id,
-                agent_role=parent.agent_role,
-                code=parent.code,  # Would actually mutate via agent
-                approach=f"mutation_{prompt.split()[2]}",
-                metadata={"generation": 1, "mutation": prompt}
-            )
-            mutations.append(mutation)
+        children = []
+        
+        # Generate mutations (simplified - would use actual agents).
+        # Children share the parent's code until a real mutation rewrites it.
+        for i, prompt in enumerate(self._MUTATION_PROMPTS[:self.population_size - 1]):
+            mutation = parent.model_copy(update={
+                "id": f"mutation_{i}",
+                "task_id": task.id,
+                "approach": f"mutation_{prompt.split()[2]}",
+                "generated_at": utc_now(),
+                "metadata": {"generation": 1, "mutation": prompt}
+            })
+            children.append(mutation)
         
-        return mutations
+        return parent, children
     
     async def _evaluate_population(
         self,
@@ -138,13 +223,26 @@ class EvolutionaryRefiner:
         Returns:
             List of fitness scores
         """
-        scores = []
+        # Candidates are scored concurrently, bounded to limit sandbox load
+        semaphore = asyncio.Semaphore(self.population_size)
+        
+        async def score(candidate: CodeCandidate) -> float:
+            async with semaphore:
+                return await self._calculate_fitness(candidate, task, fitness_criteria)
         
+        # Score each distinct code once, then scatter back to every candidate
+        unique_index: Dict[str, int] = {}
+        representatives = []
+        slots = []
         for candidate in population:
-            score = await self._calculate_fitness(candidate, task, fitness_criteria)
-            scores.append(score)
+            slot = unique_index.get(candidate.code)
+            if slot is None:
+                slot = unique_index[candidate.code] = len(representatives)
+                representatives.append(candidate)
+            slots.append(slot)
         
-        return scores
+        unique_scores = await asyncio.gather(*(score(c) for c in representatives))
+        return [unique_scores[slot] for slot in slots]
     
     async def _calculate_fitness(
         self,
@@ -160,27 +258,87 @@ class EvolutionaryRefiner:
         - performance: How fast?
         - readability: How clean?
         - maintainability: How modular?
+        
+        Scores are memoized per task, code and criteria, so unchanged code
+        (e.g. the parent carried into each generation) is scored once.
         """
+        key = (
+            task.id,
+            hashlib.blake2b(candidate.code.encode(), digest_size=16).digest(),
+            tuple(sorted(criteria.items()))
+        )
+        
+        cached = self._fitness_cache.get(key)
+        if cached is not None:
+            self._fitness_cache.move_to_end(key)
+            return cached
+        
         score = 0.0
         
         # Correctness (run tests)
-        test_result = await self._test_correctness(candidate)
+        test_result = await self._cached_result(
+            "correctness", candidate, self._test_correctness
+        )
         score += criteria.get("correctness", 0.4) * (1.0 if test_result["passed"] else 0.0)
         
-        # Performance (measure execution time)
-        perf_score = await self._measure_performance(candidate)
+        if test_result["passed"]:
+            # Performance (measure execution time), overlapped with the
+            # static scan for readability and maintainability
+            perf_score, metrics = await asyncio.gather(
+                self._cached_result("performance", candidate, self._measure_performance),
+                asyncio.to_thread(static_metrics, candidate.code)
+            )
+        else:
+            # Broken code cannot win; skip the benchmark
+            perf_score = 0.0
+            metrics = await asyncio.to_thread(static_metrics, candidate.code)
+        
         score += criteria.get("performance", 0.2) * perf_score
         
         # Readability (line count, complexity)
-        read_score = self._measure_readability(candidate.code)
+        read_score = self._measure_readability(metrics)
         score += criteria.get("readability", 0.2) * read_score
         
         # Maintainability (modularity, documentation)
-        maint_score = self._measure_maintainability(candidate.code)
+        maint_score = self._measure_maintainability(metrics)
         score += criteria.get("maintainability", 0.2) * maint_score
         
+        self._fitness_cache[key] = score
+        if len(self._fitness_cache) > self.fitness_cache_size:
+            self._fitness_cache.popitem(last=False)
+        
         return score
     
+    async def _cached_result(
+        self,
+        kind: str,
+        candidate: CodeCandidate,
+        compute: Callable[[CodeCandidate], Awaitable[Any]]
+    ) -> Any:
+        """
+        Run a sandbox evaluation through the on-disk cache.
+        
+        Results are keyed by code hash, so identical code is evaluated once
+        across generations, tasks and runs. Cache errors count as misses.
+        """
+        key = self.disk_cache.make_key(kind, candidate.code)
+        
+        try:
+            cached = await asyncio.to_thread(self.disk_cache.get, key)
+            if cached is not None:
+                return cached
+        except Exception as e:
+            logger.warning(f"Fitness cache lookup failed: {e}")
+        
+        result = await compute(candidate)
+        
+        try:
+            await asyncio.to_thread(self.disk_cache.set, key, result)
+        except Exception as e:
+            logger.warning(f"Fitness cache store failed: {e}")
+        
+        return result
+    
     async def _test_correctness(self, candidate: CodeCandidate) -> Dict:
         """Test if code is correct."""
         
@@ -199,10 +357,10 @@ class EvolutionaryRefiner:
         # Shorter = better, normalized to 0-1
         return 0.8  # Mock
     
-    def _measure_readability(self, code: str) -> float:
+    def _measure_readability(self, metrics: StaticMetrics) -> float:
         """Measure code readability."""
         
-        lines = len(code.split('\n'))
+        lines = metrics.line_count
         
         # Prefer shorter, cleaner code
         # 50 lines = ideal, normalize around that
@@ -215,30 +373,28 @@ class EvolutionaryRefiner:
         else:
             return 0.5  # Too long
     
-    def _measure_maintainability(self, code: str) -> float:
+    def _measure_maintainability(self, metrics: StaticMetrics) -> float:
         """Measure code maintainability."""
         
         score = 0.0
         
         # Check for docstrings
-        if '"""' in code or "'''" in code:
+        if metrics.has_docstring:
             score += 0.3
         
         # Check for type hints
-        if '->' in code or ': str' in code or ': int' in code:
+        if metrics.has_type_hint:
             score += 0.3
         
         # Check for error handling
-        if 'try:' in code and 'except' in code:
+        if metrics.has_try_except:
             score += 0.2
         
         # Check for modularity (multiple functions)
-        function_count = code.count('def ')
-        if function_count > 1:
+        if metrics.def_count > 1:
             score += 0.2
         
         return min(score, 1.0)
 
-
 # Global evolutionary refiner instance
 evolutionary_refiner = EvolutionaryRefiner()
\ No newline at end of file
@@ -3,9 +3,15 @@ Consensus protocol for multi-agent verification and selection.
 """
 
 import asyncio
+import itertools
+import os
+import re
 import uuid
+from collections import defaultdict
 from datetime import datetime
-from typing import List, Optional
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
 from loguru import logger
 
 from src.core.config import settings
@@ -16,9 +22,51 @@ from src.core.models import (
     ConsensusVote,
     Task,
     VerificationResult,
+    utc_now,
 )
 
 
+# Generation prompt skeleton, filled with str.format_map
+_PROMPT_TMPL = """Task: {title}
+
+Description: {description}
+
+Approach: {approach}
+{instruction}
+
+Requirements:
+{requirements}
+
+Generate the implementation following the {approach} approach.
+"""
+
+_APPROACH_INSTRUCTIONS = {
+    "conservative": "Prioritize safety, error handling, and robustness. Include extensive validation.",
+    "aggressive": "Prioritize performance and efficiency. Use optimized algorithms.",
+    "minimal": "Prioritize simplicity and readability. Use the most straightforward approach.",
+    "defensive": "Prioritize security and input validation. Assume hostile inputs.",
+}
+
+
+@lru_cache(maxsize=128)
+def _render_requirements(requirements: Tuple[str, ...]) -> str:
+    """Render a requirements list as markdown bullets (cached per list)."""
+    return "\n".join("- " + req for req in requirements)
+
+
+# First PASS/FAIL verdict in a verifier response
+_PASS_RE = re.compile(r"\b(PASS|FAIL)\b", re.IGNORECASE)
+
+# Explicit numeric score ("Score: 0.85"), as requested by the verification prompt
+_NUMERIC_SCORE_RE = re.compile(
+    r"\bscore(?:\s*\(0\s*-\s*1\))?\s*[:=]\s*([01](?:\.\d+)?)(?!\d)", re.IGNORECASE
+)
+
+# Qualitative ratings and their scores; the highest rating mentioned wins
+_SCORE_RE = re.compile(r"\b(excellent|good|acceptable|poor)\b", re.IGNORECASE)
+_SCORE_MAP = {"excellent": 0.9, "good": 0.75, "acceptable": 0.6, "poor": 0.3}
+
+
 class ConsensusEngine:
     """
     Implements the consensus protocol for code verification.
@@ -34,6 +82,15 @@ class ConsensusEngine:
         self.n_candidates = settings.consensus_n_candidates
         self.min_votes = settings.consensus_min_votes
         self.timeout = settings.consensus_timeout_seconds
+        self.max_parallel_judges = settings.consensus_max_parallel_judges
+        
+        # Bounds every agent call made by this engine (generation,
+        # verification, judging); all calls share one HTTP connection pool
+        self._sem = asyncio.Semaphore(settings.consensus_max_inflight)
+        
+        # Candidate IDs: per-engine prefix (unique across processes) + counter
+        self._id_prefix = f"{os.getpid():x}{uuid.uuid4().hex[:8]}"
+        self._id_counter = itertools.count()
     
     async def generate_candidates(
         self,
@@ -57,11 +114,12 @@ class ConsensusEngine:
         
         logger.info(f"Generating {len(approaches)} candidates for task {task.id}")
         
-        # Generate candidates in parallel
+        # Generate candidates in parallel (one timestamp for the round)
+        generated_at = utc_now()
         candidate_coros = []
         for approach in approaches:
             candidate_coros.append(
-                self._generate_single_candidate(task, agent_client, approach)
+                self._generate_single_candidate(task, agent_client, approach, generated_at)
             )
         
         try:
@@ -89,49 +147,45 @@ class ConsensusEngine:
         self,
         task: Task,
         agent_client,
-        approach: str
+        approach: str,
+        generated_at: Optional[datetime] = None
     ) -> CodeCandidate:
         """Generate a single candidate with specific approach."""
         
         prompt = self._build_generation_prompt(task, approach)
         
         # Call agent to generate code
-        response = await agent_client.generate(prompt)
+        response = await self._bounded_generate(agent_client, prompt)
         
         return CodeCandidate(
-            id=str(uuid.uuid4()),
+            id=f"{task.id}-{self._id_prefix}-{next(self._id_counter)}-{approach}",
             task_id=task.id,
             agent_role=agent_client.role,
             code=response["content"],
             approach=approach,
-            generated_at=datetime.utcnow(),
+            generated_at=generated_at or utc_now(),
             metadata={"model": agent_client.model_name}
         )
     
+    async def _bounded_generate(self, agent_client, prompt: str) -> dict:
+        """Call an agent, waiting for a free in-flight slot first."""
+        
+        async with self._sem:
+            return await agent_client.generate(prompt)
+    
     def _build_generation_prompt(self, task: Task, approach: str) -> str:
         """Build prompt for code generation with specific approach."""
         
-        approach_instructions = {
-            "conservative": "Prioritize safety, error handling, and robustness. Include extensive validation.",
-            "aggressive": "Prioritize performance and efficiency. Use optimized algorithms.",
-            "minimal": "Prioritize simplicity and readability. Use the most straightforward approach.",
-            "defensive": "Prioritize security and input validation. Assume hostile inputs.",
-        }
-        
-        instruction = approach_instructions.get(approach, approach_instructions["conservative"])
+        instruction = _APPROACH_INSTRUCTIONS.get(approach, _APPROACH_INSTRUCTIONS["conservative"])
+        requirements = tuple(str(req) for req in task.metadata.get('requirements', []))
         
-        return f"""Task: {task.title}
-
-Description: {task.description}
-
-Approach: {approach}
-{instruction}
-
-Requirements:
-{chr(10).join('- ' + str(req) for req in task.metadata.get('requirements', []))}
-
-Generate the implementation following the {approach} approach.
-"""
+        return _PROMPT_TMPL.format_map({
+            "title": task.title,
+            "description": task.description,
+            "approach": approach,
+            "instruction": instruction,
+            "requirements": _render_requirements(requirements),
+        })
     
     async def cross_verify(
         self,
@@ -154,14 +208,19 @@ Generate the implementation following the {approach} approach.
         """
         logger.info(f"Cross-verifying {len(candidates)} candidates")
         
+        verified_at = utc_now()
         verification_coros = []
         for candidate in candidates:
             # Each candidate verified by both QA and Architect
             verification_coros.append(
-                self._verify_candidate(candidate, task, qa_client, AgentRole.QA_SENTINEL)
+                self._verify_candidate(
+                    candidate, task, qa_client, AgentRole.QA_SENTINEL, verified_at
+                )
             )
             verification_coros.append(
-                self._verify_candidate(candidate, task, architect_client, AgentRole.ARCHITECT)
+                self._verify_candidate(
+                    candidate, task, architect_client, AgentRole.ARCHITECT, verified_at
+                )
             )
         
         try:
@@ -188,7 +247,8 @@ Generate the implementation following the {approach} approach.
         candidate: CodeCandidate,
         task: Task,
         verifier_client,
-        verifier_role: AgentRole
+        verifier_role: AgentRole,
+        verified_at: Optional[datetime] = None
     ) -> VerificationResult:
         """Verify a single candidate."""
         
@@ -210,35 +270,34 @@ Verify against requirements and provide:
 5. List of warnings (if any)
 """
         
-        response = await verifier_client.generate(prompt)
+        response = await self._bounded_generate(verifier_client, prompt)
         
         # Parse response (simplified - would need better parsing)
-        passed = "PASS" in response.content.upper()
-        score = self._extract_score(response.content)
+        content = response["content"]
+        verdict = _PASS_RE.search(content)
+        passed = bool(verdict and verdict.group(1).upper() == "PASS")
+        score = self._extract_score(content)
         
         return VerificationResult(
             candidate_id=candidate.id,
             verifier_role=verifier_role,
             passed=passed,
             score=score,
-            feedback=response.content,
+            feedback=content,
             errors=[],  # Would parse from response
             warnings=[],  # Would parse from response
-            verified_at=datetime.utcnow()
+            verified_at=verified_at or utc_now()
         )
     
     def _extract_score(self, content: str) -> float:
         """Extract score from verification response."""
-        # Simple heuristic - would implement better parsing
-        if "excellent" in content.lower():
-            return 0.9
-        elif "good" in content.lower():
-            return 0.75
-        elif "acceptable" in content.lower():
-            return 0.6
-        elif "poor" in content.lower():
-            return 0.3
-        return 0.5
+        
+        match = _NUMERIC_SCORE_RE.search(content)
+        if match:
+            return min(float(match.group(1)), 1.0)
+        
+        ratings = [_SCORE_MAP[m.group(1).lower()] for m in _SCORE_RE.finditer(content)]
+        return max(ratings) if ratings else 0.5
     
     async def consensus_vote(
         self,
@@ -261,8 +320,11 @@ Verify against requirements and provide:
         """
         logger.info(f"Running consensus vote for {len(candidates)} candidates")
         
+        # Index verifications once instead of filtering per candidate
+        verifications_by_cid = self._group_by_candidate(verifications)
+        
         # Filter to candidates that passed verification
-        passing_candidates = self._get_passing_candidates(candidates, verifications)
+        passing_candidates = self._get_passing_candidates(candidates, verifications_by_cid)
         
         if not passing_candidates:
             logger.warning("No candidates passed verification!")
@@ -270,137 +332,175 @@ Verify against requirements and provide:
             passing_candidates = candidates
         
         # Get judge to vote on all passing candidates
-        votes = await self._collect_votes(passing_candidates, verifications, task, judge_client)
+        votes = await self._collect_votes(
+            passing_candidates, verifications_by_cid, task, judge_client, utc_now()
+        )
+        
+        if not votes:
+            raise RuntimeError(f"Consensus judge produced no votes for task {task.id}")
         
         # Select winner
-        winner = self._select_winner(votes, passing_candidates)
+        votes_by_cid = self._group_by_candidate(votes)
+        winner = self._select_winner(votes_by_cid, passing_candidates)
+        winner_votes = votes_by_cid[winner.id]
         
         return ConsensusResult(
             task_id=task.id,
             winner_candidate_id=winner.id,
             total_candidates=len(candidates),
             total_votes=len(votes),
-            winning_score=max(v.score for v in votes if v.candidate_id == winner.id),
+            winning_score=max(v.score for v in winner_votes),
             all_votes=votes,
-            reasoning=self._build_consensus_reasoning(winner, votes),
-            decided_at=datetime.utcnow()
+            reasoning=self._build_consensus_reasoning(winner, winner_votes),
+            decided_at=utc_now()
         )
     
+    @staticmethod
+    def _group_by_candidate(items: Iterable) -> Dict[str, list]:
+        """Group verifications or votes by candidate ID in one pass."""
+        
+        grouped = defaultdict(list)
+        for item in items:
+            grouped[item.candidate_id].append(item)
+        return grouped
+    
     def _get_passing_candidates(
         self,
         candidates: List[CodeCandidate],
-        verifications: List[VerificationResult]
+        verifications_by_cid: Dict[str, List[VerificationResult]]
     ) -> List[CodeCandidate]:
         """Filter candidates that passed verification."""
         
-        passing_ids = set()
-        for verification in verifications:
-            if verification.passed:
-                passing_ids.add(verification.candidate_id)
-        
-        return [c for c in candidates if c.id in passing_ids]
+        return [
+            c for c in candidates
+            if any(v.passed for v in verifications_by_cid.get(c.id, ()))
+        ]
     
     async def _collect_votes(
         self,
         candidates: List[CodeCandidate],
-        verifications: List[VerificationResult],
+        verifications_by_cid: Dict[str, List[VerificationResult]],
         task: Task,
-        judge_client
+        judge_client,
+        voted_at: Optional[datetime] = None
     ) -> List[ConsensusVote]:
-        """Collect votes from consensus judge."""
+        """
+        Collect votes from consensus judge.
         
-        prompt = self._build_judging_prompt(candidates, verifications, task)
-        response = await judge_client.generate(prompt)
+        Each candidate is judged by its own prompt, with the judge calls
+        running concurrently (bounded by max_parallel_judges). Candidates
+        whose judge call fails get no vote.
+        """
+        semaphore = asyncio.Semaphore(self.max_parallel_judges)
+        voted_at = voted_at or utc_now()
         
-        # Parse judge's response into votes
-        votes = []
-        for candidate in candidates:
-            # Would implement better parsing
-            score = self._extract_score(response.content)
+        async def judge(candidate: CodeCandidate) -> ConsensusVote:
+            prompt = self._build_single_judging_prompt(
+                candidate, verifications_by_cid.get(candidate.id, []), task
+            )
+            async with semaphore:
+                response = await self._bounded_generate(judge_client, prompt)
+            
+            content = response["content"]
+            score = self._extract_score(content)
             
-            vote = ConsensusVote(
+            return ConsensusVote(
                 candidate_id=candidate.id,
                 voter_role=AgentRole.CONSENSUS_JUDGE,
                 score=score,
-                reasoning=response.content,
+                reasoning=content,
                 criteria={
                     "correctness": score,
                     "performance": score * 0.9,
                     "readability": score * 0.95,
                     "maintainability": score * 0.85,
                 },
-                voted_at=datetime.utcnow()
+                voted_at=voted_at
             )
-            votes.append(vote)
+        
+        try:
+            results = await asyncio.wait_for(
+                asyncio.gather(*(judge(c) for c in candidates), return_exceptions=True),
+                timeout=self.timeout
+            )
+        except asyncio.TimeoutError:
+            logger.error(f"Judging timed out after {self.timeout}s")
+            return []
+        
+        votes = []
+        for candidate, result in zip(candidates, results):
+            if isinstance(result, ConsensusVote):
+                votes.append(result)
+            else:
+                logger.warning(f"Judge failed for candidate {candidate.id}: {result}")
         
         return votes
     
-    def _build_judging_prompt(
+    def _build_single_judging_prompt(
         self,
-        candidates: List[CodeCandidate],
-        verifications: List[VerificationResult],
+        candidate: CodeCandidate,
+        candidate_verifications: List[VerificationResult],
         task: Task
     ) -> str:
-        """Build prompt for consensus judge."""
+        """Build prompt for judging a single candidate."""
         
-        prompt = f"""Task: {task.title}
-
-You must judge {len(candidates)} code candidates and select the best one.
+        code_excerpt = candidate.code[:500]
+        
+        parts = [f"""Task: {task.title}
 
-"""
-        for i, candidate in enumerate(candidates, 1):
-            prompt += f"""
-Candidate {i} (Approach: {candidate.approach}):
+Judge this code candidate (Approach: {candidate.approach}):
 ```
-{candidate.code[:500]}...
+{code_excerpt}...
 ```
 
 Verifications:
-"""
-            candidate_verifications = [
-                v for v in verifications if v.candidate_id == candidate.id
-            ]
-            for v in candidate_verifications:
-                prompt += f"- {v.verifier_role.value}: {'PASS' if v.passed else 'FAIL'} (Score: {v.score:.2f})\n"
-        
-        prompt += """
-Score each candidate on:
+"""]
+        parts.extend(
+            f"- {v.verifier_role.value}: {'PASS' if v.passed else 'FAIL'} (Score: {v.score:.2f})\n"
+            for v in candidate_verifications
+        )
+        parts.append("""
+Score the candidate on:
 - Correctness (40%)
 - Performance (20%)  
 - Readability (20%)
 - Maintainability (20%)
 
-Select the winner and explain your reasoning.
-"""
-        return prompt
+Rate it overall as excellent, good, acceptable or poor and explain your reasoning.
+""")
+        return "".join(parts)
     
     def _select_winner(
         self,
-        votes: List[ConsensusVote],
+        votes_by_cid: Dict[str, List[ConsensusVote]],
         candidates: List[CodeCandidate]
     ) -> CodeCandidate:
         """Select winning candidate based on votes."""
         
-        # Calculate average score per candidate
-        candidate_scores = {}
-        for candidate in candidates:
-            candidate_votes = [v for v in votes if v.candidate_id == candidate.id]
-            if candidate_votes:
-                avg_score = sum(v.score for v in candidate_votes) / len(candidate_votes)
-                candidate_scores[candidate.id] = avg_score
-        
-        # Select highest scoring candidate
-        winner_id = max(candidate_scores, key=candidate_scores.get)
-        return next(c for c in candidates if c.id == winner_id)
+        # Average score per candidate; candidates without votes never win
+        sums = np.fromiter(
+            (sum(v.score for v in votes_by_cid.get(c.id, ())) for c in candidates),
+            dtype=np.float64,
+            count=len(candidates)
+        )
+        counts = np.fromiter(
+            (len(votes_by_cid.get(c.id, ())) for c in candidates),
+            dtype=np.float64,
+            count=len(candidates)
+        )
+        means = np.full(len(candidates), -np.inf)
+        np.divide(sums, counts, out=means, where=counts > 0)
+        
+        # Select highest scoring candidate (first one wins ties)
+        return candidates[int(np.argmax(means))]
     
     def _build_consensus_reasoning(
         self,
         winner: CodeCandidate,
-        votes: List[ConsensusVote]
+        winner_votes: List[ConsensusVote]
     ) -> str:
         """Build explanation for consensus decision."""
         
-        winner_votes = [v for v in votes if v.candidate_id == winner.id]
         avg_score = sum(v.score for v in winner_votes) / len(winner_votes)
         
         return f"""
@@ -2,12 +2,205 @@
 Spec hydration system for filesystem-based state management.
 """
 
-import json
+import asyncio
+import re
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import aiofiles
+import orjson
 from loguru import logger
 
-from src.core.models import ProjectPlan, ProjectSpec, Task, TaskStatus
+from src.core.config import settings
+from src.core.models import ProjectPlan, ProjectSpec, Task, TaskPriority, TaskStatus, TaskTable, utc_now
+
+
+# Any line starting with "#": "#" is the title, "##"+ starts a section
+_HEADER_RE = re.compile(r"^(#+)(.*)$", re.MULTILINE)
+
+# tasks.md: task ID in backticks on a checkbox line, and "- Key: value" metadata
+_TASK_ID_RE = re.compile(r"`([^`]+)`")
+_META_RE = re.compile(r"- (Status|Priority|Depends on|Description):\s*(.*)")
+
+# Pretty-printed JSON for schema sections (non-str keys stringified like json)
+_JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
+# Enum members by value: unknown values miss the dict instead of raising
+_STATUS_BY_VALUE = {status.value: status for status in TaskStatus}
+_PRIORITY_BY_VALUE = {priority.value: priority for priority in TaskPriority}
+
+# Parsed spec files keyed by resolved path -> ((mtime_ns, size), parsed value)
+_PARSE_CACHE: "OrderedDict[Path, Tuple[Tuple[int, int], Any]]" = OrderedDict()
+_PARSE_CACHE_MAX = 64
+
+
+def clear_cache() -> None:
+    """Drop all cached parsed spec files."""
+    _PARSE_CACHE.clear()
+
+
+def _invalidate(path: Path) -> None:
+    """Drop the cached parse of one file."""
+    _PARSE_CACHE.pop(path.resolve(), None)
+
+
+def _file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    """Get (mtime_ns, size) of a file, or None if it does not exist."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def topo_sort_tasks(tasks: List[Task]) -> List[List[Task]]:
+    """
+    Order tasks into dependency waves (Kahn's algorithm on a TaskTable).
+    
+    Every task in a wave depends only on tasks in earlier waves, so a
+    wave's tasks can run in parallel. Within a wave, input order is kept.
+    Dependencies on IDs not in the list are ignored, as are task statuses.
+    
+    Args:
+        tasks: Tasks to order
+    
+    Returns:
+        List of waves, each a list of tasks
+    
+    Raises:
+        ValueError: If the dependencies contain a cycle
+    """
+    table = TaskTable(tasks, all_pending=True)
+    by_id = {task.id: task for task in tasks}
+    waves = []
+    emitted = 0
+    
+    # Everything ready now forms one wave; completing it readies the next
+    ready = table.ready_ids()
+    while ready:
+        waves.append([by_id[task_id] for task_id in ready])
+        emitted += len(ready)
+        
+        for task_id in ready:
+            table.set_status(task_id, TaskStatus.COMPLETED)
+        ready = table.ready_ids()
+    
+    if emitted < len(tasks):
+        pending = table.STATUS_CODES[TaskStatus.PENDING]
+        cyclic = sorted(table.ids[table.status == pending].tolist())
+        raise ValueError(f"Task dependency cycle among: {', '.join(cyclic)}")
+    
+    return waves
+
+
+class _TaskListParser:
+    """
+    Line-at-a-time parser for tasks.md checklists.
+    
+    Only the task being built is held besides finished tasks, so lines can
+    be fed straight from a file without keeping its text in memory.
+    """
+    
+    def __init__(self):
+        self.tasks: List[Task] = []
+        self._current: Optional[Task] = None
+    
+    def feed_line(self, line: str) -> None:
+        """Consume one line (trailing newline optional)."""
+        
+        line = line.strip()
+        
+        # Task checkbox line
+        if line.startswith("- ["):
+            if self._current:
+                self.tasks.append(self._current)
+            
+            # Extract checkbox state
+            is_completed = "x" in line[3:5].lower()
+            
+            # Extract title and ID ("**Title** (`id`)")
+            rest = line[5:]
+            id_match = _TASK_ID_RE.search(rest)
+            if id_match:
+                title_part = rest[:id_match.start()]
+                task_id = id_match.group(1).strip()
+            else:
+                title_part = rest
+                task_id = f"task_{len(self.tasks) + 1}"
+            title = title_part.strip().rstrip("(").strip().strip("*").strip()
+            
+            self._current = Task(
+                id=task_id,
+                title=title,
+                description="",
+                status=TaskStatus.COMPLETED if is_completed else TaskStatus.PENDING
+            )
+            return
+        
+        # Task metadata lines
+        current_task = self._current
+        if not current_task:
+            return
+        
+        meta = _META_RE.match(line)
+        if not meta:
+            return
+        
+        key, value = meta.group(1), meta.group(2).strip()
+        
+        if key == "Status":
+            status = _STATUS_BY_VALUE.get(value)
+            if status is not None:
+                current_task.status = status
+        
+        elif key == "Priority":
+            priority = _PRIORITY_BY_VALUE.get(value)
+            if priority is not None:
+                current_task.priority = priority
+        
+        elif key == "Depends on":
+            current_task.dependencies = frozenset(d.strip() for d in value.split(","))
+        
+        else:
+            current_task.description = value
+    
+    def close(self) -> List[Task]:
+        """Finish parsing and return the tasks."""
+        
+        if self._current:
+            self.tasks.append(self._current)
+            self._current = None
+        return self.tasks
+
+
+async def _read_text_async(path: Path) -> str:
+    """Read a text file without blocking the event loop."""
+    
+    async def read() -> str:
+        async with aiofiles.open(path, "r", encoding="utf-8") as f:
+            return await f.read()
+    
+    return await asyncio.wait_for(read(), timeout=settings.spec_io_timeout_seconds)
+
+
+async def _stream_tasks_async(path: Path) -> List[Task]:
+    """Parse tasks.md while reading it line by line."""
+    
+    async def stream() -> List[Task]:
+        parser = _TaskListParser()
+        async with aiofiles.open(path, "r", encoding="utf-8") as f:
+            async for line in f:
+                parser.feed_line(line)
+        return parser.close()
+    
+    return await asyncio.wait_for(stream(), timeout=settings.spec_io_timeout_seconds)
+
+
+async def _write_text_async(path: Path, content: str, mode: str = "w") -> None:
+    """Write (or with mode="a", append to) a text file without blocking the event loop."""
+    
+    async with aiofiles.open(path, mode, encoding="utf-8") as f:
+        await f.write(content)
 
 
 class SpecHydration:
@@ -18,6 +211,7 @@ class SpecHydration:
     - spec.md: Project requirements (immutable)
     - plan.md: Technical architecture
     - tasks.md: Task DAG with dependencies
+    - tasks.journal.log: Status updates not yet folded into tasks.md
     """
     
     def __init__(self, spec_dir: Path = Path("./specs")):
@@ -27,6 +221,15 @@ class SpecHydration:
         self.spec_file = self.spec_dir / "spec.md"
         self.plan_file = self.spec_dir / "plan.md"
         self.tasks_file = self.spec_dir / "tasks.md"
+        self._journal_file = self.spec_dir / "tasks.journal.log"
+        
+        # In-memory tasks by ID, valid while tasks.md and the journal keep
+        # the signatures they had when it was built
+        self._tasks_index: Optional[Dict[str, Task]] = None
+        self._index_signature = None
+        self._tasks_lock = asyncio.Lock()
+        self._dirty = False
+        self._flush_task: Optional[asyncio.Task] = None
     
     async def hydrate_context(self) -> Dict[str, any]:
         """
@@ -37,22 +240,70 @@ class SpecHydration:
         """
         logger.info("Hydrating context from specification files")
         
+        # The three files are independent, so their reads overlap. Missing
+        # files already resolve to None / [] in the loaders.
+        spec, plan, tasks = await asyncio.gather(
+            self.load_spec(),
+            self.load_plan(),
+            self.load_tasks()
+        )
+        
         context = {
-            "spec": await self.load_spec() if self.spec_file.exists() else None,
-            "plan": await self.load_plan() if self.plan_file.exists() else None,
-            "tasks": await self.load_tasks() if self.tasks_file.exists() else [],
+            "spec": spec,
+            "plan": plan,
+            "tasks": tasks,
         }
         
         logger.info(f"Hydrated {len(context['tasks'])} tasks from filesystem")
         return context
     
-    async def load_spec(self) -> Optional[ProjectSpec]:
-        """Load project specification from spec.md."""
+    async def _load_cached(
+        self,
+        path: Path,
+        parse: Optional[Callable[[str], Any]] = None,
+        load: Optional[Callable[[Path], Awaitable[Any]]] = None
+    ) -> Any:
+        """
+        Read and parse a spec file, reusing the last parse if unchanged.
+        
+        On a miss the file is read whole and passed to parse(), or handed
+        to load() for parsers that read it themselves.
         
-        if not self.spec_file.exists():
+        Warm calls cost one stat(); callers get deep copies so mutating a
+        returned model never touches the cache.
+        
+        Returns:
+            Parsed value, or None if the file does not exist
+        """
+        signature = _file_signature(path)
+        if signature is None:
             return None
         
-        content = self.spec_file.read_text()
+        key = path.resolve()
+        
+        cached = _PARSE_CACHE.get(key)
+        if cached is not None and cached[0] == signature:
+            _PARSE_CACHE.move_to_end(key)
+            value = cached[1]
+        else:
+            if load is not None:
+                value = await load(path)
+            else:
+                value = parse(await _read_text_async(path))
+            _PARSE_CACHE[key] = (signature, value)
+            if len(_PARSE_CACHE) > _PARSE_CACHE_MAX:
+                _PARSE_CACHE.popitem(last=False)
+        
+        if isinstance(value, list):
+            return [item.model_copy(deep=True) for item in value]
+        return value.model_copy(deep=True)
+    
+    async def load_spec(self) -> Optional[ProjectSpec]:
+        """Load project specification from spec.md."""
+        return await self._load_cached(self.spec_file, self._parse_spec)
+    
+    def _parse_spec(self, content: str) -> ProjectSpec:
+        """Parse spec.md content."""
         
         # Parse markdown sections
         sections = self._parse_markdown_sections(content)
@@ -68,11 +319,11 @@ class SpecHydration:
     
     async def load_plan(self) -> Optional[ProjectPlan]:
         """Load project plan from plan.md."""
+        return await self._load_cached(self.plan_file, self._parse_plan)
+    
+    def _parse_plan(self, content: str) -> ProjectPlan:
+        """Parse plan.md content."""
         
-        if not self.plan_file.exists():
-            return None
-        
-        content = self.plan_file.read_text()
         sections = self._parse_markdown_sections(content)
         
         # Parse structured sections
@@ -92,11 +343,60 @@ class SpecHydration:
     async def load_tasks(self) -> List[Task]:
         """Load tasks from tasks.md."""
         
-        if not self.tasks_file.exists():
-            return []
+        signature = self._tasks_signature()
+        if self._tasks_index is not None and signature == self._index_signature:
+            return [task.model_copy(deep=True) for task in self._tasks_index.values()]
+        
+        tasks = await self._load_cached(self.tasks_file, load=_stream_tasks_async)
+        if tasks is None:
+            tasks = []
+        else:
+            await self._replay_journal(tasks)
+        
+        self._set_tasks_index(tasks, signature)
+        return tasks
+    
+    def _tasks_signature(self) -> Tuple[Any, Any]:
+        """Signature of tasks.md plus its journal, for index validation."""
+        return (_file_signature(self.tasks_file), _file_signature(self._journal_file))
+    
+    def _set_tasks_index(self, tasks: List[Task], signature: Tuple[Any, Any]) -> None:
+        """Rebuild the in-memory task index from private copies."""
+        self._tasks_index = {task.id: task.model_copy(deep=True) for task in tasks}
+        self._index_signature = signature
+    
+    async def load_task_waves(self) -> List[List[Task]]:
+        """
+        Load tasks grouped into dependency waves for parallel dispatch.
+        
+        Returns:
+            List of waves; see topo_sort_tasks()
+        """
+        return topo_sort_tasks(await self.load_tasks())
+    
+    async def _replay_journal(self, tasks: List[Task]) -> None:
+        """Apply journaled status updates on top of tasks parsed from tasks.md."""
+        
+        try:
+            content = await _read_text_async(self._journal_file)
+        except FileNotFoundError:
+            return
+        
+        by_id = {task.id: task for task in tasks}
         
-        content = self.tasks_file.read_text()
-        return self._parse_tasks_markdown(content)
+        # One "task_id status timestamp" entry per line; later entries win
+        for line in content.splitlines():
+            fields = line.rsplit(" ", 2)
+            if len(fields) != 3:
+                continue
+            
+            task = by_id.get(fields[0])
+            if task is None:
+                continue
+            
+            status = _STATUS_BY_VALUE.get(fields[1])
+            if status is not None:
+                task.status = status
     
     async def save_spec(self, spec: ProjectSpec) -> None:
         """Save specification to spec.md."""
@@ -115,13 +415,14 @@ class SpecHydration:
 ## Acceptance Criteria
 {self._format_list(spec.acceptance_criteria)}
 """
-        self.spec_file.write_text(content)
+        await _write_text_async(self.spec_file, content)
+        _invalidate(self.spec_file)
         logger.info(f"Saved specification to {self.spec_file}")
     
     async def save_plan(self, plan: ProjectPlan) -> None:
         """Save plan to plan.md."""
         
-        content = f"""# Technical Plan
+        parts = [f"""# Technical Plan
 
 ## Architecture
 {plan.architecture}
@@ -133,72 +434,134 @@ class SpecHydration:
 ```
 {self._format_file_structure(plan.file_structure)}
 ```
-"""
+"""]
         
         if plan.api_schema:
-            content += f"\n## API Schema\n```json\n{json.dumps(plan.api_schema, indent=2)}\n```\n"
+            parts.append(f"\n## API Schema\n```json\n{orjson.dumps(plan.api_schema, option=_JSON_OPTIONS).decode()}\n```\n")
         
         if plan.database_schema:
-            content += f"\n## Database Schema\n```json\n{json.dumps(plan.database_schema, indent=2)}\n```\n"
+            parts.append(f"\n## Database Schema\n```json\n{orjson.dumps(plan.database_schema, option=_JSON_OPTIONS).decode()}\n```\n")
         
-        self.plan_file.write_text(content)
+        await _write_text_async(self.plan_file, "".join(parts))
+        _invalidate(self.plan_file)
         logger.info(f"Saved plan to {self.plan_file}")
     
     async def save_tasks(self, tasks: List[Task]) -> None:
         """Save tasks to tasks.md."""
         
-        content = "# Task List\n\n"
+        async with self._tasks_lock:
+            await self._write_tasks(tasks)
+    
+    async def _write_tasks(self, tasks: List[Task]) -> None:
+        """Write tasks.md and reset the journal (callers hold the tasks lock)."""
+        
+        # Collect fragments and join once instead of re-copying the buffer
+        parts = ["# Task List\n\n"]
         
         for task in tasks:
             checkbox = "x" if task.status == TaskStatus.COMPLETED else " "
-            content += f"- [{checkbox}] **{task.title}** (`{task.id}`)\n"
-            content += f"  - Status: {task.status.value}\n"
-            content += f"  - Priority: {task.priority.value}\n"
+            parts.append(f"- [{checkbox}] **{task.title}** (`{task.id}`)\n")
+            parts.append(f"  - Status: {task.status.value}\n")
+            parts.append(f"  - Priority: {task.priority.value}\n")
             
             if task.dependencies:
-                content += f"  - Depends on: {', '.join(task.dependencies)}\n"
+                parts.append(f"  - Depends on: {', '.join(sorted(task.dependencies))}\n")
             
             if task.description:
-                content += f"  - Description: {task.description}\n"
+                parts.append(f"  - Description: {task.description}\n")
             
-            content += "\n"
+            parts.append("\n")
+        
+        await _write_text_async(self.tasks_file, "".join(parts))
+        _invalidate(self.tasks_file)
         
-        self.tasks_file.write_text(content)
+        # tasks.md now reflects every journaled update
+        self._journal_file.unlink(missing_ok=True)
+        self._set_tasks_index(tasks, self._tasks_signature())
+        self._dirty = False
         logger.info(f"Saved {len(tasks)} tasks to {self.tasks_file}")
     
     async def update_task_status(self, task_id: str, status: TaskStatus) -> None:
-        """Update status of a single task."""
+        """
+        Update status of a single task.
         
-        tasks = await self.load_tasks()
+        The in-memory task is updated and the change is appended to the
+        task journal. tasks.md itself is rewritten by a debounced writer,
+        so a burst of updates costs one rewrite; see flush_tasks().
+        """
         
-        for task in tasks:
-            if task.id == task_id:
-                task.status = status
-                break
+        if self._tasks_index is None or self._tasks_signature() != self._index_signature:
+            await self.load_tasks()
+        
+        async with self._tasks_lock:
+            task = self._tasks_index.get(task_id)
+            if task is None:
+                logger.warning(f"Task {task_id} not found")
+                return
+            
+            task.status = status
+            await _write_text_async(
+                self._journal_file,
+                f"{task_id} {status.value} {utc_now().isoformat()}\n",
+                mode="a"
+            )
+            self._index_signature = self._tasks_signature()
+            self._dirty = True
+        
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_tasks_later())
         
-        await self.save_tasks(tasks)
         logger.info(f"Updated task {task_id} to status {status.value}")
     
+    async def _flush_tasks_later(self) -> None:
+        """Write pending status updates after the debounce delay."""
+        
+        await asyncio.sleep(settings.tasks_flush_delay_seconds)
+        try:
+            await self.flush_tasks()
+        except Exception as e:
+            # The journal still holds the updates
+            logger.error(f"Failed to write {self.tasks_file}: {e}")
+    
+    async def flush_tasks(self) -> None:
+        """Write pending in-memory status updates to tasks.md."""
+        
+        async with self._tasks_lock:
+            if self._dirty and self._tasks_index is not None:
+                await self._write_tasks(list(self._tasks_index.values()))
+    
+    async def compact_tasks(self) -> None:
+        """Fold the task journal into tasks.md."""
+        
+        if self._journal_file.exists():
+            await self.save_tasks(await self.load_tasks())
+    
     def _parse_markdown_sections(self, content: str) -> Dict[str, str]:
         """Parse markdown into sections by headers."""
         
         sections = {}
         current_section = None
-        current_content = []
-        
-        for line in content.split("\n"):
-            if line.startswith("##"):
+        current_parts = []
+        body_start = 0
+        
+        # Jump from header to header; section bodies are sliced, not rebuilt
+        # line by line
+        for match in _HEADER_RE.finditer(content):
+            if current_section:
+                current_parts.append(content[body_start:match.start()])
+            body_start = match.end() + 1
+            
+            if len(match.group(1)) > 1:
                 if current_section:
-                    sections[current_section] = "\n".join(current_content).strip()
-                current_section = line.lstrip("#").strip().lower()
-                current_content = []
-            elif line.startswith("#"):
-                sections["title"] = line.lstrip("#").strip()
+                    sections[current_section] = "".join(current_parts).strip()
+                current_section = match.group(2).strip().lower()
+                current_parts = []
             else:
-                current_content.append(line)
+                sections["title"] = match.group(2).strip()
         
         if current_section:
-            sections[current_section] = "\n".join(current_content).strip()
+            current_parts.append(content[body_start:])
+            sections[current_section] = "".join(current_parts).strip()
         
         return sections
     
@@ -227,69 +590,6 @@ class SpecHydration:
         # Simplified - would implement tree parsing
         return {"raw": content}
     
-    def _parse_tasks_markdown(self, content: str) -> List[Task]:
-        """Parse tasks from markdown checklist."""
-        
-        tasks = []
-        current_task = None
-        
-        for line in content.split("\n"):
-            line = line.strip()
-            
-            # Task checkbox line
-            if line.startswith("- ["):
-                if current_task:
-                    tasks.append(current_task)
-                
-                # Extract checkbox state
-                is_completed = "x" in line[3:5].lower()
-                
-                # Extract title and ID
-                rest = line[5:].strip()
-                if "`" in rest:
-                    title_part, id_part = rest.split("`", 1)
-                    title = title_part.strip().lstrip("**").rstrip("**").strip()
-                    task_id = id_part.strip("`").strip()
-                else:
-                    title = rest.strip().lstrip("**").rstrip("**").strip()
-                    task_id = f"task_{len(tasks) + 1}"
-                
-                current_task = Task(
-                    id=task_id,
-                    title=title,
-                    description="",
-                    status=TaskStatus.COMPLETED if is_completed else TaskStatus.PENDING
-                )
-            
-            # Task metadata lines
-            elif current_task and line.startswith("- "):
-                if "Status:" in line:
-                    status_str = line.split("Status:")[1].strip()
-                    try:
-                        current_task.status = TaskStatus(status_str)
-                    except ValueError:
-                        pass
-                
-                elif "Priority:" in line:
-                    priority_str = line.split("Priority:")[1].strip()
-                    from src.core.models import TaskPriority
-                    try:
-                        current_task.priority = TaskPriority(priority_str)
-                    except ValueError:
-                        pass
-                
-                elif "Depends on:" in line:
-                    deps = line.split("Depends on:")[1].strip()
-                    current_task.dependencies = [d.strip() for d in deps.split(",")]
-                
-                elif "Description:" in line:
-                    current_task.description = line.split("Description:")[1].strip()
-        
-        if current_task:
-            tasks.append(current_task)
-        
-        return tasks
-    
     def _format_list(self, items: List[str]) -> str:
         """Format list as markdown."""
         return "\n".join(f"- {item}" for item in items)
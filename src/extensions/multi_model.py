@@ -2,6 +2,8 @@
 Multi-model routing for optimal agent selection.
 """
 
+import re
+from collections import defaultdict
 from typing import Optional
 from loguru import logger
 
@@ -9,6 +11,34 @@ from src.core.agent_registry import agent_registry
 from src.core.models import AgentRole, Task
 
 
+# Keywords that signal a complex task
+COMPLEXITY_KEYWORDS = (
+    "architecture", "design", "scalable", "distributed",
+    "optimization", "algorithm", "performance", "security",
+    "integration", "microservice", "async", "concurrent"
+)
+
+# One scan of the lowercased description for all keywords; the zero-width
+# lookahead reports overlapping matches, keeping plain substring semantics
+_COMPLEXITY_RE = re.compile(
+    "(?=(" + "|".join(map(re.escape, COMPLEXITY_KEYWORDS)) + "))"
+)
+
+# min(matches / 5, 0.3) is capped from this many distinct keywords on
+_KEYWORD_SATURATION = 2
+
+# Languages handled by each worker
+_BACKEND_LANGS = frozenset({
+    "python", "go", "rust", "java", "c", "cpp", "c++",
+    "ruby", "php", "elixir", "scala", "kotlin"
+})
+
+_FRONTEND_LANGS = frozenset({
+    "javascript", "typescript", "jsx", "tsx",
+    "html", "css", "scss", "sass", "vue", "svelte"
+})
+
+
 class MultiModelRouter:
     """
     Routes tasks to optimal models based on complexity and content.
@@ -24,6 +54,7 @@ class MultiModelRouter:
     def __init__(self):
         self.registry = agent_registry
         self._complexity_cache = {}
+        self._complexity_cache_size = 4096
     
     def route_task(self, task: Task) -> AgentRole:
         """
@@ -40,11 +71,16 @@ class MultiModelRouter:
             logger.info(f"Task {task.id} pre-assigned to {task.assigned_agent.value}")
             return task.assigned_agent
         
+        # Lowercase once for both keyword scans
+        desc_lower = task.description.lower()
+        
         # Calculate complexity score
-        complexity = self._calculate_complexity(task)
+        complexity = self._calculate_complexity(task, desc_lower=desc_lower)
         
         # Use registry's keyword-based routing as baseline
-        suggested_role = self.registry.route_task_to_agent(task.description)
+        suggested_role = self.registry.route_task_to_agent(
+            task.description, desc_lower=desc_lower
+        )
         
         # Adjust based on complexity
         if complexity > 0.8:
@@ -58,7 +94,7 @@ class MultiModelRouter:
         logger.info(f"Task {task.id} routed to {suggested_role.value}")
         return suggested_role
     
-    def _calculate_complexity(self, task: Task) -> float:
+    def _calculate_complexity(self, task: Task, desc_lower: Optional[str] = None) -> float:
         """
         Calculate task complexity score (0-1).
         
@@ -67,7 +103,21 @@ class MultiModelRouter:
         - Number of requirements
         - Presence of complexity keywords
         - Number of dependencies
+        
+        Scores are memoized per task. The key includes every input, so a
+        task that is edited (e.g. on replan) is rescored.
+        
+        Args:
+            task: Task to score
+            desc_lower: Lowercased description, if the caller already has it
         """
+        requirements = task.metadata.get("requirements", [])
+        key = (task.id, task.description, len(requirements), len(task.dependencies))
+        
+        cached = self._complexity_cache.get(key)
+        if cached is not None:
+            return cached
+        
         score = 0.0
         
         # Description length (longer = more complex)
@@ -75,27 +125,34 @@ class MultiModelRouter:
         score += min(desc_length / 200, 0.3)  # Max 0.3 from length
         
         # Requirements count
-        requirements = task.metadata.get("requirements", [])
         score += min(len(requirements) / 10, 0.2)  # Max 0.2 from requirements
         
-        # Complexity keywords
-        complexity_keywords = [
-            "architecture", "design", "scalable", "distributed",
-            "optimization", "algorithm", "performance", "security",
-            "integration", "microservice", "async", "concurrent"
-        ]
-        
-        desc_lower = task.description.lower()
-        keyword_matches = sum(
-            1 for keyword in complexity_keywords 
-            if keyword in desc_lower
-        )
-        score += min(keyword_matches / 5, 0.3)  # Max 0.3 from keywords
+        # Complexity keywords (each distinct keyword counts once); the scan
+        # stops as soon as the keyword score is saturated
+        if desc_lower is None:
+            desc_lower = task.description.lower()
+        keywords = set()
+        for match in _COMPLEXITY_RE.finditer(desc_lower):
+            keywords.add(match.group(1))
+            if len(keywords) >= _KEYWORD_SATURATION:
+                break
+        score += min(len(keywords) / 5, 0.3)  # Max 0.3 from keywords
         
         # Dependencies (more deps = more complex coordination)
         score += min(len(task.dependencies) / 5, 0.2)  # Max 0.2 from deps
         
-        return min(score, 1.0)
+        score = min(score, 1.0)
+        
+        # Bounded FIFO eviction
+        if len(self._complexity_cache) >= self._complexity_cache_size:
+            del self._complexity_cache[next(iter(self._complexity_cache))]
+        self._complexity_cache[key] = score
+        
+        return score
+    
+    def clear_cache(self) -> None:
+        """Drop all memoized complexity scores."""
+        self._complexity_cache.clear()
     
     def select_worker_for_language(self, language: str) -> AgentRole:
         """
@@ -107,21 +164,11 @@ class MultiModelRouter:
         Returns:
             Optimal worker role
         """
-        backend_languages = {
-            "python", "go", "rust", "java", "c", "cpp", "c++",
-            "ruby", "php", "elixir", "scala", "kotlin"
-        }
-        
-        frontend_languages = {
-            "javascript", "typescript", "jsx", "tsx",
-            "html", "css", "scss", "sass", "vue", "svelte"
-        }
-        
         language_lower = language.lower()
         
-        if language_lower in backend_languages:
+        if language_lower in _BACKEND_LANGS:
             return AgentRole.WORKER_BACKEND
-        elif language_lower in frontend_languages:
+        elif language_lower in _FRONTEND_LANGS:
             return AgentRole.WORKER_FRONTEND
         else:
             # Default to backend for unknown languages
@@ -137,14 +184,13 @@ class MultiModelRouter:
         Returns:
             Dictionary mapping agent roles to their tasks
         """
-        grouped = {role: [] for role in AgentRole}
+        # Only roles that actually receive a task get a bucket
+        grouped = defaultdict(list)
         
         for task in tasks:
-            role = self.route_task(task)
-            grouped[role].append(task)
+            grouped[self.route_task(task)].append(task)
         
-        # Filter out empty groups
-        return {role: tasks for role, tasks in grouped.items() if tasks}
+        return dict(grouped)
 
 
 # Global router instance
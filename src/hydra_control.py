@@ -20,12 +20,18 @@ from src.memory import knowledge_base
 
 
 def setup_logging():
-    """Configure logging."""
+    """
+    Configure logging.
+    
+    Sinks are enqueued: records are formatted and written by a background
+    thread, so log calls never block the event loop on I/O.
+    """
     logger.remove()
     logger.add(
         sys.stderr,
         format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan> - <level>{message}</level>",
-        level=settings.log_level
+        level=settings.log_level,
+        enqueue=True
     )
     
     if settings.log_file:
@@ -34,7 +40,8 @@ def setup_logging():
             settings.log_file,
             rotation="100 MB",
             retention="30 days",
-            level=settings.log_level
+            level=settings.log_level,
+            enqueue=True
         )
 
 
@@ -138,9 +145,15 @@ def main():
         
         async def run_task():
             await initialize_system()
-            from src.orchestration import task_dispatcher
-            result = await task_dispatcher.execute_task(task)
-            logger.info(f"Task result: {result}")
+            from src.orchestration import task_dispatcher, execution_sandbox
+            from src.agents.agent_client import aclose_http_client
+            try:
+                result = await task_dispatcher.execute_task(task)
+                logger.info(f"Task result: {result}")
+            finally:
+                await execution_sandbox.close()
+                await aclose_http_client()
+                await logger.complete()
         
         asyncio.run(run_task())
     
@@ -2,15 +2,23 @@
 Episodic memory for tracking agent experiences and debugging.
 """
 
+import asyncio
+import time
 import uuid
-from datetime import datetime
-from typing import Dict, List, Optional
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set
 from loguru import logger
 
 from src.core.models import Task, AgentRole, ExecutionMetrics
 from src.memory.persistent_memory import persistent_memory
 
 
+def _ns_to_iso(ts_ns: int) -> str:
+    """Format a time.time_ns() stamp as a UTC ISO 8601 string."""
+    return datetime.fromtimestamp(ts_ns / 1e9, tz=timezone.utc).isoformat()
+
+
 class EpisodicMemory:
     """
     Tracks episodes (sequences of events) for learning and debugging.
@@ -25,6 +33,9 @@ class EpisodicMemory:
     def __init__(self):
         self.memory = persistent_memory
         self.active_episodes = {}
+        
+        # In-flight background stores (strong refs keep them from being GC'd)
+        self._pending_stores: Set[asyncio.Task] = set()
     
     async def start_episode(
         self,
@@ -47,7 +58,8 @@ class EpisodicMemory:
             "id": episode_id,
             "task_id": task.id,
             "task_title": task.title,
-            "started_at": datetime.utcnow(),
+            "started_at_ns": time.time_ns(),
+            "_t0": time.monotonic(),  # Events store offsets from this
             "events": [],
             "context": context,
             "status": "active"
@@ -80,15 +92,18 @@ class EpisodicMemory:
             logger.warning(f"Episode {episode_id} not found")
             return
         
+        episode = self.active_episodes[episode_id]
+        
+        # Seconds since episode start; ISO timestamps are built on store
         event = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "t_rel": time.monotonic() - episode["_t0"],
             "type": event_type,
             "agent": agent_role.value,
             "data": data,
             "metadata": metadata or {}
         }
         
-        self.active_episodes[episode_id]["events"].append(event)
+        episode["events"].append(event)
         logger.debug(f"Recorded {event_type} event in episode {episode_id}")
     
     async def end_episode(
@@ -100,6 +115,9 @@ class EpisodicMemory:
         """
         End an episode and store it in persistent memory.
         
+        The store runs in the background so callers do not wait on the
+        embedding and vector DB write; await flush() before shutdown.
+        
         Args:
             episode_id: Episode ID
             success: Whether the episode succeeded
@@ -110,11 +128,9 @@ class EpisodicMemory:
             return
         
         episode = self.active_episodes[episode_id]
-        episode["ended_at"] = datetime.utcnow()
+        episode["ended_at_ns"] = time.time_ns()
         episode["status"] = "success" if success else "failure"
-        episode["duration_seconds"] = (
-            episode["ended_at"] - episode["started_at"]
-        ).total_seconds()
+        episode["duration_seconds"] = time.monotonic() - episode["_t0"]
         
         if metrics:
             episode["metrics"] = {
@@ -123,34 +139,51 @@ class EpisodicMemory:
                 "consensus_rounds": metrics.consensus_rounds
             }
         
-        # Store in persistent memory
-        await self._store_episode(episode)
+        # Store in persistent memory (in the background)
+        store = asyncio.create_task(self._store_episode(episode))
+        self._pending_stores.add(store)
+        store.add_done_callback(self._on_store_done)
         
         # Remove from active episodes
         del self.active_episodes[episode_id]
         
         logger.info(f"Ended episode {episode_id} - {episode['status']}")
     
+    def _on_store_done(self, store: asyncio.Task) -> None:
+        """Forget a finished background store, logging any failure."""
+        
+        self._pending_stores.discard(store)
+        if not store.cancelled() and store.exception() is not None:
+            logger.error(f"Failed to store episode: {store.exception()}")
+    
+    async def flush(self) -> None:
+        """Wait for all background episode stores to finish."""
+        
+        if self._pending_stores:
+            await asyncio.gather(*self._pending_stores, return_exceptions=True)
+    
     async def _store_episode(self, episode: Dict) -> None:
         """Store episode in persistent memory."""
         
+        # Materialize event timestamps from their offsets
+        started_at_ns = episode['started_at_ns']
+        for event in episode['events']:
+            event['timestamp'] = _ns_to_iso(started_at_ns + int(event['t_rel'] * 1e9))
+        
         # Create summary for embedding
-        summary = f"""
+        parts = [f"""
 Task: {episode['task_title']}
 Duration: {episode.get('duration_seconds', 0):.2f}s
 Status: {episode['status']}
 Events: {len(episode['events'])}
-"""
+"""]
         
-        # Add event summary
-        event_types = {}
-        for event in episode['events']:
-            event_type = event['type']
-            event_types[event_type] = event_types.get(event_type, 0) + 1
+        # Add event summary (counted in one pass, joined once)
+        event_types = Counter(event['type'] for event in episode['events'])
         
-        summary += "\nEvent Breakdown:\n"
-        for event_type, count in event_types.items():
-            summary += f"- {event_type}: {count}\n"
+        parts.append("\nEvent Breakdown:\n")
+        parts.extend(f"- {event_type}: {count}\n" for event_type, count in event_types.items())
+        summary = "".join(parts)
         
         metadata = {
             "type": "episode",
@@ -158,7 +191,7 @@ Events: {len(episode['events'])}
             "status": episode['status'],
             "duration": episode.get('duration_seconds', 0),
             "event_count": len(episode['events']),
-            "started_at": episode['started_at'].isoformat()
+            "started_at": _ns_to_iso(episode['started_at_ns'])
         }
         
         await self.memory.store(
@@ -2,13 +2,35 @@
 Knowledge base management and seeding.
 """
 
+import asyncio
+import hashlib
+from collections import defaultdict
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 from loguru import logger
+import orjson
 
 from src.memory.persistent_memory import persistent_memory
 
 
+# Seed corpora shipped with the package
+_BUNDLED_SEEDS_DIR = Path(__file__).parent / "seeds"
+
+# Knowledge type -> collection; unknown types go to experiences
+_KNOWLEDGE_COLLECTIONS = {
+    "pattern": "code_patterns",
+    "practice": "code_patterns",
+    "error": "errors",
+    "solution": "solutions",
+    "experience": "experiences"
+}
+
+
+def _seed_id(*parts: str) -> str:
+    """Deterministic entry ID for a seed, so re-seeding never duplicates it."""
+    return hashlib.blake2b("\x1f".join(parts).encode(), digest_size=16).hexdigest()
+
+
 class KnowledgeBase:
     """
     Manages the knowledge base for the swarm.
@@ -18,6 +40,10 @@ class KnowledgeBase:
     - Best practices
     - Library documentation summaries
     - Error solutions
+    
+    Seed corpora are JSON files. A file of the same name in
+    ./knowledge_seeds overrides the bundled copy, so seeds can be edited
+    without touching code.
     """
     
     def __init__(self):
@@ -34,233 +60,123 @@ class KnowledgeBase:
         """
         logger.info("Seeding knowledge base...")
         
+        # Seeders run concurrently; writes to a shared collection are
+        # serialized by persistent memory
+        patterns_seeded, practices_seeded, errors_seeded = await asyncio.gather(
+            self._seed_design_patterns(),
+            self._seed_best_practices(),
+            self._seed_common_errors()
+        )
+        
         stats = {
-            "patterns": 0,
-            "best_practices": 0,
-            "common_errors": 0
+            "patterns": patterns_seeded,
+            "best_practices": practices_seeded,
+            "common_errors": errors_seeded
         }
         
-        # Seed design patterns
-        patterns_seeded = await self._seed_design_patterns()
-        stats["patterns"] = patterns_seeded
+        logger.info(f"Knowledge base seeded: {stats}")
+        return stats
+    
+    def _load_seeds(self, filename: str) -> List[Dict]:
+        """Load a seed corpus, preferring a local override."""
         
-        # Seed best practices
-        practices_seeded = await self._seed_best_practices()
-        stats["best_practices"] = practices_seeded
+        path = self.seed_data_dir / filename
+        if not path.is_file():
+            path = _BUNDLED_SEEDS_DIR / filename
+        return orjson.loads(path.read_bytes())
+    
+    async def _unseeded(
+        self,
+        collection_name: str,
+        seeds: List[Dict],
+        seed_id: Callable[[Dict], str]
+    ) -> Tuple[List[str], List[Dict]]:
+        """
+        Drop seeds already stored in a collection.
         
-        # Seed common errors
-        errors_seeded = await self._seed_common_errors()
-        stats["common_errors"] = errors_seeded
+        Returns:
+            IDs and seeds still to store (existing seeds cost no embedding)
+        """
+        ids = [seed_id(seed) for seed in seeds]
+        existing = await self.memory.existing_ids(collection_name, ids)
         
-        logger.info(f"Knowledge base seeded: {stats}")
-        return stats
+        missing = [(i, seed) for i, seed in zip(ids, seeds) if i not in existing]
+        return [i for i, _ in missing], [seed for _, seed in missing]
     
     async def _seed_design_patterns(self) -> int:
         """Seed common design patterns."""
         
-        patterns = [
-            {
-                "name": "Singleton Pattern",
-                "language": "python",
-                "context": "Ensure a class has only one instance",
-                "code": """
-class Singleton:
-    _instance = None
-    
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
-"""
-            },
-            {
-                "name": "Factory Pattern",
-                "language": "python",
-                "context": "Create objects without specifying exact class",
-                "code": """
-class ShapeFactory:
-    @staticmethod
-    def create_shape(shape_type: str):
-        if shape_type == "circle":
-            return Circle()
-        elif shape_type == "square":
-            return Square()
-        raise ValueError(f"Unknown shape: {shape_type}")
-"""
-            },
-            {
-                "name": "Async Context Manager",
-                "language": "python",
-                "context": "Resource management with async/await",
-                "code": """
-class AsyncResource:
-    async def __aenter__(self):
-        await self.connect()
-        return self
-    
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.disconnect()
-"""
-            },
+        ids, patterns = await self._unseeded(
+            "code_patterns",
+            self._load_seeds("design_patterns.json"),
+            lambda pattern: _seed_id("pattern", pattern["name"], pattern["language"])
+        )
+        if not patterns:
+            return 0
+        
+        # One batched write for the whole collection
+        entries = await self.memory.store_code_patterns([
             {
-                "name": "Repository Pattern",
-                "language": "python",
-                "context": "Abstract data access layer",
-                "code": """
-class Repository:
-    def __init__(self, db):
-        self.db = db
-    
-    async def get(self, id: str):
-        return await self.db.query(f"SELECT * WHERE id={id}")
-    
-    async def save(self, entity):
-        return await self.db.insert(entity)
-"""
+                "pattern_name": pattern["name"],
+                "code": pattern["code"],
+                "language": pattern["language"],
+                "context": pattern["context"],
+                "success_metrics": {"success_rate": 1.0, "usage_count": 0}
             }
-        ]
-        
-        count = 0
-        for pattern in patterns:
-            await self.memory.store_code_pattern(
-                pattern_name=pattern["name"],
-                code=pattern["code"],
-                language=pattern["language"],
-                context=pattern["context"],
-                success_metrics={"success_rate": 1.0, "usage_count": 0}
-            )
-            count += 1
+            for pattern in patterns
+        ], ids=ids)
         
-        return count
+        return len(entries)
     
     async def _seed_best_practices(self) -> int:
         """Seed coding best practices."""
         
-        practices = [
-            {
-                "title": "Error Handling Best Practices",
-                "language": "python",
-                "content": """
-Always handle specific exceptions first, generic ones last.
-Use context managers for resource cleanup.
-Log errors with context for debugging.
-
-Example:
-try:
-    result = await operation()
-except SpecificError as e:
-    logger.error(f"Specific error: {e}")
-    handle_specific()
-except Exception as e:
-    logger.error(f"Unexpected error: {e}")
-    handle_generic()
-finally:
-    cleanup()
-"""
-            },
-            {
-                "title": "Async Best Practices",
-                "language": "python",
-                "content": """
-Use asyncio.gather() for parallel execution.
-Use asyncio.wait_for() for timeouts.
-Avoid blocking operations in async code.
-
-Example:
-results = await asyncio.gather(
-    task1(),
-    task2(),
-    return_exceptions=True
-)
-"""
-            },
-            {
-                "title": "Type Hints Best Practices",
-                "language": "python",
-                "content": """
-Always use type hints for function parameters and returns.
-Use Optional[] for values that can be None.
-Use List[], Dict[] for generic containers.
-
-Example:
-async def process(data: List[str], timeout: Optional[int] = None) -> Dict[str, any]:
-    ...
-"""
-            }
-        ]
-        
-        count = 0
-        for practice in practices:
-            await self.memory.store(
-                content=practice["content"],
-                collection_name="code_patterns",
-                metadata={
+        ids, practices = await self._unseeded(
+            "code_patterns",
+            self._load_seeds("best_practices.json"),
+            lambda practice: _seed_id("practice", practice["title"], practice["language"])
+        )
+        if not practices:
+            return 0
+        
+        entries = await self.memory.store_many(
+            contents=[practice["content"] for practice in practices],
+            collection_name="code_patterns",
+            metadatas=[
+                {
                     "type": "best_practice",
                     "title": practice["title"],
                     "language": practice["language"]
                 }
-            )
-            count += 1
+                for practice in practices
+            ],
+            ids=ids
+        )
         
-        return count
+        return len(entries)
     
     async def _seed_common_errors(self) -> int:
         """Seed common error resolutions."""
         
-        errors = [
-            {
-                "error": "ModuleNotFoundError: No module named 'X'",
-                "context": "Python import error",
-                "resolution": """
-1. Check if package is installed: pip list | grep X
-2. Install if missing: pip install X
-3. Verify virtual environment is activated
-4. Check for typos in import statement
-"""
-            },
-            {
-                "error": "TypeError: 'NoneType' object is not iterable",
-                "context": "Attempting to iterate over None",
-                "resolution": """
-1. Add None check before iteration
-2. Use default value: for item in (items or [])
-3. Ensure function returns expected type
-4. Add type hints to catch early
-"""
-            },
-            {
-                "error": "asyncio.TimeoutError",
-                "context": "Async operation timed out",
-                "resolution": """
-1. Increase timeout if operation is legitimately slow
-2. Check for deadlocks in async code
-3. Add progress logging to identify bottleneck
-4. Consider breaking into smaller operations
-"""
-            },
+        ids, errors = await self._unseeded(
+            "errors",
+            self._load_seeds("errors.json"),
+            lambda error: _seed_id("error", error["error"])
+        )
+        if not errors:
+            return 0
+        
+        entries = await self.memory.store_error_resolutions([
             {
-                "error": "ConnectionRefusedError: [Errno 111] Connection refused",
-                "context": "Cannot connect to service",
-                "resolution": """
-1. Check if service is running: docker ps, systemctl status
-2. Verify correct host and port
-3. Check firewall rules
-4. Ensure service is bound to correct interface
-"""
+                "error_message": error["error"],
+                "context": error["context"],
+                "resolution": error["resolution"],
+                "success": True
             }
-        ]
-        
-        count = 0
-        for error in errors:
-            await self.memory.store_error_resolution(
-                error_message=error["error"],
-                context=error["context"],
-                resolution=error["resolution"],
-                success=True
-            )
-            count += 1
+            for error in errors
+        ], ids=ids)
         
-        return count
+        return len(entries)
     
     async def add_custom_knowledge(
         self,
@@ -278,31 +194,52 @@ async def process(data: List[str], timeout: Optional[int] = None) -> Dict[str, a
             knowledge_type: Type (pattern, practice, error, etc.)
             metadata: Additional metadata
         """
-        full_metadata = metadata or {}
-        full_metadata.update({
-            "type": knowledge_type,
+        await self.add_custom_knowledge_many([{
             "title": title,
-            "custom": True
-        })
-        
-        # Determine collection based on type
-        collection_map = {
-            "pattern": "code_patterns",
-            "practice": "code_patterns",
-            "error": "errors",
-            "solution": "solutions",
-            "experience": "experiences"
-        }
+            "content": content,
+            "knowledge_type": knowledge_type,
+            "metadata": metadata
+        }])
+    
+    async def add_custom_knowledge_many(self, entries: List[Dict]) -> None:
+        """
+        Add several custom knowledge entries to the base.
         
-        collection = collection_map.get(knowledge_type, "experiences")
+        Entries are grouped by collection and each group is stored with a
+        single batched write.
         
-        await self.memory.store(
-            content=content,
-            collection_name=collection,
-            metadata=full_metadata
-        )
+        Args:
+            entries: Dicts with title, content, knowledge_type and optional
+                metadata (same meaning as add_custom_knowledge's arguments)
+        """
+        groups: Dict[str, Tuple[List[str], List[Dict]]] = defaultdict(lambda: ([], []))
+        
+        for entry in entries:
+            knowledge_type = entry["knowledge_type"]
+            full_metadata = entry.get("metadata") or {}
+            full_metadata.update({
+                "type": knowledge_type,
+                "title": entry["title"],
+                "custom": True
+            })
+            
+            # Determine collection based on type
+            collection = _KNOWLEDGE_COLLECTIONS.get(knowledge_type, "experiences")
+            contents, metadatas = groups[collection]
+            contents.append(entry["content"])
+            metadatas.append(full_metadata)
+        
+        await asyncio.gather(*(
+            self.memory.store_many(
+                contents=contents,
+                collection_name=collection,
+                metadatas=metadatas
+            )
+            for collection, (contents, metadatas) in groups.items()
+        ))
         
-        logger.info(f"Added custom knowledge: {title}")
+        for entry in entries:
+            logger.info(f"Added custom knowledge: {entry['title']}")
 
 
 # Global knowledge base instance
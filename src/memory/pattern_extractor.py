@@ -3,13 +3,164 @@ Pattern extraction from successful code implementations.
 """
 
 import re
-from typing import Dict, List, Optional
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Dict, List, Optional, Set, Tuple
 from loguru import logger
 
 from src.core.models import CodeCandidate, ConsensusResult
 from src.memory.persistent_memory import persistent_memory
 
 
+# Function or class header lines (matched at line start; the named group
+# "func" or "cls" tells which), the rest of a header up to its colon (the
+# signature may span lines), a leading docstring, try/except blocks, and
+# what follows "def" in a method header
+_HEADER_LINE_RE = re.compile(
+    r'^(?P<indent>[ \t]*)(?:'
+    r'(?P<func>(?P<is_async>async\s+)?def\s+(?P<func_name>\w+))'
+    r'|(?P<cls>class\s+(?P<cls_name>\w+))'
+    r')',
+    re.MULTILINE
+)
+_HEADER_END_RE = re.compile(r'[^(:\n]*(?:\([^)]*\))?[^:\n]*:')
+_DOCSTRING_RE = re.compile(r'\s*"""[^"]*"""')
+_TRY_RE = re.compile(
+    r'try:\s*(.+?)except\s+(.+?):\s*(.+?)(?=\n(?:try:|def|class|\Z))',
+    re.DOTALL
+)
+_METHOD_TAIL_RE = re.compile(r'\s+\w+\s*\(')
+
+# Comments, strings and brackets, scanned left to right so quotes inside
+# comments and "#" or brackets inside strings are not misread. Triple-quoted
+# strings may span lines (an unterminated one runs to the end). Bracket pairs
+# closed on the same line with nothing nested are skipped as one token.
+_LEXICAL_RE = re.compile(
+    r'[(\[{][^()\[\]{}\'"#\n]*[)\]}]'
+    r'|#[^\n]*'
+    r'|(?P<triple>"""[^"\\]*(?:(?:\\.|"(?!""))[^"\\]*)*(?:"""|\Z)'
+    r"|'''[^'\\]*(?:(?:\\.|'(?!''))[^'\\]*)*(?:'''|\Z))"
+    r'|"[^"\\\n]*(?:\\.[^"\\\n]*)*"'
+    r"|'[^'\\\n]*(?:\\.[^'\\\n]*)*'"
+    r'|(?P<open>[(\[{])|(?P<close>[)\]}])',
+    re.DOTALL
+)
+
+
+def _continuation_lines(code: str, line_starts: List[int]) -> Set[int]:
+    """
+    Find lines that continue an earlier line.
+    
+    A line continues another if it starts inside a triple-quoted string or
+    inside open brackets (e.g. a multi-line signature). Its indentation says
+    nothing about block structure.
+    
+    Args:
+        code: Source code
+        line_starts: Offset of each line in code
+    
+    Returns:
+        Indices of continuation lines
+    """
+    continued = set()
+    
+    def mark(start: int, end: int) -> None:
+        # Lines starting after start, up to and including end
+        continued.update(range(bisect_right(line_starts, start), bisect_right(line_starts, end)))
+    
+    depth = 0
+    opened_at = 0
+    for match in _LEXICAL_RE.finditer(code):
+        kind = match.lastgroup
+        if kind == "open":
+            if depth == 0:
+                opened_at = match.start()
+            depth += 1
+        elif kind == "close":
+            if depth:
+                depth -= 1
+                if depth == 0:
+                    mark(opened_at, match.start())
+        elif kind == "triple" and depth == 0:
+            mark(match.start(), match.end() - 1)
+    
+    if depth:
+        mark(opened_at, len(code))
+    
+    return continued
+
+
+def _scan_definitions(code: str) -> List[Tuple[str, re.Match, str, str]]:
+    """
+    Find function and class definitions in one pass over the lines.
+    
+    Headers are found by one anchored regex scan over the whole code. A
+    definition's block runs until the next code line indented at or below
+    its header (blank and comment lines never close a block, and neither
+    do lines inside multi-line strings or brackets). Lines are split on
+    "\n" only, like the regex's "^". Open blocks are kept on a stack, so
+    nesting costs nothing extra.
+    
+    Args:
+        code: Source code
+    
+    Returns:
+        (kind, header match, block code, body) per definition in source
+        order; kind is "function" or "class", the body excludes the header
+        line and a leading docstring
+    """
+    lines = code.split("\n")
+    offsets = [0, *accumulate(len(line) + 1 for line in lines)]
+    headers = {match.start(): match for match in _HEADER_LINE_RE.finditer(code)}
+    continued = _continuation_lines(code, offsets[:-1])
+    
+    found = []
+    open_blocks = []  # (indent, header line index, kind, match)
+    last_code_line = -1
+    
+    def close(block, end_line):
+        _, start, kind, match = block
+        header_start = offsets[start] + len(match.group("indent"))
+        block_code = code[header_start:offsets[end_line]].rstrip()
+        header_end = _HEADER_END_RE.match(block_code)
+        if header_end:
+            body = block_code[header_end.end():]
+        else:
+            body = block_code[offsets[start + 1] - header_start:]
+        
+        docstring = _DOCSTRING_RE.match(body)
+        if docstring:
+            body = body[docstring.end():]
+        
+        found.append((start, kind, match, block_code, body.strip()))
+    
+    for i, line in enumerate(lines):
+        if i in continued:
+            if line.strip():
+                last_code_line = i
+            continue
+        
+        stripped = line.lstrip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        
+        indent = len(line) - len(stripped)
+        while open_blocks and open_blocks[-1][0] >= indent:
+            close(open_blocks.pop(), last_code_line + 1)
+        last_code_line = i
+        
+        match = headers.get(offsets[i])
+        if match:
+            kind = "function" if match.lastgroup == "func" else "class"
+            open_blocks.append((indent, i, kind, match))
+    
+    while open_blocks:
+        close(open_blocks.pop(), last_code_line + 1)
+    
+    found.sort(key=lambda item: item[0])
+    return [item[1:] for item in found]
+
+
 class PatternExtractor:
     """
     Extracts reusable patterns from successful code implementations.
@@ -69,47 +220,34 @@ class PatternExtractor:
         - Error handling patterns
         - API usage patterns
         """
-        patterns = []
+        functions = []
+        classes = []
         
-        # Extract functions
-        function_pattern = r'(async\s+)?def\s+(\w+)\s*\([^)]*\):\s*(?:"""[^"]*"""\s*)?(.*?)(?=\n(?:async\s+)?def\s+|\nclass\s+|\Z)'
-        functions = re.finditer(function_pattern, code, re.DOTALL)
-        
-        for match in functions:
-            is_async = bool(match.group(1))
-            func_name = match.group(2)
-            func_body = match.group(3).strip()
+        # Extract functions and classes (bodies delimited by indentation)
+        for kind, match, block_code, body in _scan_definitions(code):
+            if len(body) <= 50:  # Only meaningful definitions
+                continue
             
-            if len(func_body) > 50:  # Only meaningful functions
-                patterns.append({
+            if kind == "function":
+                functions.append({
                     "type": "function",
-                    "name": func_name,
-                    "async": is_async,
-                    "code": match.group(0),
-                    "complexity": self._estimate_complexity(func_body)
+                    "name": match.group("func_name"),
+                    "async": bool(match.group("is_async")),
+                    "code": block_code,
+                    "complexity": self._estimate_complexity(body)
                 })
-        
-        # Extract classes
-        class_pattern = r'class\s+(\w+)(?:\([^)]*\))?:\s*(?:"""[^"]*"""\s*)?(.*?)(?=\nclass\s+|\Z)'
-        classes = re.finditer(class_pattern, code, re.DOTALL)
-        
-        for match in classes:
-            class_name = match.group(1)
-            class_body = match.group(2).strip()
-            
-            if len(class_body) > 50:
-                patterns.append({
+            else:
+                classes.append({
                     "type": "class",
-                    "name": class_name,
-                    "code": match.group(0),
-                    "methods": self._count_methods(class_body)
+                    "name": match.group("cls_name"),
+                    "code": block_code,
+                    "methods": self._count_methods(body)
                 })
         
-        # Extract error handling patterns
-        try_pattern = r'try:\s*(.+?)except\s+(.+?):\s*(.+?)(?=\n(?:try:|def|class|\Z))'
-        error_handlers = re.finditer(try_pattern, code, re.DOTALL)
+        patterns = functions + classes
         
-        for match in error_handlers:
+        # Extract error handling patterns
+        for match in _TRY_RE.finditer(code):
             patterns.append({
                 "type": "error_handling",
                 "exception": match.group(2).strip(),
@@ -168,8 +306,18 @@ Pattern Type: {pattern['type']}
     
     def _count_methods(self, class_body: str) -> int:
         """Count methods in a class."""
-        method_pattern = r'def\s+\w+\s*\('
-        return len(re.findall(method_pattern, class_body))
+        # str.find jumps between "def" occurrences in C; only those
+        # candidates are checked against the rest of the header
+        count = 0
+        pos = class_body.find("def")
+        while pos != -1:
+            match = _METHOD_TAIL_RE.match(class_body, pos + 3)
+            if match:
+                count += 1
+                pos = class_body.find("def", match.end())
+            else:
+                pos = class_body.find("def", pos + 1)
+        return count
     
     async def suggest_patterns(
         self,
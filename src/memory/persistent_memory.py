@@ -2,17 +2,160 @@
 ChromaDB-based persistent memory system.
 """
 
+import asyncio
+import hashlib
+import os
+import re
+import time
 import uuid
-from datetime import datetime
-from typing import Dict, List, Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from loguru import logger
-import chromadb
-from chromadb.config import Settings
+import numpy as np
+import orjson
 
 from src.core.config import settings
 from src.core.models import MemoryEntry
 
 
+# Collections for the different memory types
+_COLLECTION_NAMES = ("code_patterns", "solutions", "errors", "experiences")
+
+# Error keyword -> (precedence, category); the lowest precedence present wins
+_ERROR_CATEGORIES = {
+    "syntax": (0, "syntax"),
+    "import": (1, "import"),
+    "module": (1, "import"),
+    "type": (2, "type"),
+    "attribute": (3, "attribute"),
+    "name": (4, "name"),
+    "index": (5, "index"),
+    "key": (6, "key"),
+}
+
+# One scan for every keyword; the zero-width lookahead reports overlapping
+# matches, keeping plain substring semantics
+_ERROR_CLASS_RE = re.compile("(?=(" + "|".join(_ERROR_CATEGORIES) + "))")
+
+
+def _created_at(metadata: Dict) -> datetime:
+    """Creation time of a stored entry from its metadata."""
+    created_at_ns = metadata.get("created_at_ns")
+    if created_at_ns is not None:
+        return datetime.fromtimestamp(created_at_ns / 1e9, tz=timezone.utc)
+    # Entries stored before created_at_ns carry a naive UTC ISO string
+    return datetime.fromisoformat(metadata["created_at"]).replace(tzinfo=timezone.utc)
+
+
+def _is_equality_filter(filter_metadata: Optional[Dict]) -> bool:
+    """Whether a metadata filter only uses plain key == value conditions."""
+    if not filter_metadata:
+        return True
+    return not any(
+        key.startswith("$") or isinstance(value, (dict, list))
+        for key, value in filter_metadata.items()
+    )
+
+
+class _HotMirror:
+    """
+    In-memory copy of a small collection for exact brute-force search.
+    
+    Unit-norm float32 embeddings are stacked row-wise in a buffer that
+    doubles when full; ids, documents and metadata are parallel lists.
+    """
+    
+    def __init__(self):
+        self.ids: List[str] = []
+        self.documents: List[str] = []
+        self.metadatas: List[Dict] = []
+        self._rows: Dict[str, int] = {}
+        self._matrix: Optional[np.ndarray] = None
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def upsert(
+        self,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict],
+        embeddings
+    ) -> None:
+        """Add entries, replacing any with the same ID."""
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0.0, 1.0, norms)
+        
+        for entry_id, document, metadata, vector in zip(ids, documents, metadatas, vectors):
+            row = self._rows.get(entry_id)
+            if row is None:
+                row = self._rows[entry_id] = len(self.ids)
+                self._reserve(row + 1, vector.shape[0])
+                self.ids.append(entry_id)
+                self.documents.append(document)
+                self.metadatas.append(dict(metadata))
+            else:
+                self.documents[row] = document
+                self.metadatas[row] = dict(metadata)
+            self._matrix[row] = vector
+    
+    def _reserve(self, size: int, dim: int) -> None:
+        """Grow the embedding buffer to hold at least size rows."""
+        if self._matrix is None:
+            self._matrix = np.empty((max(16, size), dim), dtype=np.float32)
+        elif size > len(self._matrix):
+            grown = np.empty((max(size, 2 * len(self._matrix)), dim), dtype=np.float32)
+            grown[:len(self.ids)] = self._matrix[:len(self.ids)]
+            self._matrix = grown
+    
+    def query(
+        self,
+        query_embedding: np.ndarray,
+        n_results: int,
+        filter_metadata: Optional[Dict] = None
+    ) -> List[int]:
+        """
+        Find the rows most similar to a query.
+        
+        Args:
+            query_embedding: Query embedding
+            n_results: Number of rows to return
+            filter_metadata: Equality conditions rows must satisfy
+        
+        Returns:
+            Row indices, most similar first
+        """
+        count = len(self.ids)
+        if count == 0 or n_results <= 0:
+            return []
+        
+        norm = np.linalg.norm(query_embedding)
+        sims = self._matrix[:count] @ (query_embedding / (norm or 1.0))
+        
+        if filter_metadata:
+            conditions = filter_metadata.items()
+            candidates = np.fromiter(
+                (
+                    i for i, metadata in enumerate(self.metadatas)
+                    if all(metadata.get(key) == value for key, value in conditions)
+                ),
+                dtype=np.intp
+            )
+        else:
+            candidates = np.arange(count)
+        
+        # Top-k in linear time, then sort only those k
+        if len(candidates) > n_results:
+            top = np.argpartition(-sims[candidates], n_results - 1)[:n_results]
+            candidates = candidates[top]
+        
+        return candidates[np.argsort(-sims[candidates], kind="stable")].tolist()
+
+
 class PersistentMemory:
     """
     Persistent memory using ChromaDB vector store.
@@ -22,28 +165,92 @@ class PersistentMemory:
     - Long-term knowledge retention
     - Pattern storage and retrieval
     - Episodic memory for debugging
+    
+    Search results are cached in-process at two levels:
+    1. Exact: LRU with TTL keyed on the query text
+    2. Semantic: a near-duplicate query (cosine similarity of the query
+       embeddings above threshold) with the same collection, filter and
+       n_results reuses the earlier results
+    Each collection has a version number that is part of both cache keys
+    and is bumped on every write, so stale results are never served.
+    
+    Document embeddings are cached by content hash, so storing content
+    seen before (re-seeding, duplicate patterns) skips the embedding model.
+    
+    ChromaDB calls (embedding, HNSW queries, writes) are blocking, so they
+    run on a small dedicated thread pool instead of the event loop.
+    
+    The ChromaDB client and collections are created on first use, so
+    importing the module does not open the store.
+    
+    Collections small enough (memory_hot_mirror_max_entries) are mirrored
+    in memory on first search and searched by brute-force cosine
+    similarity; ChromaDB stays the write-through source of truth.
     """
     
     def __init__(self):
-        self.client = None
-        self.collections = {}
-        self._initialize_client()
+        self._client = None
+        self._collections: Dict = {}
+        self._embedding_function = None
+        
+        # Writes to one collection are serialized; collections are independent
+        self._write_locks = {name: asyncio.Lock() for name in _COLLECTION_NAMES}
+        
+        self._search_cache: "OrderedDict[tuple, Tuple[float, Tuple[MemoryEntry, ...]]]" = OrderedDict()
+        self._collection_versions: Dict[str, int] = {}
+        
+        # Semantic cache: unit-norm query embeddings stacked row-wise, with
+        # the namespace and results for each row (FIFO-bounded)
+        self._sem_matrix: Optional[np.ndarray] = None
+        self._sem_namespaces: List[tuple] = []
+        self._sem_results: List[Tuple[MemoryEntry, ...]] = []
+        
+        # Hot mirrors by collection; None once a collection is too large
+        self._mirrors: Dict[str, Optional[_HotMirror]] = {}
+        
+        # Document embeddings keyed by content hash (LRU-bounded)
+        self._embed_cache: "OrderedDict[bytes, List[float]]" = OrderedDict()
+        
+        self._executor = ThreadPoolExecutor(
+            max_workers=min(8, os.cpu_count() or 1),
+            thread_name_prefix="chromadb"
+        )
+    
+    @property
+    def client(self):
+        """ChromaDB client, initialized on first access."""
+        if self._client is None:
+            self._initialize_client()
+        return self._client
+    
+    @property
+    def collections(self) -> Dict:
+        """Collections by name, initialized on first access."""
+        if self._client is None:
+            self._initialize_client()
+        return self._collections
     
     def _initialize_client(self) -> None:
         """Initialize ChromaDB client."""
+        import chromadb
+        from chromadb.utils import embedding_functions
+        
         try:
+            # Queries are embedded here (once per search) so the embedding can
+            # serve both the semantic cache and the ChromaDB query
+            self._embedding_function = embedding_functions.DefaultEmbeddingFunction()
+            
             # Use new ChromaDB API
-            self.client = chromadb.PersistentClient(
+            client = chromadb.PersistentClient(
                 path=str(settings.chromadb_persist_dir)
             )
             
             # Create collections for different memory types
-            self.collections = {
-                "code_patterns": self._get_or_create_collection("code_patterns"),
-                "solutions": self._get_or_create_collection("solutions"),
-                "errors": self._get_or_create_collection("errors"),
-                "experiences": self._get_or_create_collection("experiences"),
+            self._collections = {
+                name: self._get_or_create_collection(client, name)
+                for name in _COLLECTION_NAMES
             }
+            self._client = client
             
             logger.info("ChromaDB persistent memory initialized")
             
@@ -51,23 +258,74 @@ class PersistentMemory:
             logger.error(f"Failed to initialize ChromaDB: {e}")
             raise
     
-    def _get_or_create_collection(self, name: str):
+    def _get_or_create_collection(self, client, name: str):
         """Get or create a ChromaDB collection."""
         try:
-            return self.client.get_or_create_collection(
+            return client.get_or_create_collection(
                 name=name,
+                embedding_function=self._embedding_function,
                 metadata={"hnsw:space": "cosine"}
             )
         except Exception as e:
             logger.error(f"Failed to create collection {name}: {e}")
             raise
     
+    async def _run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking ChromaDB call on the memory thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+    
+    async def _embed_documents(self, contents: List[str]) -> List[List[float]]:
+        """
+        Embed documents, reusing cached embeddings for content seen before.
+        
+        Misses are embedded together in one model call.
+        
+        Args:
+            contents: Documents to embed
+        
+        Returns:
+            Embedding per document, in input order
+        """
+        keys = [
+            hashlib.blake2b(content.encode(), digest_size=16).digest()
+            for content in contents
+        ]
+        vectors: List[Optional[List[float]]] = []
+        missing: Dict[bytes, List[int]] = {}
+        
+        for i, key in enumerate(keys):
+            cached = self._embed_cache.get(key)
+            if cached is not None:
+                self._embed_cache.move_to_end(key)
+            else:
+                missing.setdefault(key, []).append(i)
+            vectors.append(cached)
+        
+        if missing:
+            embedded = await self._run(
+                self._embedding_function,
+                [contents[positions[0]] for positions in missing.values()]
+            )
+            for (key, positions), vector in zip(missing.items(), embedded):
+                vector = np.asarray(vector, dtype=np.float32).tolist()
+                for i in positions:
+                    vectors[i] = vector
+                
+                if settings.memory_embedding_cache_size > 0:
+                    self._embed_cache[key] = vector
+                    if len(self._embed_cache) > settings.memory_embedding_cache_size:
+                        self._embed_cache.popitem(last=False)
+        
+        return vectors
+    
     async def store(
         self,
         content: str,
         collection_name: str,
         metadata: Optional[Dict] = None,
-        embedding: Optional[List[float]] = None
+        embedding: Optional[List[float]] = None,
+        deterministic_id: Optional[str] = None
     ) -> MemoryEntry:
         """
         Store content in persistent memory.
@@ -77,6 +335,8 @@ class PersistentMemory:
             collection_name: Which collection to store in
             metadata: Additional metadata
             embedding: Pre-computed embedding (optional)
+            deterministic_id: Fixed entry ID; the entry is upserted, so
+                storing it again replaces rather than duplicates it
         
         Returns:
             MemoryEntry with stored data
@@ -84,32 +344,32 @@ class PersistentMemory:
         if collection_name not in self.collections:
             raise ValueError(f"Unknown collection: {collection_name}")
         
-        entry_id = str(uuid.uuid4())
+        entry_id = deterministic_id or uuid.uuid4().hex
         collection = self.collections[collection_name]
+        write = collection.upsert if deterministic_id else collection.add
         
         # Add metadata
+        created_at_ns = time.time_ns()
         full_metadata = metadata or {}
-        full_metadata.update({
-            "created_at": datetime.utcnow().isoformat(),
-            "accessed_count": 0
-        })
+        full_metadata["created_at_ns"] = created_at_ns
         
         try:
-            # ChromaDB will auto-generate embeddings if not provided
-            if embedding:
-                collection.add(
+            if not embedding:
+                embedding = (await self._embed_documents([content]))[0]
+            
+            async with self._write_locks[collection_name]:
+                await self._run(
+                    write,
                     ids=[entry_id],
                     documents=[content],
                     metadatas=[full_metadata],
                     embeddings=[embedding]
                 )
-            else:
-                collection.add(
-                    ids=[entry_id],
-                    documents=[content],
-                    metadatas=[full_metadata]
+                self._mirror_write(
+                    collection_name, [entry_id], [content], [full_metadata], [embedding]
                 )
             
+            self._bump_version(collection_name)
             logger.info(f"Stored memory entry {entry_id} in {collection_name}")
             
             return MemoryEntry(
@@ -117,13 +377,95 @@ class PersistentMemory:
                 content=content,
                 embedding=embedding,
                 metadata=full_metadata,
-                created_at=datetime.utcnow()
+                created_at=datetime.fromtimestamp(created_at_ns / 1e9, tz=timezone.utc)
             )
             
         except Exception as e:
             logger.error(f"Failed to store memory: {e}")
             raise
     
+    async def store_many(
+        self,
+        contents: List[str],
+        collection_name: str,
+        metadatas: Optional[List[Optional[Dict]]] = None,
+        embeddings: Optional[List[List[float]]] = None,
+        ids: Optional[List[str]] = None
+    ) -> List[MemoryEntry]:
+        """
+        Store several entries in one collection with a single add() call.
+        
+        Batching embeds all uncached documents in one model call and
+        commits them in one write.
+        
+        Args:
+            contents: Text contents to store
+            collection_name: Which collection to store in
+            metadatas: Metadata per content (optional)
+            embeddings: Pre-computed embedding per content (optional)
+            ids: Fixed entry IDs (optional); entries are then upserted
+        
+        Returns:
+            MemoryEntry per stored content, in input order
+        """
+        if collection_name not in self.collections:
+            raise ValueError(f"Unknown collection: {collection_name}")
+        
+        if not contents:
+            return []
+        
+        collection = self.collections[collection_name]
+        created_at_ns = time.time_ns()
+        created_at = datetime.fromtimestamp(created_at_ns / 1e9, tz=timezone.utc)
+        
+        # Parallel buffers are sized once and filled by index
+        n = len(contents)
+        entry_ids = ids if ids is not None else [None] * n
+        full_metadatas = [None] * n
+        for i in range(n):
+            if ids is None:
+                entry_ids[i] = uuid.uuid4().hex
+            full_metadata = (metadatas[i] if metadatas else None) or {}
+            full_metadata["created_at_ns"] = created_at_ns
+            full_metadatas[i] = full_metadata
+        write = collection.upsert if ids is not None else collection.add
+        
+        try:
+            if not embeddings:
+                embeddings = await self._embed_documents(contents)
+            
+            async with self._write_locks[collection_name]:
+                await self._run(
+                    write,
+                    ids=entry_ids,
+                    documents=contents,
+                    metadatas=full_metadatas,
+                    embeddings=embeddings
+                )
+                self._mirror_write(
+                    collection_name, entry_ids, contents, full_metadatas, embeddings
+                )
+            
+            self._bump_version(collection_name)
+            logger.info(f"Stored {len(entry_ids)} memory entries in {collection_name}")
+            
+            return [
+                MemoryEntry(
+                    id=entry_id,
+                    content=content,
+                    embedding=embedding,
+                    metadata=full_metadata,
+                    created_at=created_at
+                )
+                for entry_id, content, full_metadata, embedding in zip(
+                    entry_ids, contents, full_metadatas, embeddings
+                )
+            ]
+            
+        except Exception as e:
+            logger.error(f"Failed to store memories: {e}")
+            raise
+    
     async def search(
         self,
         query: str,
@@ -146,36 +488,257 @@ class PersistentMemory:
         if collection_name not in self.collections:
             raise ValueError(f"Unknown collection: {collection_name}")
         
+        namespace = self._search_namespace(collection_name, n_results, filter_metadata)
+        cache_key = (namespace, query)
+        cached = self._search_cache.get(cache_key)
+        if cached is not None:
+            expires_at, cached_entries = cached
+            if time.monotonic() < expires_at:
+                self._search_cache.move_to_end(cache_key)
+                return list(cached_entries)
+            del self._search_cache[cache_key]
+        
         collection = self.collections[collection_name]
         
         try:
-            results = collection.query(
-                query_texts=[query],
-                n_results=n_results,
-                where=filter_metadata
-            )
+            embedded = await self._run(self._embedding_function, [query])
+            query_embedding = np.asarray(embedded[0], dtype=np.float32)
+            
+            similar = self._semantic_lookup(query_embedding, namespace)
+            if similar is not None:
+                logger.debug(f"Semantic search cache hit for query: {query[:50]}...")
+                return list(similar)
+            
+            mirror = None
+            if _is_equality_filter(filter_metadata):
+                mirror = await self._get_mirror(collection_name)
+            
+            if mirror is not None:
+                rows = mirror.query(query_embedding, n_results, filter_metadata)
+                ids = [mirror.ids[row] for row in rows]
+                documents = [mirror.documents[row] for row in rows]
+                metadatas = [dict(mirror.metadatas[row]) for row in rows]
+                embeddings = [None] * len(rows)
+            else:
+                results = await self._run(
+                    collection.query,
+                    query_embeddings=[query_embedding.tolist()],
+                    n_results=n_results,
+                    where=filter_metadata
+                )
+                ids = results['ids'][0]
+                documents = results['documents'][0]
+                metadatas = results['metadatas'][0]
+                embeddings = (
+                    results['embeddings'][0] if results.get('embeddings')
+                    else [None] * len(ids)
+                )
             
             # Convert to MemoryEntry objects
-            entries = []
-            for i in range(len(results['ids'][0])):
-                entry = MemoryEntry(
-                    id=results['ids'][0][i],
-                    content=results['documents'][0][i],
-                    embedding=results['embeddings'][0][i] if results.get('embeddings') else None,
-                    metadata=results['metadatas'][0][i],
-                    created_at=datetime.fromisoformat(
-                        results['metadatas'][0][i]['created_at']
-                    )
+            entries = [
+                MemoryEntry(
+                    id=entry_id,
+                    content=document,
+                    embedding=embedding,
+                    metadata=metadata,
+                    created_at=_created_at(metadata)
+                )
+                for entry_id, document, metadata, embedding in zip(
+                    ids, documents, metadatas, embeddings
                 )
-                entries.append(entry)
+            ]
             
             logger.info(f"Found {len(entries)} memories for query: {query[:50]}...")
+            
+            if settings.memory_search_cache_size > 0:
+                self._search_cache[cache_key] = (
+                    time.monotonic() + settings.memory_search_cache_ttl_seconds,
+                    tuple(entries)
+                )
+                if len(self._search_cache) > settings.memory_search_cache_size:
+                    self._search_cache.popitem(last=False)
+            
+            self._semantic_store(query_embedding, namespace, tuple(entries))
+            
             return entries
             
         except Exception as e:
             logger.error(f"Memory search failed: {e}")
             return []
     
+    async def existing_ids(self, collection_name: str, ids: List[str]) -> set:
+        """
+        Find which of the given entry IDs are already stored.
+        
+        Args:
+            collection_name: Collection to check
+            ids: Entry IDs to look up
+        
+        Returns:
+            Set of IDs present in the collection
+        """
+        if collection_name not in self.collections:
+            raise ValueError(f"Unknown collection: {collection_name}")
+        
+        if not ids:
+            return set()
+        
+        found = await self._run(
+            self.collections[collection_name].get, ids=ids, include=[]
+        )
+        return set(found["ids"])
+    
+    async def _get_mirror(self, collection_name: str) -> Optional[_HotMirror]:
+        """
+        Get a collection's hot mirror, loading it on first use.
+        
+        Args:
+            collection_name: Collection to mirror
+        
+        Returns:
+            The mirror, or None if the collection is too large to mirror
+        """
+        max_entries = settings.memory_hot_mirror_max_entries
+        if max_entries == 0:
+            return None
+        
+        if collection_name not in self._mirrors:
+            # Holding the write lock keeps writes from slipping in mid-load
+            async with self._write_locks[collection_name]:
+                if collection_name not in self._mirrors:
+                    self._mirrors[collection_name] = await self._load_mirror(
+                        collection_name, max_entries
+                    )
+        
+        return self._mirrors[collection_name]
+    
+    async def _load_mirror(
+        self,
+        collection_name: str,
+        max_entries: int
+    ) -> Optional[_HotMirror]:
+        """Copy a collection into a new hot mirror (None if too large)."""
+        collection = self.collections[collection_name]
+        
+        try:
+            if await self._run(collection.count) > max_entries:
+                return None
+            
+            data = await self._run(
+                collection.get, include=["embeddings", "documents", "metadatas"]
+            )
+        except Exception as e:
+            logger.warning(f"Failed to mirror collection {collection_name}: {e}")
+            return None
+        
+        mirror = _HotMirror()
+        if data["ids"]:
+            mirror.upsert(data["ids"], data["documents"], data["metadatas"], data["embeddings"])
+        
+        logger.debug(f"Mirrored {len(mirror)} entries of {collection_name} in memory")
+        return mirror
+    
+    def _mirror_write(
+        self,
+        collection_name: str,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict],
+        embeddings: List[List[float]]
+    ) -> None:
+        """Apply a write to a collection's hot mirror (callers hold its write lock)."""
+        mirror = self._mirrors.get(collection_name)
+        if mirror is None:
+            return
+        
+        mirror.upsert(ids, documents, metadatas, embeddings)
+        if len(mirror) > settings.memory_hot_mirror_max_entries:
+            # Outgrew the mirror; ChromaDB serves this collection from now on
+            self._mirrors[collection_name] = None
+    
+    def _search_namespace(
+        self,
+        collection_name: str,
+        n_results: int,
+        filter_metadata: Optional[Dict]
+    ) -> tuple:
+        """Build the query-independent part of the search cache keys."""
+        frozen_filter = (
+            orjson.dumps(filter_metadata, option=orjson.OPT_SORT_KEYS)
+            if filter_metadata else None
+        )
+        return (
+            collection_name,
+            self._collection_versions.get(collection_name, 0),
+            n_results,
+            frozen_filter
+        )
+    
+    def _semantic_lookup(
+        self,
+        query_embedding: np.ndarray,
+        namespace: tuple
+    ) -> Optional[Tuple[MemoryEntry, ...]]:
+        """Find cached results of a near-duplicate query in the same namespace."""
+        
+        if self._sem_matrix is None:
+            return None
+        
+        norm = np.linalg.norm(query_embedding)
+        if norm == 0.0:
+            return None
+        
+        # Cosine similarity against every cached query in one product
+        sims = self._sem_matrix @ (query_embedding / norm)
+        candidates = np.flatnonzero(sims >= settings.memory_semantic_cache_threshold)
+        
+        for i in candidates[np.argsort(-sims[candidates])]:
+            if self._sem_namespaces[i] == namespace:
+                return self._sem_results[i]
+        
+        return None
+    
+    def _semantic_store(
+        self,
+        query_embedding: np.ndarray,
+        namespace: tuple,
+        entries: Tuple[MemoryEntry, ...]
+    ) -> None:
+        """Add a query's results to the semantic cache, evicting the oldest."""
+        
+        max_size = settings.memory_semantic_cache_size
+        norm = np.linalg.norm(query_embedding)
+        if max_size == 0 or norm == 0.0:
+            return
+        
+        row = (query_embedding / norm)[np.newaxis, :]
+        if self._sem_matrix is None:
+            self._sem_matrix = row
+        else:
+            self._sem_matrix = np.vstack((self._sem_matrix, row))
+        self._sem_namespaces.append(namespace)
+        self._sem_results.append(entries)
+        
+        # FIFO eviction
+        overflow = len(self._sem_namespaces) - max_size
+        if overflow > 0:
+            self._sem_matrix = self._sem_matrix[overflow:]
+            del self._sem_namespaces[:overflow]
+            del self._sem_results[:overflow]
+    
+    def _bump_version(self, collection_name: str) -> None:
+        """Invalidate cached searches of a collection after a write."""
+        self._collection_versions[collection_name] = (
+            self._collection_versions.get(collection_name, 0) + 1
+        )
+    
+    def clear_search_cache(self) -> None:
+        """Drop all cached search results."""
+        self._search_cache.clear()
+        self._sem_matrix = None
+        self._sem_namespaces.clear()
+        self._sem_results.clear()
+    
     async def store_code_pattern(
         self,
         pattern_name: str,
@@ -197,6 +760,40 @@ class PersistentMemory:
         Returns:
             Stored memory entry
         """
+        content, metadata = self._format_code_pattern(
+            pattern_name, code, language, context, success_metrics
+        )
+        return await self.store(content, "code_patterns", metadata)
+    
+    async def store_code_patterns(
+        self,
+        patterns: List[Dict],
+        ids: Optional[List[str]] = None
+    ) -> List[MemoryEntry]:
+        """
+        Store several code patterns in one batch.
+        
+        Args:
+            patterns: Dicts with store_code_pattern()'s keyword arguments
+            ids: Fixed entry IDs (optional, see store_many())
+        
+        Returns:
+            Stored memory entries
+        """
+        contents, metadatas = self._unzip(
+            self._format_code_pattern(**pattern) for pattern in patterns
+        )
+        return await self.store_many(contents, "code_patterns", metadatas, ids=ids)
+    
+    @staticmethod
+    def _format_code_pattern(
+        pattern_name: str,
+        code: str,
+        language: str,
+        context: str,
+        success_metrics: Dict
+    ) -> Tuple[str, Dict]:
+        """Build content and metadata for a code pattern."""
         content = f"""Pattern: {pattern_name}
 Language: {language}
 Context: {context}
@@ -209,11 +806,10 @@ Code:
             "type": "code_pattern",
             "pattern_name": pattern_name,
             "language": language,
-            "success_rate": success_metrics.get("success_rate", 1.0),
-            "usage_count": 0
+            "success_rate": success_metrics.get("success_rate", 1.0)
         }
         
-        return await self.store(content, "code_patterns", metadata)
+        return content, metadata
     
     async def store_solution(
         self,
@@ -234,6 +830,37 @@ Code:
         Returns:
             Stored memory entry
         """
+        content, metadata = self._format_solution(problem, solution, approach, verified)
+        return await self.store(content, "solutions", metadata)
+    
+    async def store_solutions(
+        self,
+        solutions: List[Dict],
+        ids: Optional[List[str]] = None
+    ) -> List[MemoryEntry]:
+        """
+        Store several solutions in one batch.
+        
+        Args:
+            solutions: Dicts with store_solution()'s keyword arguments
+            ids: Fixed entry IDs (optional, see store_many())
+        
+        Returns:
+            Stored memory entries
+        """
+        contents, metadatas = self._unzip(
+            self._format_solution(**solution) for solution in solutions
+        )
+        return await self.store_many(contents, "solutions", metadatas, ids=ids)
+    
+    @staticmethod
+    def _format_solution(
+        problem: str,
+        solution: str,
+        approach: str,
+        verified: bool
+    ) -> Tuple[str, Dict]:
+        """Build content and metadata for a solution."""
         content = f"""Problem: {problem}
 
 Approach: {approach}
@@ -245,11 +872,10 @@ Solution:
         metadata = {
             "type": "solution",
             "approach": approach,
-            "verified": verified,
-            "reuse_count": 0
+            "verified": verified
         }
         
-        return await self.store(content, "solutions", metadata)
+        return content, metadata
     
     async def store_error_resolution(
         self,
@@ -270,6 +896,39 @@ Solution:
         Returns:
             Stored memory entry
         """
+        content, metadata = self._format_error_resolution(
+            error_message, context, resolution, success
+        )
+        return await self.store(content, "errors", metadata)
+    
+    async def store_error_resolutions(
+        self,
+        resolutions: List[Dict],
+        ids: Optional[List[str]] = None
+    ) -> List[MemoryEntry]:
+        """
+        Store several error resolutions in one batch.
+        
+        Args:
+            resolutions: Dicts with store_error_resolution()'s keyword arguments
+            ids: Fixed entry IDs (optional, see store_many())
+        
+        Returns:
+            Stored memory entries
+        """
+        contents, metadatas = self._unzip(
+            self._format_error_resolution(**resolution) for resolution in resolutions
+        )
+        return await self.store_many(contents, "errors", metadatas, ids=ids)
+    
+    def _format_error_resolution(
+        self,
+        error_message: str,
+        context: str,
+        resolution: str,
+        success: bool
+    ) -> Tuple[str, Dict]:
+        """Build content and metadata for an error resolution."""
         content = f"""Error: {error_message}
 
 Context: {context}
@@ -284,7 +943,16 @@ Resolution:
             "success": success
         }
         
-        return await self.store(content, "errors", metadata)
+        return content, metadata
+    
+    @staticmethod
+    def _unzip(pairs) -> Tuple[List[str], List[Dict]]:
+        """Split (content, metadata) pairs into parallel lists."""
+        contents, metadatas = [], []
+        for content, metadata in pairs:
+            contents.append(content)
+            metadatas.append(metadata)
+        return contents, metadatas
     
     async def recall_similar_patterns(
         self,
@@ -342,31 +1010,24 @@ Resolution:
     
     def _classify_error(self, error_message: str) -> str:
         """Classify error type for categorization."""
-        error_lower = error_message.lower()
-        
-        if "syntax" in error_lower:
-            return "syntax"
-        elif "import" in error_lower or "module" in error_lower:
-            return "import"
-        elif "type" in error_lower:
-            return "type"
-        elif "attribute" in error_lower:
-            return "attribute"
-        elif "name" in error_lower:
-            return "name"
-        elif "index" in error_lower:
-            return "index"
-        elif "key" in error_lower:
-            return "key"
-        else:
-            return "general"
+        best = None
+        
+        for match in _ERROR_CLASS_RE.finditer(error_message.lower()):
+            precedence, category = _ERROR_CATEGORIES[match.group(1)]
+            if precedence == 0:
+                return category
+            if best is None or precedence < best[0]:
+                best = (precedence, category)
+        
+        return best[1] if best is not None else "general"
     
     async def get_statistics(self) -> Dict:
         """Get memory statistics."""
         stats = {}
         
         for name, collection in self.collections.items():
-            count = collection.count()
+            mirror = self._mirrors.get(name)
+            count = len(mirror) if mirror is not None else await self._run(collection.count)
             stats[name] = {
                 "count": count,
                 "collection": name
@@ -3,12 +3,27 @@ Metrics collection and monitoring.
 """
 
 import time
-from datetime import datetime
-from typing import Dict, List
+from collections import deque
+from types import MappingProxyType
+from typing import Deque, Dict, Mapping, Optional, Tuple
 from dataclasses import dataclass, field
 from loguru import logger
 
-from src.core.models import ExecutionMetrics, AgentRole
+from src.core.models import ExecutionMetrics, AgentRole, utc_now
+
+
+# Length of the rolling per-agent window, in one-second buckets
+WINDOW_SECONDS = 60
+
+
+@dataclass
+class MetricsBucket:
+    """Executions of one agent that finished within one wall-clock second."""
+    second: int
+    tasks: int = 0
+    tokens: int = 0
+    duration: float = 0.0
+    errors: int = 0
 
 
 @dataclass
@@ -21,6 +36,11 @@ class AgentMetrics:
     total_duration: float = 0.0
     errors: int = 0
     
+    # Pre-aggregated one-second buckets for the rolling window
+    buckets: Deque[MetricsBucket] = field(
+        default_factory=lambda: deque(maxlen=WINDOW_SECONDS)
+    )
+    
     def add_execution(self, metrics: ExecutionMetrics) -> None:
         """Add execution metrics."""
         self.total_tasks += 1
@@ -29,6 +49,38 @@ class AgentMetrics:
         
         if not metrics.success:
             self.errors += 1
+        
+        second = int(time.time())
+        if not self.buckets or self.buckets[-1].second != second:
+            self.buckets.append(MetricsBucket(second=second))
+        
+        bucket = self.buckets[-1]
+        bucket.tasks += 1
+        bucket.tokens += metrics.tokens_generated
+        bucket.duration += metrics.duration_seconds
+        bucket.errors += not metrics.success
+    
+    def get_window(self) -> Dict:
+        """Get totals over the last WINDOW_SECONDS seconds."""
+        cutoff = int(time.time()) - WINDOW_SECONDS
+        
+        tasks = tokens = errors = 0
+        duration = 0.0
+        for bucket in self.buckets:
+            if bucket.second > cutoff:
+                tasks += bucket.tasks
+                tokens += bucket.tokens
+                duration += bucket.duration
+                errors += bucket.errors
+        
+        return {
+            "window_seconds": WINDOW_SECONDS,
+            "tasks": tasks,
+            "tokens": tokens,
+            "duration": duration,
+            "errors": errors,
+            "tokens_per_second": tokens / WINDOW_SECONDS
+        }
     
     def get_average_duration(self) -> float:
         """Get average task duration."""
@@ -46,16 +98,33 @@ class AgentMetrics:
 class MetricsCollector:
     """
     Collects and aggregates metrics for monitoring.
+    
+    Execution history is a bounded ring buffer; system totals are running
+    counters updated on record, so reading them never scans the history.
+    The dashboard summary is cached briefly and rebuilt once new executions
+    are recorded or the cache expires.
     """
     
-    def __init__(self):
+    def __init__(self, history_size: int = 10_000, summary_ttl_seconds: float = 0.25):
         self.agent_metrics: Dict[AgentRole, AgentMetrics] = {
             role: AgentMetrics(role=role)
             for role in AgentRole
         }
         
-        self.execution_history: List[ExecutionMetrics] = []
-        self.start_time = datetime.utcnow()
+        self.execution_history: Deque[ExecutionMetrics] = deque(maxlen=history_size)
+        self.start_time = utc_now()
+        
+        # Running totals over every execution ever recorded
+        self._total_executions = 0
+        self._successful = 0
+        self._total_tokens = 0
+        self._total_consensus_rounds = 0
+        self._recent_durations: Deque[float] = deque(maxlen=10)
+        
+        # Cached summary as (version, monotonic build time, summary)
+        self.summary_ttl_seconds = summary_ttl_seconds
+        self._version = 0
+        self._summary_cache: Optional[Tuple[int, float, Mapping]] = None
     
     def record_execution(self, metrics: ExecutionMetrics, agent_role: AgentRole) -> None:
         """
@@ -68,30 +137,39 @@ class MetricsCollector:
         self.execution_history.append(metrics)
         self.agent_metrics[agent_role].add_execution(metrics)
         
+        self._total_executions += 1
+        self._successful += metrics.success
+        self._total_tokens += metrics.tokens_generated
+        self._total_consensus_rounds += metrics.consensus_rounds
+        self._recent_durations.append(metrics.duration_seconds)
+        self._version += 1
+        
+        # Arguments are only formatted if a sink accepts DEBUG records
         logger.debug(
-            f"Recorded metrics for {agent_role.value}: "
-            f"{metrics.duration_seconds:.2f}s, "
-            f"{metrics.tokens_generated} tokens"
+            "Recorded metrics for {}: {:.2f}s, {} tokens",
+            agent_role.value,
+            metrics.duration_seconds,
+            metrics.tokens_generated
         )
     
     def get_system_metrics(self) -> Dict:
         """Get overall system metrics."""
         
-        if not self.execution_history:
+        if not self._total_executions:
             return {
                 "status": "no_data",
                 "message": "No executions recorded yet"
             }
         
-        total_executions = len(self.execution_history)
-        successful = sum(1 for m in self.execution_history if m.success)
+        total_executions = self._total_executions
+        successful = self._successful
         
-        recent = self.execution_history[-10:]
-        avg_duration = sum(m.duration_seconds for m in recent) / len(recent)
-        total_tokens = sum(m.tokens_generated for m in self.execution_history)
-        total_consensus_rounds = sum(m.consensus_rounds for m in self.execution_history)
+        recent = self._recent_durations
+        avg_duration = sum(recent) / len(recent)
+        total_tokens = self._total_tokens
+        total_consensus_rounds = self._total_consensus_rounds
         
-        uptime = (datetime.utcnow() - self.start_time).total_seconds()
+        uptime = (utc_now() - self.start_time).total_seconds()
         
         return {
             "total_executions": total_executions,
@@ -117,7 +195,8 @@ class MetricsCollector:
             "total_duration": metrics.total_duration,
             "errors": metrics.errors,
             "average_duration": metrics.get_average_duration(),
-            "tokens_per_second": metrics.get_tokens_per_second()
+            "tokens_per_second": metrics.get_tokens_per_second(),
+            "window": metrics.get_window()
         }
     
     def get_all_agent_metrics(self) -> Dict[str, Dict]:
@@ -128,17 +207,32 @@ class MetricsCollector:
             for role in AgentRole
         }
     
-    def get_performance_summary(self) -> Dict:
-        """Get performance summary for dashboard."""
+    def get_performance_summary(self) -> Mapping:
+        """
+        Get performance summary for dashboard.
+        
+        Polls within summary_ttl_seconds of the last build, with no
+        execution recorded since, get the same read-only summary back.
+        """
+        now = time.monotonic()
+        cache = self._summary_cache
+        if (
+            cache is not None
+            and cache[0] == self._version
+            and now - cache[1] < self.summary_ttl_seconds
+        ):
+            return cache[2]
         
         system = self.get_system_metrics()
         agents = self.get_all_agent_metrics()
         
-        return {
+        summary = MappingProxyType({
             "system": system,
             "agents": agents,
-            "timestamp": datetime.utcnow().isoformat()
-        }
+            "timestamp": utc_now().isoformat()
+        })
+        self._summary_cache = (self._version, now, summary)
+        return summary
 
 
 # Global metrics collector
@@ -2,14 +2,28 @@
 Checkpointing system for crash recovery and state persistence.
 """
 
-import json
+import asyncio
+import hashlib
+import os
 import pickle
-from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 from loguru import logger
+import orjson
 
-from src.core.models import Task, TaskStatus
+from src.core.models import Task, TaskStatus, utc_now
+
+
+# Checkpoints are JSON (full bases and deltas); pickle files from older
+# versions (and state that JSON cannot represent) are still read and
+# written as a fallback
+_JSON_SUFFIX = ".json"
+_DELTA_SUFFIX = ".delta.json"
+_PICKLE_SUFFIX = ".pkl"
+
+# Each checkpoint has a small JSON sidecar (id, timestamp, tasks_count) so
+# listing does not decode whole checkpoints
+_META_SUFFIX = ".meta"
 
 
 class CheckpointManager:
@@ -21,6 +35,22 @@ class CheckpointManager:
     - State recovery on restart
     - Incremental checkpoints
     - Cleanup of old checkpoints
+    
+    Checkpoints are encoded with orjson. A checkpoint whose global state or
+    metadata holds values JSON cannot represent falls back to pickle, and
+    files are decoded according to their suffix.
+    
+    Encoding happens in the caller; the file writes are handed to a
+    single background writer, so create_checkpoint does not wait on disk.
+    Call flush() to wait for queued writes (e.g. on shutdown).
+    
+    A checkpoint is either a base (every task) or a delta holding only the
+    tasks whose content hash changed since the previous checkpoint, plus
+    the IDs of tasks that disappeared. Loading a delta replays its chain
+    from the base. A new base is written every max_deltas checkpoints.
+    
+    Listing and cleanup scan the directory once with os.scandir and read
+    only the metadata sidecars.
     """
     
     def __init__(self, checkpoint_dir: Path = Path("./.hydra/checkpoints")):
@@ -29,6 +59,20 @@ class CheckpointManager:
         
         self.latest_checkpoint_file = self.checkpoint_dir / "latest.json"
         self.max_checkpoints = 10
+        self.max_deltas = 50
+        
+        # Task content hashes as of the previous checkpoint, and its chain
+        self._task_hashes: Dict[str, bytes] = {}
+        self._base_id: Optional[str] = None
+        self._last_id: Optional[str] = None
+        self._deltas_since_base = 0
+        
+        # Queued (checkpoint ID, parent ID, file, encoded bytes, sidecar bytes)
+        # for the writer task, and IDs whose chain lost a file since the last base
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._broken_ids: Set[str] = set()
+        self._writer_task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
     
     async def create_checkpoint(
         self,
@@ -45,37 +89,173 @@ class CheckpointManager:
             metadata: Additional metadata
         
         Returns:
-            Checkpoint ID
+            Checkpoint ID (the file is written in the background)
         """
-        checkpoint_id = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        checkpoint_file = self.checkpoint_dir / f"checkpoint_{checkpoint_id}.pkl"
+        now = utc_now()
+        checkpoint_id = now.strftime("%Y%m%d_%H%M%S_%f")
+        task_dicts = [self._serialize_task(task) for task in tasks]
         
         checkpoint_data = {
             "id": checkpoint_id,
-            "timestamp": datetime.utcnow().isoformat(),
-            "tasks": [self._serialize_task(task) for task in tasks],
+            "kind": "base",
+            "timestamp": now.isoformat(),
+            "tasks_count": len(tasks),
             "global_state": global_state,
             "metadata": metadata or {}
         }
         
         try:
-            # Save as pickle for full object serialization
-            with open(checkpoint_file, 'wb') as f:
-                pickle.dump(checkpoint_data, f)
-            
-            # Update latest pointer
-            self.latest_checkpoint_file.write_text(checkpoint_id)
-            
-            logger.info(f"Created checkpoint {checkpoint_id}")
-            
-            # Cleanup old checkpoints
-            await self._cleanup_old_checkpoints()
-            
-            return checkpoint_id
-            
+            try:
+                # Each task is encoded once: the bytes are hashed for change
+                # detection and embedded as-is in the checkpoint
+                encoded = [
+                    orjson.dumps(task_data, option=orjson.OPT_SORT_KEYS)
+                    for task_data in task_dicts
+                ]
+                hashes = {
+                    task.id: hashlib.blake2b(task_json, digest_size=16).digest()
+                    for task, task_json in zip(tasks, encoded)
+                }
+                
+                if self._base_id is None or self._deltas_since_base >= self.max_deltas:
+                    changed = encoded
+                    suffix = _JSON_SUFFIX
+                else:
+                    changed = [
+                        task_json for task, task_json in zip(tasks, encoded)
+                        if self._task_hashes.get(task.id) != hashes[task.id]
+                    ]
+                    checkpoint_data.update({
+                        "kind": "delta",
+                        "base": self._base_id,
+                        "parent": self._last_id,
+                        "deleted_ids": [
+                            task_id for task_id in self._task_hashes
+                            if task_id not in hashes
+                        ]
+                    })
+                    suffix = _DELTA_SUFFIX
+                
+                buf = orjson.dumps({
+                    **checkpoint_data,
+                    "tasks": [orjson.Fragment(task_json) for task_json in changed]
+                })
+            except orjson.JSONEncodeError as e:
+                logger.warning(f"Checkpoint {checkpoint_id} is not JSON-serializable ({e}), using pickle")
+                buf = pickle.dumps(
+                    {**checkpoint_data, "kind": "base", "tasks": task_dicts},
+                    protocol=pickle.HIGHEST_PROTOCOL
+                )
+                suffix = _PICKLE_SUFFIX
         except Exception as e:
             logger.error(f"Failed to create checkpoint: {e}")
             raise
+        
+        if suffix == _PICKLE_SUFFIX:
+            # Task hashes are unknown, so the next checkpoint is a full base
+            self._task_hashes = {}
+            self._base_id = None
+        else:
+            self._task_hashes = hashes
+            if suffix == _JSON_SUFFIX:
+                self._base_id = checkpoint_id
+                self._deltas_since_base = 0
+            else:
+                self._deltas_since_base += 1
+        self._last_id = checkpoint_id
+        
+        checkpoint_file = self.checkpoint_dir / f"checkpoint_{checkpoint_id}{suffix}"
+        meta = orjson.dumps({
+            "id": checkpoint_id,
+            "timestamp": checkpoint_data["timestamp"],
+            "tasks_count": checkpoint_data["tasks_count"]
+        })
+        await self._enqueue_write(
+            (checkpoint_id, checkpoint_data.get("parent"), checkpoint_file, buf, meta)
+        )
+        return checkpoint_id
+    
+    async def _enqueue_write(
+        self,
+        item: Tuple[str, Optional[str], Path, bytes, bytes]
+    ) -> None:
+        """Hand an encoded checkpoint to the writer task."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Queues are bound to the loop that created them
+            self._loop = loop
+            self._write_queue = asyncio.Queue()
+            self._writer_task = None
+        
+        await self._write_queue.put(item)
+        
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = asyncio.create_task(self._writer_loop())
+    
+    async def _writer_loop(self) -> None:
+        """
+        Write queued checkpoints in order, off the event loop.
+        
+        If a write fails, deltas queued after it whose chain runs through
+        the lost file are dropped rather than written, so latest only ever
+        points at a loadable checkpoint. The next checkpoint created after
+        the failure is a full base.
+        """
+        while True:
+            checkpoint_id, parent_id, checkpoint_file, buf, meta = await self._write_queue.get()
+            try:
+                if parent_id in self._broken_ids:
+                    self._broken_ids.add(checkpoint_id)
+                    logger.warning(
+                        f"Dropped checkpoint {checkpoint_id}: its parent {parent_id} was not written"
+                    )
+                    continue
+                
+                await asyncio.to_thread(
+                    self._write_checkpoint_file, checkpoint_id, checkpoint_file, buf, meta
+                )
+                logger.info("Created checkpoint {}", checkpoint_id)
+                
+                if parent_id is None:
+                    # A new base starts a complete chain
+                    self._broken_ids.clear()
+                
+                # Cleanup old checkpoints
+                await self._cleanup_old_checkpoints()
+            except Exception as e:
+                logger.error(f"Failed to write checkpoint {checkpoint_id}: {e}")
+                self._broken_ids.add(checkpoint_id)
+                await asyncio.to_thread(self._remove_checkpoint_files, checkpoint_id, checkpoint_file)
+                # Later deltas would depend on the lost file; start over
+                self._base_id = None
+            finally:
+                self._write_queue.task_done()
+    
+    def _remove_checkpoint_files(self, checkpoint_id: str, checkpoint_file: Path) -> None:
+        """Remove whatever a failed write left behind."""
+        for path in (checkpoint_file, self._meta_file(checkpoint_id)):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+    
+    def _write_checkpoint_file(
+        self,
+        checkpoint_id: str,
+        checkpoint_file: Path,
+        buf: bytes,
+        meta: bytes
+    ) -> None:
+        """Write a checkpoint and its sidecar, then point latest at it."""
+        checkpoint_file.write_bytes(buf)
+        self._meta_file(checkpoint_id).write_bytes(meta)
+        self.latest_checkpoint_file.write_text(checkpoint_id)
+    
+    async def flush(self) -> None:
+        """Wait until every queued checkpoint is on disk."""
+        
+        if self._write_queue is not None and self._loop is asyncio.get_running_loop():
+            await self._write_queue.join()
     
     async def load_checkpoint(
         self,
@@ -90,6 +270,8 @@ class CheckpointManager:
         Returns:
             Checkpoint data or None if not found
         """
+        await self.flush()
+        
         if checkpoint_id is None:
             # Load latest
             if not self.latest_checkpoint_file.exists():
@@ -98,15 +280,16 @@ class CheckpointManager:
             
             checkpoint_id = self.latest_checkpoint_file.read_text().strip()
         
-        checkpoint_file = self.checkpoint_dir / f"checkpoint_{checkpoint_id}.pkl"
+        checkpoint_file = self._find_checkpoint_file(checkpoint_id)
         
-        if not checkpoint_file.exists():
+        if checkpoint_file is None:
             logger.warning(f"Checkpoint {checkpoint_id} not found")
             return None
         
         try:
-            with open(checkpoint_file, 'rb') as f:
-                checkpoint_data = pickle.load(f)
+            checkpoint_data = await asyncio.to_thread(
+                self._read_checkpoint_chain, checkpoint_file
+            )
             
             logger.info(f"Loaded checkpoint {checkpoint_id}")
             return checkpoint_data
@@ -122,21 +305,28 @@ class CheckpointManager:
         Returns:
             List of checkpoint metadata
         """
+        await self.flush()
+        
         checkpoints = []
         
-        for checkpoint_file in sorted(self.checkpoint_dir.glob("checkpoint_*.pkl")):
+        for entry in self._scan_checkpoints():
             try:
-                with open(checkpoint_file, 'rb') as f:
-                    data = pickle.load(f)
+                try:
+                    data = orjson.loads(
+                        self._meta_file(self._checkpoint_id(entry.name)).read_bytes()
+                    )
+                except FileNotFoundError:
+                    # Checkpoints from older versions have no sidecar
+                    data = self._read_checkpoint_file(Path(entry.path))
                 
                 checkpoints.append({
                     "id": data["id"],
                     "timestamp": data["timestamp"],
-                    "tasks_count": len(data["tasks"]),
-                    "file_size": checkpoint_file.stat().st_size
+                    "tasks_count": data.get("tasks_count", len(data.get("tasks", ()))),
+                    "file_size": entry.stat().st_size
                 })
             except Exception as e:
-                logger.warning(f"Failed to read checkpoint {checkpoint_file.name}: {e}")
+                logger.warning(f"Failed to read checkpoint {entry.name}: {e}")
         
         return checkpoints
     
@@ -177,6 +367,94 @@ class CheckpointManager:
         
         return restored_state
     
+    def _scan_checkpoints(self) -> List[os.DirEntry]:
+        """
+        List checkpoint files of every supported format in one directory scan.
+        
+        Returns:
+            Directory entries sorted by name (IDs are timestamps, so name
+            order is creation order)
+        """
+        with os.scandir(self.checkpoint_dir) as entries:
+            checkpoints = [
+                entry for entry in entries
+                if entry.name.startswith("checkpoint_")
+                and entry.name.endswith((_JSON_SUFFIX, _PICKLE_SUFFIX))
+            ]
+        checkpoints.sort(key=lambda entry: entry.name)
+        return checkpoints
+    
+    @staticmethod
+    def _checkpoint_id(filename: str) -> str:
+        """Get the checkpoint ID from a checkpoint file name."""
+        for suffix in (_DELTA_SUFFIX, _JSON_SUFFIX, _PICKLE_SUFFIX):
+            if filename.endswith(suffix):
+                return filename[len("checkpoint_"):-len(suffix)]
+        raise ValueError(f"Not a checkpoint file: {filename}")
+    
+    def _meta_file(self, checkpoint_id: str) -> Path:
+        """Get the path of a checkpoint's metadata sidecar."""
+        return self.checkpoint_dir / f"checkpoint_{checkpoint_id}{_META_SUFFIX}"
+    
+    def _find_checkpoint_file(self, checkpoint_id: str) -> Optional[Path]:
+        """Find a checkpoint's file, preferring JSON over legacy pickle."""
+        for suffix in (_JSON_SUFFIX, _DELTA_SUFFIX, _PICKLE_SUFFIX):
+            checkpoint_file = self.checkpoint_dir / f"checkpoint_{checkpoint_id}{suffix}"
+            if checkpoint_file.exists():
+                return checkpoint_file
+        return None
+    
+    @staticmethod
+    def _read_checkpoint_file(checkpoint_file: Path) -> Dict:
+        """Decode a checkpoint file according to its suffix."""
+        buf = checkpoint_file.read_bytes()
+        if checkpoint_file.suffix == _PICKLE_SUFFIX:
+            return pickle.loads(buf)
+        return orjson.loads(buf)
+    
+    def _read_checkpoint_chain(self, checkpoint_file: Path) -> Dict:
+        """
+        Read a checkpoint, replaying deltas onto their base.
+        
+        Args:
+            checkpoint_file: Base or delta checkpoint file
+        
+        Returns:
+            Checkpoint data with the full task list
+        """
+        head = data = self._read_checkpoint_file(checkpoint_file)
+        deltas = []
+        seen = {data["id"]}
+        
+        while data.get("kind") == "delta":
+            deltas.append(data)
+            parent_file = self._find_checkpoint_file(data["parent"])
+            if parent_file is None:
+                raise FileNotFoundError(f"Parent checkpoint {data['parent']} is missing")
+            
+            data = self._read_checkpoint_file(parent_file)
+            if data["id"] in seen:
+                raise ValueError(f"Checkpoint chain of {head['id']} has a cycle")
+            seen.add(data["id"])
+        
+        if not deltas:
+            return head
+        
+        tasks = {task_data["id"]: task_data for task_data in data["tasks"]}
+        for delta in reversed(deltas):
+            for task_id in delta["deleted_ids"]:
+                tasks.pop(task_id, None)
+            for task_data in delta["tasks"]:
+                tasks[task_data["id"]] = task_data
+        
+        return {
+            "id": head["id"],
+            "timestamp": head["timestamp"],
+            "tasks": list(tasks.values()),
+            "global_state": head["global_state"],
+            "metadata": head["metadata"]
+        }
+    
     def _serialize_task(self, task: Task) -> Dict:
         """Serialize task to dict."""
         return task.model_dump()
@@ -188,16 +466,23 @@ class CheckpointManager:
     async def _cleanup_old_checkpoints(self) -> None:
         """Remove old checkpoints, keeping only the most recent."""
         
-        checkpoints = sorted(
-            self.checkpoint_dir.glob("checkpoint_*.pkl"),
-            key=lambda p: p.stat().st_mtime,
-            reverse=True
-        )
+        # IDs are timestamps, so name order is creation order
+        checkpoints = self._scan_checkpoints()
+        checkpoints.reverse()
+        
+        # Keep the max_checkpoints most recent, plus the chain back to the
+        # base the oldest kept delta depends on
+        keep = self.max_checkpoints
+        while 0 < keep < len(checkpoints) and checkpoints[keep - 1].name.endswith(_DELTA_SUFFIX):
+            keep += 1
         
-        # Keep only max_checkpoints most recent
-        for old_checkpoint in checkpoints[self.max_checkpoints:]:
+        for old_checkpoint in checkpoints[keep:]:
             try:
-                old_checkpoint.unlink()
+                os.unlink(old_checkpoint.path)
+                try:
+                    os.unlink(self._meta_file(self._checkpoint_id(old_checkpoint.name)))
+                except FileNotFoundError:
+                    pass
                 logger.debug(f"Removed old checkpoint {old_checkpoint.name}")
             except Exception as e:
                 logger.warning(f"Failed to remove old checkpoint: {e}")
@@ -3,16 +3,37 @@ Docker-based execution sandbox for running and testing code safely.
 """
 
 import asyncio
-import uuid
+import os
+import re
 import shutil
+import tempfile
+import time
+import uuid
+from collections import deque
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 from loguru import logger
 import docker
+import orjson
 
 from src.core.config import settings
 
 
+# Plain-text linter output: a line mentioning "error" is an error,
+# otherwise one mentioning "warn" is a warning
+_LINT_LINE_RE = re.compile(
+    r'^(?:(?=[^\n]*error)(?P<error>[^\n]*)|(?=[^\n]*warn)(?P<warning>[^\n]*))$',
+    re.IGNORECASE | re.MULTILINE
+)
+
+# Extra time past a run's timeout before the host gives up on a warm exec
+_EXEC_DEADLINE_GRACE_SECONDS = 10
+
+# Ruff rules reported as errors (pyflakes, pycodestyle errors); syntax
+# errors carry no code and are errors too
+_RUFF_ERROR_PREFIXES = ("E", "F")
+
+
 class ExecutionSandbox:
     """
     Safe execution environment using Docker containers.
@@ -23,6 +44,20 @@ class ExecutionSandbox:
     - Test runner integration
     - Timeout enforcement
     - Resource limits
+    
+    Containers are started ahead of time but never reused: a small pool of
+    warm containers per image is kept, each with only its own empty run
+    directory mounted at /workspace. A run takes one, writes its files,
+    execs its command and then removes the container and the directory,
+    while a replacement starts in the background. A fresh run-and-remove
+    container is used when no warm one is available or an exec fails.
+    At most max_containers runs hold a container at once.
+    
+    docker-py is synchronous, so every Docker call runs in a worker thread;
+    the pool itself is only touched from the event loop.
+    
+    Output is streamed and only its last output_max_bytes are kept; the
+    result's "truncated" flag tells when earlier output was dropped.
     """
     
     def __init__(self):
@@ -30,6 +65,21 @@ class ExecutionSandbox:
         self.timeout = settings.docker_sandbox_timeout
         self.client = None
         
+        # Per-run directories live under one root, created on first use
+        self.workspace_root: Optional[Path] = None
+        self.pool_max_idle = settings.docker_pool_max_idle
+        self.pool_idle_seconds = settings.docker_pool_idle_seconds
+        self.max_containers = settings.docker_max_containers
+        self.output_max_bytes = settings.docker_output_max_bytes
+        
+        # Warm (container, run directory, started at) per image, and the
+        # background starts in flight
+        self._pool: Dict[str, List[Tuple["docker.models.containers.Container", Path, float]]] = {}
+        self._refilling: Dict[str, int] = {}
+        self._refill_tasks: Set[asyncio.Task] = set()
+        self._run_slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        
         if self.enabled:
             try:
                 self.client = docker.from_env()
@@ -66,13 +116,7 @@ class ExecutionSandbox:
         logger.info(f"Executing code in sandbox {execution_id}")
         
         try:
-            # Create temporary directory for code
-            temp_dir = Path(f"/tmp/hydra_sandbox_{execution_id}")
-            temp_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Write code to file
-            code_file = temp_dir / self._get_filename(language)
-            code_file.write_text(code)
+            filename = self._get_filename(language)
             
             # Determine Docker image
             image = self._get_docker_image(language)
@@ -81,19 +125,16 @@ class ExecutionSandbox:
             if test_command:
                 command = test_command
             else:
-                command = self._get_run_command(language, code_file.name)
+                command = self._get_run_command(language, filename)
             
             # Run in container
             result = await self._run_in_container(
                 image=image,
                 command=command,
-                volume_path=str(temp_dir),
+                files={filename: code},
                 timeout=self.timeout
             )
             
-            # Cleanup
-            await self._cleanup(temp_dir)
-            
             return result
             
         except Exception as e:
@@ -129,14 +170,6 @@ class ExecutionSandbox:
         logger.info(f"Running tests in sandbox {execution_id}")
         
         try:
-            # Create temporary directory
-            temp_dir = Path(f"/tmp/hydra_tests_{execution_id}")
-            temp_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Write all test files
-            for filename, content in test_files.items():
-                (temp_dir / filename).write_text(content)
-            
             # Determine test command
             test_command = self._get_test_command(language)
             image = self._get_docker_image(language)
@@ -145,13 +178,10 @@ class ExecutionSandbox:
             result = await self._run_in_container(
                 image=image,
                 command=test_command,
-                volume_path=str(temp_dir),
+                files=test_files,
                 timeout=self.timeout
             )
             
-            # Cleanup
-            await self._cleanup(temp_dir)
-            
             return result
             
         except Exception as e:
@@ -188,29 +218,20 @@ class ExecutionSandbox:
         logger.info(f"Linting code in sandbox {execution_id}")
         
         try:
-            # Create temporary directory
-            temp_dir = Path(f"/tmp/hydra_lint_{execution_id}")
-            temp_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Write code to file
-            code_file = temp_dir / self._get_filename(language)
-            code_file.write_text(code)
+            filename = self._get_filename(language)
             
             # Get linter command
-            lint_command = self._get_lint_command(language, code_file.name)
+            lint_command = self._get_lint_command(language, filename)
             image = self._get_docker_image(language)
             
             # Run linter
             result = await self._run_in_container(
                 image=image,
                 command=lint_command,
-                volume_path=str(temp_dir),
+                files={filename: code},
                 timeout=60
             )
             
-            # Cleanup
-            await self._cleanup(temp_dir)
-            
             # Parse linter output
             return self._parse_lint_output(result["output"], language)
             
@@ -222,19 +243,308 @@ class ExecutionSandbox:
                 "errors": [str(e)]
             }
     
+    def _new_run_dir(self) -> Path:
+        """Create an empty per-run directory under workspace_root."""
+        if self.workspace_root is None:
+            self.workspace_root = Path(tempfile.mkdtemp(
+                prefix="hydra_sb_", dir=settings.docker_workspace_dir
+            ))
+        
+        return Path(tempfile.mkdtemp(prefix="run_", dir=self.workspace_root))
+    
+    @staticmethod
+    def _write_files(run_dir: Path, files: Dict[str, str]) -> None:
+        """
+        Write files into a run directory.
+        
+        Args:
+            run_dir: Run directory
+            files: Dictionary of filename -> content
+        """
+        for filename, content in files.items():
+            data = memoryview(content.encode())
+            fd = os.open(run_dir / filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                while data:
+                    data = data[os.write(fd, data):]
+            finally:
+                os.close(fd)
+    
+    def _get_run_slots(self) -> asyncio.Semaphore:
+        """Get the semaphore bounding concurrent sandbox containers."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Semaphores are bound to the loop that first waits on them
+            self._loop = loop
+            self._run_slots = asyncio.Semaphore(self.max_containers)
+        return self._run_slots
+    
     async def _run_in_container(
+        self,
+        image: str,
+        command: str,
+        files: Dict[str, str],
+        timeout: int
+    ) -> Dict:
+        """
+        Run command against files in a single-use container.
+        
+        Args:
+            image: Docker image
+            command: Shell command, run in /workspace
+            files: Dictionary of filename -> content placed in /workspace
+            timeout: Time limit in seconds
+        
+        Returns:
+            Execution result dictionary
+        """
+        async with self._get_run_slots():
+            warm = await self._acquire_container(image) if self.pool_max_idle > 0 else None
+            if warm is not None:
+                container, run_dir = warm
+            else:
+                container, run_dir = None, self._new_run_dir()
+            
+            try:
+                self._write_files(run_dir, files)
+                
+                if container is not None:
+                    try:
+                        return await self._exec_with_deadline(container, command, timeout)
+                    except docker.errors.APIError as e:
+                        logger.warning(f"Warm container exec failed, using a fresh container: {e}")
+                
+                return await asyncio.to_thread(
+                    self._run_in_new_container, image, command, str(run_dir), timeout
+                )
+            finally:
+                # Untrusted code has touched the container and its files
+                if container is not None:
+                    await asyncio.to_thread(self._discard_container, container)
+                await self._cleanup(run_dir)
+    
+    async def _exec_with_deadline(
+        self,
+        container: "docker.models.containers.Container",
+        command: str,
+        timeout: int
+    ) -> Dict:
+        """
+        Exec a command, giving up on it at a host-side deadline.
+        
+        timeout(1) only kills the shell's process tree; a detached child
+        still holding stdout would keep the output stream open. The caller
+        discards the container afterwards, which ends the stream.
+        """
+        try:
+            return await asyncio.wait_for(
+                asyncio.to_thread(self._exec_in_container, container, command, timeout),
+                timeout + _EXEC_DEADLINE_GRACE_SECONDS
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Sandbox exec exceeded {timeout}s, discarding container")
+            return {
+                "success": False,
+                "output": f"Execution timed out after {timeout}s",
+                "exit_code": -1,
+                "truncated": False
+            }
+    
+    def _exec_in_container(
+        self,
+        container: "docker.models.containers.Container",
+        command: str,
+        timeout: int
+    ) -> Dict:
+        """Exec a command in a warm container's workspace."""
+        
+        api = self.client.api
+        exec_id = api.exec_create(
+            container.id,
+            self._with_timeout(command, timeout),
+            workdir="/workspace"
+        )["Id"]
+        
+        output, truncated = self._collect_output(api.exec_start(exec_id, stream=True))
+        exit_code = api.exec_inspect(exec_id)["ExitCode"]
+        
+        return {
+            "success": exit_code == 0,
+            "output": output,
+            "exit_code": exit_code,
+            "truncated": truncated
+        }
+    
+    @staticmethod
+    def _with_timeout(command: str, timeout: int) -> List[str]:
+        """Wrap a shell command so timeout(1) kills it after timeout seconds."""
+        return ["timeout", "-s", "KILL", str(timeout), "sh", "-c", command]
+    
+    def _collect_output(self, chunks: Iterable[bytes]) -> Tuple[str, bool]:
+        """
+        Read streamed output, keeping only its tail.
+        
+        Args:
+            chunks: Output chunks as they arrive
+        
+        Returns:
+            Decoded output (at most output_max_bytes) and whether earlier
+            output was dropped
+        """
+        kept: deque = deque()
+        size = 0
+        truncated = False
+        
+        for chunk in chunks:
+            kept.append(chunk)
+            size += len(chunk)
+            
+            while size > self.output_max_bytes:
+                excess = size - self.output_max_bytes
+                head = kept[0]
+                if len(head) <= excess:
+                    kept.popleft()
+                    size -= len(head)
+                else:
+                    kept[0] = head[excess:]
+                    size -= excess
+                truncated = True
+        
+        # A cut may split a multi-byte character
+        return b"".join(kept).decode('utf-8', errors='replace'), truncated
+    
+    async def _acquire_container(
+        self,
+        image: str
+    ) -> Optional[Tuple["docker.models.containers.Container", Path]]:
+        """
+        Take a warm container for an image and start its replacement.
+        
+        Returns:
+            Container and its mounted run directory, or None if none is warm
+        """
+        await self._prune_idle_containers()
+        
+        idle = self._pool.get(image)
+        warm = None
+        if idle:
+            container, run_dir, _ = idle.pop()
+            warm = (container, run_dir)
+        
+        self._schedule_refill(image)
+        return warm
+    
+    def _schedule_refill(self, image: str) -> None:
+        """Start warm containers in the background until the pool is full."""
+        
+        while len(self._pool.get(image, ())) + self._refilling.get(image, 0) < self.pool_max_idle:
+            self._refilling[image] = self._refilling.get(image, 0) + 1
+            task = asyncio.create_task(self._refill(image))
+            self._refill_tasks.add(task)
+            task.add_done_callback(self._refill_tasks.discard)
+    
+    async def _refill(self, image: str) -> None:
+        """Start one warm container and add it to the pool."""
+        
+        run_dir = self._new_run_dir()
+        try:
+            container = await asyncio.to_thread(self._start_pool_container, image, run_dir)
+        except Exception as e:
+            logger.warning(f"Could not start warm container for {image}: {e}")
+            await self._cleanup(run_dir)
+            return
+        finally:
+            self._refilling[image] -= 1
+        
+        self._pool.setdefault(image, []).append((container, run_dir, time.monotonic()))
+    
+    def _start_pool_container(
+        self,
+        image: str,
+        run_dir: Path
+    ) -> "docker.models.containers.Container":
+        """Start a container that waits for one exec in run_dir."""
+        
+        # The container exits (and removes itself) on its own once it has
+        # outlived any idle period plus run, even if this process is gone
+        lifetime = int(self.pool_idle_seconds + self.timeout) + 60
+        
+        return self.client.containers.run(
+            image=image,
+            command=["sleep", str(lifetime)],
+            volumes={str(run_dir): {'bind': '/workspace', 'mode': 'rw'}},
+            working_dir='/workspace',
+            detach=True,
+            auto_remove=True,
+            mem_limit='512m',
+            cpu_count=2,
+            network_mode='bridge',
+            labels={"hydra.sandbox": "pool"}
+        )
+    
+    async def _prune_idle_containers(self) -> None:
+        """Remove warm containers idle for longer than pool_idle_seconds."""
+        
+        cutoff = time.monotonic() - self.pool_idle_seconds
+        expired = []
+        for idle in self._pool.values():
+            # Oldest first: containers are added to the end
+            while idle and idle[0][2] < cutoff:
+                expired.append(idle.pop(0))
+        
+        if expired:
+            await self._discard_warm(expired)
+    
+    async def _discard_warm(
+        self,
+        warm: List[Tuple["docker.models.containers.Container", Path, float]]
+    ) -> None:
+        """Remove warm containers and their run directories."""
+        
+        await asyncio.gather(*(
+            asyncio.to_thread(self._discard_container, container)
+            for container, _, _ in warm
+        ))
+        for _, run_dir, _ in warm:
+            await self._cleanup(run_dir)
+    
+    def _discard_container(self, container: "docker.models.containers.Container") -> None:
+        """Force-remove a container, ignoring errors."""
+        try:
+            container.remove(force=True)
+        except docker.errors.NotFound:
+            pass  # Already gone (auto_remove)
+        except Exception as e:
+            logger.warning(f"Failed to remove sandbox container: {e}")
+    
+    async def close(self) -> None:
+        """Remove every warm container and the workspace root."""
+        
+        # Let in-flight starts finish so their containers are removed too
+        if self._refill_tasks:
+            await asyncio.gather(*self._refill_tasks, return_exceptions=True)
+        
+        warm = [entry for idle in self._pool.values() for entry in idle]
+        self._pool.clear()
+        await self._discard_warm(warm)
+        
+        if self.workspace_root is not None:
+            await asyncio.to_thread(shutil.rmtree, self.workspace_root, True)
+            self.workspace_root = None
+    
+    def _run_in_new_container(
         self,
         image: str,
         command: str,
         volume_path: str,
         timeout: int
     ) -> Dict:
-        """Run command in Docker container."""
+        """Run command in a new Docker container, removed afterwards."""
         
         try:
             container = self.client.containers.run(
                 image=image,
-                command=command,
+                command=self._with_timeout(command, timeout),
                 volumes={volume_path: {'bind': '/workspace', 'mode': 'rw'}},
                 working_dir='/workspace',
                 detach=True,
@@ -242,38 +552,40 @@ class ExecutionSandbox:
                 cpu_count=2,
                 network_mode='bridge'
             )
+        except Exception as e:
+            logger.error(f"Container run failed: {e}")
+            return {
+                "success": False,
+                "output": str(e),
+                "exit_code": 1
+            }
+        
+        # Stream output until the container exits (timeout(1) is PID 1, so
+        # killing it stops everything in the container)
+        try:
+            output, truncated = self._collect_output(
+                container.logs(stream=True, follow=True)
+            )
+            result = container.wait(timeout=timeout)
+            exit_code = result['StatusCode']
             
-            # Wait for completion with timeout
-            try:
-                result = container.wait(timeout=timeout)
-                output = container.logs().decode('utf-8')
-                exit_code = result['StatusCode']
-                
-                # Remove container
-                container.remove()
-                
-                return {
-                    "success": exit_code == 0,
-                    "output": output,
-                    "exit_code": exit_code
-                }
-                
-            except docker.errors.ContainerError as e:
-                logger.error(f"Container execution error: {e}")
-                container.remove(force=True)
-                return {
-                    "success": False,
-                    "output": str(e),
-                    "exit_code": 1
-                }
+            return {
+                "success": exit_code == 0,
+                "output": output,
+                "exit_code": exit_code,
+                "truncated": truncated
+            }
             
         except Exception as e:
-            logger.error(f"Container run failed: {e}")
+            logger.error(f"Container execution error: {e}")
             return {
                 "success": False,
                 "output": str(e),
                 "exit_code": 1
             }
+        
+        finally:
+            self._discard_container(container)
     
     def _get_docker_image(self, language: str) -> str:
         """Get Docker image for language."""
@@ -322,7 +634,7 @@ class ExecutionSandbox:
     def _get_lint_command(self, language: str, filename: str) -> str:
         """Get command to lint code."""
         commands = {
-            "python": f"ruff check {filename}",
+            "python": f"ruff check --output-format=json {filename}",
             "javascript": f"eslint {filename}",
             "typescript": f"eslint {filename}",
             "go": f"golangci-lint run {filename}",
@@ -333,16 +645,50 @@ class ExecutionSandbox:
     def _parse_lint_output(self, output: str, language: str) -> Dict:
         """Parse linter output into structured format."""
         
-        lines = output.split('\n')
+        if language == "python":
+            try:
+                diagnostics = orjson.loads(output)
+            except orjson.JSONDecodeError:
+                diagnostics = None  # Not ruff JSON (e.g. ruff missing); scan the text
+            
+            if isinstance(diagnostics, list):
+                return self._parse_ruff_diagnostics(diagnostics, output)
+        
+        errors = []
+        warnings = []
+        
+        for match in _LINT_LINE_RE.finditer(output):
+            if match.group("error") is not None:
+                errors.append(match.group("error").strip())
+            else:
+                warnings.append(match.group("warning").strip())
+        
+        return {
+            "success": len(errors) == 0,
+            "warnings": warnings,
+            "errors": errors,
+            "raw_output": output
+        }
+    
+    def _parse_ruff_diagnostics(self, diagnostics: List[Dict], output: str) -> Dict:
+        """Split ruff's JSON diagnostics into errors and warnings."""
+        
         errors = []
         warnings = []
         
-        for line in lines:
-            line_lower = line.lower()
-            if 'error' in line_lower:
-                errors.append(line.strip())
-            elif 'warning' in line_lower or 'warn' in line_lower:
-                warnings.append(line.strip())
+        for diagnostic in diagnostics:
+            code = diagnostic.get("code")
+            location = diagnostic.get("location") or {}
+            line = (
+                f"{Path(diagnostic.get('filename', '')).name}:"
+                f"{location.get('row', 0)}:{location.get('column', 0)}: "
+                f"{code or 'syntax-error'} {diagnostic.get('message', '')}"
+            )
+            
+            if code is None or code.startswith(_RUFF_ERROR_PREFIXES):
+                errors.append(line)
+            else:
+                warnings.append(line)
         
         return {
             "success": len(errors) == 0,
@@ -354,9 +700,18 @@ class ExecutionSandbox:
     async def _cleanup(self, directory: Path) -> None:
         """Cleanup temporary directory."""
         try:
-            if directory.exists():
-                shutil.rmtree(directory)
-                logger.debug(f"Cleaned up {directory}")
+            # Run directories are flat apart from tool caches (__pycache__,
+            # .pytest_cache), so unlink files directly and only walk subdirectories
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        shutil.rmtree(entry.path)
+                    else:
+                        os.unlink(entry.path)
+            os.rmdir(directory)
+            logger.debug(f"Cleaned up {directory}")
+        except FileNotFoundError:
+            pass
         except Exception as e:
             logger.warning(f"Cleanup failed for {directory}: {e}")
 
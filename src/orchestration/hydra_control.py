@@ -3,16 +3,19 @@ Main control plane for Hydra-Consensus swarm.
 """
 
 import asyncio
-from datetime import datetime
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Dict, List, Optional
 from loguru import logger
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 
+from src.agents.agent_client import aclose_http_client
 from src.core.config import settings
-from src.core.models import Task, TaskStatus, AgentRole, ExecutionMetrics
+from src.core.models import Task, TaskStatus, AgentRole, ExecutionMetrics, utc_now
 from src.orchestration.task_dispatcher import TaskDispatcher
+from src.orchestration.checkpointing import checkpoint_manager
+from src.orchestration.execution_sandbox import execution_sandbox
 from src.memory import knowledge_base, episodic_memory
 from src.extensions.hydration import SpecHydration
 
@@ -33,7 +36,8 @@ class HydraControl:
         self.app = FastAPI(
             title="Hydra-Consensus Control Plane",
             description="Multi-agent swarm orchestration system",
-            version="0.1.0"
+            version="0.1.0",
+            lifespan=self._lifespan
         )
         
         self.dispatcher = TaskDispatcher()
@@ -47,6 +51,12 @@ class HydraControl:
         self._setup_middleware()
         self._setup_routes()
     
+    @asynccontextmanager
+    async def _lifespan(self, app: FastAPI):
+        """Application lifespan: release shared resources on shutdown."""
+        yield
+        await self.shutdown()
+    
     def _setup_middleware(self):
         """Configure FastAPI middleware."""
         self.app.add_middleware(
@@ -66,7 +76,7 @@ class HydraControl:
             return {
                 "status": "healthy",
                 "active_tasks": len(self.active_tasks),
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": utc_now().isoformat()
             }
         
         @self.app.post("/tasks")
@@ -201,7 +211,7 @@ class HydraControl:
                         # Send heartbeat
                         await websocket.send_json({
                             "type": "heartbeat",
-                            "timestamp": datetime.utcnow().isoformat()
+                            "timestamp": utc_now().isoformat()
                         })
             except WebSocketDisconnect:
                 self.websocket_connections.remove(websocket)
@@ -221,7 +231,7 @@ class HydraControl:
         4. Record results
         5. Update task status
         """
-        start_time = datetime.utcnow()
+        start_time = utc_now()
         episode_id = None
         
         try:
@@ -253,7 +263,7 @@ class HydraControl:
             
             # Update task status
             task.status = TaskStatus.COMPLETED if result["success"] else TaskStatus.FAILED
-            task.completed_at = datetime.utcnow()
+            task.completed_at = utc_now()
             
             # Record metrics
             duration = (task.completed_at - start_time).total_seconds()
@@ -265,7 +275,7 @@ class HydraControl:
                 consensus_rounds=result.get("consensus_rounds", 0),
                 success=result["success"],
                 error_message=result.get("error"),
-                timestamp=datetime.utcnow()
+                timestamp=utc_now()
             )
             self.execution_metrics.append(metrics)
             
@@ -289,7 +299,7 @@ class HydraControl:
         except Exception as e:
             logger.error(f"Task {task.id} failed: {e}")
             task.status = TaskStatus.FAILED
-            task.completed_at = datetime.utcnow()
+            task.completed_at = utc_now()
             
             if episode_id:
                 await episodic_memory.end_episode(
@@ -335,7 +345,20 @@ class HydraControl:
         for ws in self.websocket_connections:
             await ws.close()
         
+        # Finish writing ended episodes and queued checkpoints
+        await episodic_memory.flush()
+        await checkpoint_manager.flush()
+        
+        # Remove warm sandbox containers
+        await execution_sandbox.close()
+        
+        # Release pooled model server connections
+        await aclose_http_client()
+        
         logger.info("Shutdown complete")
+        
+        # Drain records still queued for the log sinks
+        await logger.complete()
 
 
 # Global control plane instance
@@ -3,13 +3,20 @@ Filesystem-based state bus for agent communication.
 """
 
 import asyncio
-import json
-from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
+import orjson
 from loguru import logger
+from pydantic import BaseModel
 
-from src.core.models import AgentMessage, AgentRole
+from src.core.models import AgentMessage, AgentRole, utc_now
+
+
+def _encode_model(obj: Any) -> Any:
+    """orjson fallback for pydantic models (e.g. ConsensusResult in state)."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
 
 
 class StateBus:
@@ -118,10 +125,17 @@ class StateBus:
         """
         state_with_timestamp = {
             **state,
-            "last_updated": datetime.utcnow().isoformat()
+            "last_updated": utc_now().isoformat()
         }
         
-        self.state_file.write_text(json.dumps(state_with_timestamp, indent=2))
+        self.state_file.write_bytes(
+            orjson.dumps(
+                state_with_timestamp,
+                default=_encode_model,
+                # Like json.dumps, accept int and enum (e.g. AgentRole) keys
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+            )
+        )
         logger.debug("State saved to filesystem")
     
     async def load_state(self) -> Optional[Dict]:
@@ -135,8 +149,7 @@ class StateBus:
             return None
         
         try:
-            content = self.state_file.read_text()
-            state = json.loads(content)
+            state = orjson.loads(self.state_file.read_bytes())
             logger.debug("State loaded from filesystem")
             return state
         except Exception as e:
@@ -153,7 +166,7 @@ class StateBus:
         Returns:
             Number of messages cleared
         """
-        cutoff = datetime.utcnow().timestamp() - (max_age_hours * 3600)
+        cutoff = utc_now().timestamp() - (max_age_hours * 3600)
         cleared = 0
         
         for message_file in self.messages_dir.glob("*.json"):
@@ -4,7 +4,6 @@ Web scraping tool using Jina Reader and Firecrawl.
 
 import asyncio
 from typing import Optional
-from datetime import datetime
 import httpx
 from loguru import logger
 
@@ -86,8 +85,7 @@ class ScraperTool:
                     metadata={
                         "scraper": "jina",
                         "content_length": len(content)
-                    },
-                    scraped_at=datetime.utcnow()
+                    }
                 )
         
         except Exception as e:
@@ -130,8 +128,7 @@ class ScraperTool:
                     metadata={
                         "scraper": "firecrawl",
                         **result.get("metadata", {})
-                    },
-                    scraped_at=datetime.utcnow()
+                    }
                 )
         
         except Exception as e:
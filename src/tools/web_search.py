@@ -4,7 +4,6 @@ Web search tool using Searxng.
 
 import asyncio
 from typing import List, Optional
-from datetime import datetime
 import httpx
 from loguru import logger
 
@@ -76,8 +75,7 @@ class WebSearchTool:
                         title=r["title"],
                         snippet=r.get("content", ""),
                         relevance_score=self._calculate_relevance(r, query),
-                        source="searxng",
-                        fetched_at=datetime.utcnow()
+                        source="searxng"
                     )
                     for r in results
                 ]
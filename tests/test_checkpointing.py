@@ -0,0 +1,164 @@
+"""
+Tests for incremental (base + delta) checkpoints.
+"""
+
+import pytest
+
+from src.core.models import Task, TaskPriority, TaskStatus
+from src.orchestration.checkpointing import CheckpointManager
+
+
+def make_task(task_id: str, title: str = "Task") -> Task:
+    """Build a minimal task."""
+    return Task(
+        id=task_id,
+        title=title,
+        description="Test",
+        priority=TaskPriority.MEDIUM
+    )
+
+
+def checkpoint_names(manager: CheckpointManager, pattern: str):
+    """Sorted checkpoint file names matching a glob."""
+    return sorted(p.name for p in manager.checkpoint_dir.glob(pattern))
+
+
+@pytest.mark.asyncio
+async def test_delta_chain_replay(tmp_path):
+    """Deltas replayed onto their base give the latest task set."""
+    
+    manager = CheckpointManager(tmp_path)
+    tasks = {task_id: make_task(task_id) for task_id in ("a", "b", "c")}
+    
+    base_id = await manager.create_checkpoint(list(tasks.values()), {"step": 0})
+    
+    # Change one task
+    tasks["b"].status = TaskStatus.COMPLETED
+    await manager.create_checkpoint(list(tasks.values()), {"step": 1})
+    
+    # Delete one task and add another
+    del tasks["a"]
+    tasks["d"] = make_task("d", "New task")
+    latest_id = await manager.create_checkpoint(list(tasks.values()), {"step": 2})
+    
+    await manager.flush()
+    assert len(checkpoint_names(manager, "checkpoint_*.delta.json")) == 2
+    
+    # A delta only stores what changed
+    delta = manager._read_checkpoint_file(manager._find_checkpoint_file(latest_id))
+    assert delta["kind"] == "delta"
+    assert delta["base"] == base_id
+    assert delta["deleted_ids"] == ["a"]
+    assert [task_data["id"] for task_data in delta["tasks"]] == ["d"]
+    
+    restored = await manager.restore_from_checkpoint()
+    
+    assert restored["global_state"] == {"step": 2}
+    restored_tasks = {task.id: task for task in restored["tasks"]}
+    assert set(restored_tasks) == {"b", "c", "d"}
+    assert restored_tasks["b"].status == TaskStatus.COMPLETED
+    assert restored_tasks["d"].title == "New task"
+    
+    # Earlier checkpoints in the chain still load as they were
+    restored_base = await manager.restore_from_checkpoint(base_id)
+    assert {task.id for task in restored_base["tasks"]} == {"a", "b", "c"}
+
+
+@pytest.mark.asyncio
+async def test_new_base_after_max_deltas(tmp_path):
+    """A full base is written every max_deltas checkpoints."""
+    
+    manager = CheckpointManager(tmp_path)
+    manager.max_deltas = 2
+    
+    for step in range(6):
+        await manager.create_checkpoint([make_task(str(step))], {"step": step})
+    
+    await manager.flush()
+    assert len(checkpoint_names(manager, "checkpoint_*.delta.json")) == 4
+    assert len(checkpoint_names(manager, "checkpoint_*[0-9].json")) == 2
+
+
+@pytest.mark.asyncio
+async def test_cleanup_keeps_base_of_kept_deltas(tmp_path):
+    """Cleanup keeps the chain back to the base of the oldest kept delta."""
+    
+    manager = CheckpointManager(tmp_path)
+    manager.max_checkpoints = 2
+    manager.max_deltas = 10
+    
+    tasks = [make_task("a"), make_task("b")]
+    checkpoint_ids = []
+    for step in range(5):
+        tasks[0].title = f"Step {step}"
+        checkpoint_ids.append(
+            await manager.create_checkpoint(tasks, {"step": step})
+        )
+    
+    await manager.flush()
+    
+    # The two most recent are deltas, so their whole chain back to the base stays
+    remaining = [checkpoint["id"] for checkpoint in await manager.list_checkpoints()]
+    assert remaining == checkpoint_ids
+    
+    restored = await manager.restore_from_checkpoint(checkpoint_ids[-1])
+    assert restored["tasks"][0].title == "Step 4"
+    
+    # Once the two most recent are bases, the old chain goes
+    manager.max_deltas = 0
+    new_base_ids = [
+        await manager.create_checkpoint(tasks, {"step": step})
+        for step in (5, 6)
+    ]
+    await manager.flush()
+    
+    remaining = [checkpoint["id"] for checkpoint in await manager.list_checkpoints()]
+    assert remaining == new_base_ids
+    
+    # Metadata sidecars go with their checkpoints
+    assert len(checkpoint_names(manager, "checkpoint_*.meta")) == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_write_drops_dependent_deltas(tmp_path):
+    """Deltas depending on a lost file are never written or made latest."""
+    
+    manager = CheckpointManager(tmp_path)
+    tasks = [make_task("a")]
+    
+    base_id = await manager.create_checkpoint(tasks, {"step": 0})
+    await manager.flush()
+    
+    write_checkpoint_file = manager._write_checkpoint_file
+    failing = set()
+    
+    def flaky_write(checkpoint_id, *args):
+        if checkpoint_id in failing:
+            raise OSError("disk full")
+        return write_checkpoint_file(checkpoint_id, *args)
+    
+    manager._write_checkpoint_file = flaky_write
+    
+    # Queue a delta that fails and another on top of it before the writer runs
+    tasks[0].title = "Step 1"
+    lost_id = await manager.create_checkpoint(tasks, {"step": 1})
+    failing.add(lost_id)
+    tasks[0].title = "Step 2"
+    dependent_id = await manager.create_checkpoint(tasks, {"step": 2})
+    await manager.flush()
+    
+    assert manager._find_checkpoint_file(lost_id) is None
+    assert manager._find_checkpoint_file(dependent_id) is None
+    assert manager.latest_checkpoint_file.read_text() == base_id
+    
+    restored = await manager.restore_from_checkpoint()
+    assert restored["global_state"] == {"step": 0}
+    
+    # The next checkpoint starts a new chain
+    tasks[0].title = "Step 3"
+    next_id = await manager.create_checkpoint(tasks, {"step": 3})
+    await manager.flush()
+    
+    assert manager._find_checkpoint_file(next_id).name.endswith(f"{next_id}.json")
+    restored = await manager.restore_from_checkpoint()
+    assert restored["tasks"][0].title == "Step 3"
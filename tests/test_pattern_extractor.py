@@ -0,0 +1,165 @@
+"""
+Tests for function/class block detection in the pattern extractor.
+"""
+
+from src.memory.pattern_extractor import _scan_definitions
+
+
+def definitions(code: str):
+    """(kind, name, block code) per definition, in source order."""
+    found = []
+    for kind, match, block_code, body in _scan_definitions(code):
+        name = match.group("func_name") if kind == "function" else match.group("cls_name")
+        found.append((kind, name, block_code))
+    return found
+
+
+def blocks(code: str):
+    """Name -> block code."""
+    return {name: block_code for _, name, block_code in definitions(code)}
+
+
+NESTED = '''\
+class Repository:
+    """Stores things."""
+    
+    def __init__(self):
+        self.items = {}
+    
+    # Comments and blank lines do not close a block
+    async def fetch(self, key):
+        def default():
+            return None
+        return self.items.get(key) or default()
+
+def helper(x):
+    return x * 2
+'''
+
+
+def test_nested_methods():
+    """Classes contain their methods; nested functions end with their body."""
+    
+    found = definitions(NESTED)
+    
+    assert [(kind, name) for kind, name, _ in found] == [
+        ("class", "Repository"),
+        ("function", "__init__"),
+        ("function", "fetch"),
+        ("function", "default"),
+        ("function", "helper"),
+    ]
+    
+    code = blocks(NESTED)
+    assert code["Repository"].endswith("return self.items.get(key) or default()")
+    assert code["default"] == "def default():\n            return None"
+    assert code["helper"] == "def helper(x):\n    return x * 2"
+
+
+def test_async_functions():
+    """Async definitions are detected and flagged."""
+    
+    results = _scan_definitions(NESTED)
+    is_async = {
+        match.group("func_name"): bool(match.group("is_async"))
+        for kind, match, _, _ in results
+        if kind == "function"
+    }
+    
+    assert is_async == {"__init__": False, "fetch": True, "default": False, "helper": False}
+
+
+def test_multiline_signature():
+    """A signature whose closing line is at the header's indent keeps its body."""
+    
+    code = (
+        "class Service:\n"
+        "    def handle(\n"
+        "        self,\n"
+        "        request: dict,\n"
+        "    ) -> dict:\n"
+        "        return {'ok': True}\n"
+        "\n"
+        "    def close(self):\n"
+        "        pass\n"
+    )
+    
+    found = _scan_definitions(code)
+    handle = next(item for item in found if item[1].group("func_name") == "handle")
+    
+    assert handle[2].endswith("return {'ok': True}")
+    assert handle[3] == "return {'ok': True}"
+    assert blocks(code)["close"] == "def close(self):\n        pass"
+
+
+def test_docstring_excluded_from_body():
+    """The body excludes a leading docstring, including a multi-line one."""
+    
+    code = (
+        "def documented():\n"
+        '    """\n'
+        "    Summary.\n"
+        "\n"
+        "def not_a_function_header():\n"
+        '    """\n'
+        "    return 1\n"
+    )
+    
+    found = _scan_definitions(code)
+    
+    # The "def" inside the docstring is not a definition, and its dedented
+    # lines do not close the block
+    assert len(found) == 1
+    kind, match, block_code, body = found[0]
+    assert match.group("func_name") == "documented"
+    assert block_code.endswith("return 1")
+    assert body == "return 1"
+
+
+def test_dedented_string_content():
+    """Multi-line string content below the header's indent stays in the block."""
+    
+    code = (
+        "def query():\n"
+        "    sql = '''\n"
+        "SELECT *\n"
+        "FROM users\n"
+        "'''\n"
+        "    return sql\n"
+        "\n"
+        "def after():\n"
+        "    pass\n"
+    )
+    
+    code_blocks = blocks(code)
+    
+    assert code_blocks["query"].endswith("return sql")
+    assert code_blocks["after"] == "def after():\n    pass"
+
+
+def test_crlf_input():
+    """CRLF input gives the same definitions as LF input."""
+    
+    lf = definitions(NESTED)
+    crlf = definitions(NESTED.replace("\n", "\r\n"))
+    
+    assert [(kind, name) for kind, name, _ in crlf] == [(kind, name) for kind, name, _ in lf]
+    assert [block.replace("\r\n", "\n") for _, _, block in crlf] == [block for _, _, block in lf]
+
+
+def test_only_newline_starts_lines():
+    """Form feeds and Unicode line separators inside a line do not split it."""
+    
+    for separator in ("\x0c", "\u2028", "\x1c"):
+        code = (
+            "def outer():\n"
+            f"    s = 'a{separator}b'\n"
+            "    def inner():\n"
+            "        return s\n"
+            "    return inner\n"
+        )
+        
+        code_blocks = blocks(code)
+        
+        assert code_blocks["outer"].endswith("    return inner")
+        assert code_blocks["inner"] == "def inner():\n        return s"
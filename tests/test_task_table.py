@@ -0,0 +1,107 @@
+"""
+Tests for the TaskTable ready-set bookkeeping and dependency waves.
+"""
+
+import pytest
+
+from src.core.models import Task, TaskPriority, TaskStatus, TaskTable
+from src.extensions.hydration import topo_sort_tasks
+
+
+def make_task(task_id: str, *dependencies: str, status: TaskStatus = TaskStatus.PENDING) -> Task:
+    """Build a minimal task."""
+    return Task(
+        id=task_id,
+        title=task_id,
+        description="Test",
+        priority=TaskPriority.MEDIUM,
+        status=status,
+        dependencies=frozenset(dependencies)
+    )
+
+
+def test_ready_ids_respect_dependencies():
+    """Only pending tasks with every dependency completed are ready."""
+    
+    table = TaskTable([
+        make_task("a"),
+        make_task("b", "a"),
+        make_task("c", "a", "b"),
+        make_task("d", "missing"),
+        make_task("e", status=TaskStatus.IN_PROGRESS)
+    ])
+    
+    # Unknown dependencies are ignored; in-progress tasks are not ready
+    assert table.ready_ids() == ["a", "d"]
+    assert table.n_unmet.tolist() == [0, 1, 2, 0, 0]
+
+
+def test_set_status_updates_dependent_counts():
+    """Completing a task readies its dependents; reopening it blocks them again."""
+    
+    table = TaskTable([
+        make_task("a"),
+        make_task("b", "a"),
+        make_task("c", "a", "b")
+    ])
+    
+    table.set_status("a", TaskStatus.COMPLETED)
+    assert table.n_unmet.tolist() == [0, 0, 1]
+    assert table.ready_ids() == ["b"]
+    
+    # Repeating a status does not count twice
+    table.set_status("a", TaskStatus.COMPLETED)
+    assert table.n_unmet.tolist() == [0, 0, 1]
+    
+    table.set_status("b", TaskStatus.COMPLETED)
+    assert table.ready_ids() == ["c"]
+    
+    # A completed task going back to pending blocks its dependents again
+    table.set_status("a", TaskStatus.PENDING)
+    assert table.n_unmet.tolist() == [0, 1, 1]
+    assert table.ready_ids() == ["a"]
+    
+    # Non-completed transitions leave the counts alone
+    table.set_status("a", TaskStatus.IN_PROGRESS)
+    table.set_status("a", TaskStatus.FAILED)
+    assert table.n_unmet.tolist() == [0, 1, 1]
+    assert table.ready_ids() == []
+
+
+def test_completed_dependencies_are_met_on_load():
+    """Dependencies already completed when the table is built count as met."""
+    
+    tasks = [
+        make_task("a", status=TaskStatus.COMPLETED),
+        make_task("b", "a")
+    ]
+    
+    assert TaskTable(tasks).ready_ids() == ["b"]
+    
+    # all_pending ignores stored statuses
+    assert TaskTable(tasks, all_pending=True).ready_ids() == ["a"]
+
+
+def test_topo_sort_waves():
+    """Waves follow dependencies and keep input order within a wave."""
+    
+    tasks = [
+        make_task("d", "b", "c"),
+        make_task("c", "a"),
+        make_task("b", "a"),
+        make_task("a", status=TaskStatus.COMPLETED),
+        make_task("e")
+    ]
+    
+    waves = topo_sort_tasks(tasks)
+    
+    assert [[task.id for task in wave] for wave in waves] == [["a", "e"], ["c", "b"], ["d"]]
+
+
+def test_topo_sort_cycle():
+    """A dependency cycle is reported with the tasks involved."""
+    
+    tasks = [make_task("a", "c"), make_task("b", "a"), make_task("c", "b"), make_task("d")]
+    
+    with pytest.raises(ValueError, match="a, b, c"):
+        topo_sort_tasks(tasks)